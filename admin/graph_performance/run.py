@@ -8,7 +8,7 @@ class PySysTest(TenNetworkTest):
 
     def execute(self):
         tests = ['ten_per_001','ten_per_002','ten_per_003','ten_per_004','ten_per_005','ten_per_006',
-                 'ten_per_010','ten_per_011','ten_per_012','ten_per_020','ten_per_021']
+                 'ten_per_010','ten_per_011','ten_per_012','ten_per_013','ten_per_020','ten_per_021']
 
         for test in tests:
             with open(os.path.join(self.output, '%s.log' % test), 'w') as fp:
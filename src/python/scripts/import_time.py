@@ -0,0 +1,46 @@
+# Utility script to benchmark the cold start import time of the framework modules and the test clients, e.g.
+#
+#   python src/python/scripts/import_time.py -r 5
+#   python src/python/scripts/import_time.py -r 5 -m ten.test.basetest -m web3
+#
+# Each module is imported in a fresh interpreter so that nothing is cached, and the median of the repeats is reported,
+# along with the slowest imports (cumulative time) from the last run as reported by python -X importtime.
+import os, sys, argparse, statistics, subprocess
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+MODULES = ['ten.test.basetest', 'ten.test.baserunner', 'ten.test.utils.crypto', 'ten.test.helpers.json_rpc', 'web3',
+           'eth_account']
+SETUP = ("import pysys.constants; from pysys.xml.project import Project; "
+         "pysys.constants.PROJECT = Project.findAndLoadProject(%r)" % ROOT)
+
+
+def measure(module):
+    """Import a module in a fresh interpreter, returning the list of (cumulative us, module) for each import. """
+    environ = dict(os.environ)
+    environ['PYTHONPATH'] = os.path.join(ROOT, 'src', 'python')
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', '%s; import %s' % (SETUP, module)],
+                            env=environ, cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0: raise Exception('Failed to import %s: %s' % (module, result.stderr.splitlines()[-1]))
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line: continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        imports.append((int(cumulative), name.strip()))
+    return imports
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog='import_time')
+    parser.add_argument('-m', '--module', action='append', help='Module to benchmark (repeatable)')
+    parser.add_argument('-r', '--repeats', type=int, default=3, help='Number of fresh interpreters per module')
+    parser.add_argument('-t', '--top', type=int, default=5, help='Number of slowest imports to show per module')
+    args = parser.parse_args()
+
+    for module in args.module if args.module is not None else MODULES:
+        totals = []
+        for _ in range(0, args.repeats):
+            imports = measure(module)
+            totals.append(next(c for c, n in imports if n == module) / 1e6)
+        print('%-30s median %.3fs (min %.3fs, max %.3fs)' % (module, statistics.median(totals), min(totals), max(totals)))
+        for cumulative, name in sorted(imports, reverse=True)[1:args.top+1]:
+            print('    %-40s %.3fs' % (name, cumulative / 1e6))
@@ -1,9 +1,6 @@
-import os, shutil, sys, json, requests
+import os, shutil, sys, json, hashlib, requests
 from collections import OrderedDict
-from web3 import Web3
 from pathlib import Path
-from eth_account import Account
-from eth_account.messages import encode_typed_data
 from pysys.constants import PROJECT, BACKGROUND
 from pysys.exceptions import AbortExecution
 from pysys.constants import LOG_TRACEBACK
@@ -13,24 +10,32 @@ from ten.test.persistence.funds import FundsPersistence
 from ten.test.persistence.counts import CountsPersistence
 from ten.test.persistence.results import ResultsPersistence
 from ten.test.persistence.contract import ContractPersistence
+from ten.test.helpers.json_rpc import JsonRpcClient
+from ten.test.utils.account_pool import AccountPool
+from ten.test.utils.rpc_metrics import RpcMetrics
+from ten.test.utils.profiling import ProfileReport, MODES
 from ten.test.utils.properties import Properties
+from ten.test.utils import crypto
 
 
 class TenRunnerPlugin():
     """Runner class for running a set of tests against a given environment.
 
     The runner is responsible for starting any applications prior to running the requested tests. When running
-    against Ganache, a local Ganache will be started. All processes started by the runner are automatically stopped
-    when the tests are complete. Note the runner should remain independent to the BaseTest, i.e. is stand alone as
-    much as possible. This is because most of the framework is written to be test centric.
+    against Ganache, a local Ganache will be started, or one per runner thread if run with -XGANACHE_PER_THREAD=true
+    (each thread then has its own chain, port and funded account). A single ganache run in a single thread is
+    snapshot once the common accounts are funded and the shared fixtures deployed, so that tests can revert to it.
+    All processes started by the runner are automatically stopped when the tests are complete. Note the runner
+    should remain independent to the BaseTest, i.e. is stand alone as much as possible. This is because most of the
+    framework is written to be test centric.
     """
-    MSG_ID = 1                      # global used for http message requests numbers
 
     def __init__(self):
         """Constructor. """
         self.env = None
         self.NODE_HOST = None
         self.balances = OrderedDict()
+        self.json_rpc = JsonRpcClient()
 
     def setup(self, runner):
         """Set up a runner plugin to start any processes required to execute the tests. """
@@ -44,12 +49,18 @@ class TenRunnerPlugin():
             runner.log.info('   ten.sim       Ten sim testnet')
             runner.log.info('   arbitrum      Arbitrum Network')
             runner.log.info('   ganache       Ganache Network started by the framework')
+            runner.log.info('   local.inproc  In-process network backed by eth-tester')
             runner.log.info('   sepolia       Sepolia Network')
             sys.exit()
 
         self.env = runner.mode
+        runner.addCleanupFunction(self.json_rpc.close)
         self.NODE_HOST = runner.getXArg('NODE_HOST', '')
         if self.NODE_HOST == '': self.NODE_HOST = None
+        self.GANACHE_PER_THREAD = runner.getXArg('GANACHE_PER_THREAD', False)
+        self.ACCOUNT_POOL_SIZE = runner.getXArg('ACCOUNT_POOL_SIZE', 0)
+        self.ACCOUNT_POOL_TIERS = runner.getXArg('ACCOUNT_POOL_TIERS', '0.001,0.01,0.1')
+        self.PROFILE = runner.getXArg('PROFILE', '')
         runner.output = os.path.join(PROJECT.root, '.runner')
         runner.log.info('Runner is executing against environment %s', self.env)
 
@@ -71,22 +82,25 @@ class TenRunnerPlugin():
         results_db = ResultsPersistence(db_dir)
         results_db.create()
 
-        if self.is_ten() and runner.threads > 3:
-            raise Exception('Max threads against Ten cannot be greater than 3')
-        elif self.env == 'arbitrum.sepolia' and runner.threads > 1:
-            raise Exception('Max threads against Arbitrum cannot be greater than 1')
-        elif self.env == 'ganache' and runner.threads > 3:
-            raise Exception('Max threads against Ganache cannot be greater than 3')
-        elif self.env == 'sepolia' and runner.threads > 1:
-            raise Exception('Max threads against Sepolia cannot be greater than 1')
+        max_threads = Properties().max_threads(self.env)
+        if runner.threads > max_threads:
+            raise Exception('Max threads against %s cannot be greater than %d' % (self.env, max_threads))
+        Properties.Threads = runner.threads
+        Properties.RpcMetrics = RpcMetrics()
+        runner.addCleanupFunction(lambda: self.__rpc_metrics(runner))
+        if self.PROFILE != '':
+            if self.PROFILE not in MODES: raise Exception('Profile mode must be one of %s' % MODES)
+            Properties.ProfileReport = ProfileReport(self.PROFILE)
+            runner.addCleanupFunction(lambda: self.__profile(runner))
 
         try:
             if self.is_ten():
+                from web3 import Web3
                 runner.log.info('Getting and setting the Ten contract addresses')
                 self.__set_contract_addresses(runner)
 
                 props = Properties()
-                account = Web3().eth.account.from_key(props.fundacntpk())
+                account = crypto.account(props.fundacntpk())
                 gateway_url = '%s:%d' % (props.host_http(self.env), props.port_http(self.env))
                 runner.log.info('Joining network using url %s', '%s/v1/join/' % gateway_url)
                 user_id = self.__join('%s/v1/join/' % gateway_url)
@@ -138,10 +152,33 @@ class TenRunnerPlugin():
                         nonce_db.insert(account.address, self.env, tx_count-1, 'RESET')
                 runner.log.info('')
 
+                if self.ACCOUNT_POOL_SIZE > 0:
+                    auth_url = '%s/v1/authenticate/?token=%s' % (gateway_url, user_id)
+                    self.start_account_pool(runner, nonce_db, web3, lambda a: self.__register(a, auth_url, user_id))
+
+            elif self.env == 'local.inproc':
+                from web3 import Web3
+                from ten.test.networks.inproc import InProc, LockedEthereumTesterProvider
+                nonce_db.delete_environment('local.inproc')
+                if self.ACCOUNT_POOL_SIZE > 0:
+                    self.start_account_pool(runner, nonce_db, Web3(LockedEthereumTesterProvider(InProc.tester())))
+
             elif self.env == 'ganache':
                 nonce_db.delete_environment('ganache')
-                hprocess = self.run_ganache(runner)
-                runner.addCleanupFunction(lambda: self.__stop_process(hprocess))
+                if self.GANACHE_PER_THREAD:
+                    Properties.GanachePorts = {}
+                    for num in range(1, runner.threads + 1):
+                        hprocess = self.run_ganache(runner, num)
+                        runner.addCleanupFunction(lambda hprocess=hprocess: self.__stop_process(hprocess))
+                else:
+                    hprocess = self.run_ganache(runner)
+                    runner.addCleanupFunction(lambda: self.__stop_process(hprocess))
+                    self.snapshot_ganache(runner, nonce_db, contracts_db)
+                    if self.ACCOUNT_POOL_SIZE > 0:
+                        from web3 import Web3
+                        props = Properties()
+                        url = '%s:%d' % (props.host_http('ganache'), props.port_http('ganache'))
+                        self.start_account_pool(runner, nonce_db, Web3(Web3.HTTPProvider(url)))
 
         except AbortExecution as e:
             runner.log.info('Error executing runner plugin startup actions %s', e)
@@ -154,24 +191,129 @@ class TenRunnerPlugin():
         contracts_db.close()
         funds_db.close()
 
-    def run_ganache(self, runner):
-        """Run ganache for use by the tests. """
-        runner.log.info('Starting ganache server to run tests through managed instance')
-        stdout = os.path.join(runner.output, 'ganache.out')
-        stderr = os.path.join(runner.output, 'ganache.err')
-        port = Properties().port_http(key='ganache')
+    def run_ganache(self, runner, num=None):
+        """Run ganache for use by the tests.
+
+        If a runner thread number is given the instance is for the sole use of that thread. It listens on its own port
+        (the configured port for the first thread), and is started with the thread's funded and common accounts
+        already allocated funds, so that no funding transactions are needed prior to running the tests.
+        """
+        props = Properties()
+        name = 'ganache' if num is None else 'ganache_%d' % num
+        runner.log.info('Starting %s server to run tests through managed instance', name)
+        stdout = os.path.join(runner.output, '%s.out' % name)
+        stderr = os.path.join(runner.output, '%s.err' % name)
+        port = props.port_http(key='ganache')
+        if num is not None:
+            if num > 1: port = runner.getNextAvailableTCPPort()
+            Properties.GanachePorts[num] = port
 
         arguments = []
         arguments.extend(('--port', str(port)))
-        arguments.extend(('--account', '0x%s,50000000000000000000' % Properties().fundacntpk()))
-        arguments.extend(('--blockTime', Properties().block_time_secs(self.env)))
-        hprocess = runner.startProcess(command=Properties().ganache_binary(), displayName='ganache',
+        arguments.extend(('--account', '0x%s,50000000000000000000' % props.fundacntpk(num)))
+        if num is not None:
+            from ten.test.networks.ganache import Ganache
+            value = crypto.to_wei(10*Ganache.ETH_ALLOC, 'ether')
+            for i in range(1, 5):
+                arguments.extend(('--account', '0x%s,%d' % (props.account_pk(i, num), value)))
+        arguments.extend(('--blockTime', props.block_time_secs(self.env)))
+        hprocess = runner.startProcess(command=props.ganache_binary(), displayName=name,
                                        workingDir=runner.output, environs=os.environ, quiet=True,
                                        arguments=arguments, stdout=stdout, stderr=stderr, state=BACKGROUND)
 
         runner.waitForSignal(stdout, expr='Listening on 127.0.0.1:%d' % port, timeout=30)
         return hprocess
 
+    def snapshot_ganache(self, runner, nonce_db, contracts_db):
+        """Fund the common accounts and deploy the shared fixtures on ganache, and snapshot the chain for reverts.
+
+        All transfers are sent before waiting on the receipts so that they are mined together. The nonces used are
+        persisted so that they are rewound along with the chain should a test revert to the snapshot. As reverting
+        changes the chain for all tests the snapshot is only taken when running in a single thread, so that tests
+        running with more threads are not able to revert.
+        """
+        from web3 import Web3
+        from ten.test.networks.ganache import Ganache
+        props = Properties()
+        web3 = Web3(Web3.HTTPProvider('%s:%d' % (props.host_http('ganache'), props.port_http('ganache'))))
+        account = web3.eth.account.from_key(props.fundacntpk())
+        addresses = []
+        for fn in props.accounts():
+            address = web3.eth.account.from_key(fn()).address
+            if address != account.address and address not in addresses: addresses.append(address)
+
+        runner.log.info('Funding %d accounts on ganache prior to snapshot', len(addresses))
+        gas_price = web3.eth.gas_price
+        value = web3.to_wei(10*Ganache.ETH_ALLOC, 'ether')
+        chain_id = web3.eth.chain_id
+        nonce = web3.eth.get_transaction_count(account.address)
+        tx_hashes = []
+        for address in addresses:
+            tx = {'to': address, 'value': value, 'gas': 21000, 'gasPrice': gas_price, 'nonce': nonce,
+                  'chainId': chain_id}
+            tx_hashes.append(web3.eth.send_raw_transaction(account.sign_transaction(tx).rawTransaction))
+            nonce_db.insert(account.address, self.env, nonce, 'CONFIRMED')
+            nonce = nonce + 1
+        for tx_hash in tx_hashes: web3.eth.wait_for_transaction_receipt(tx_hash, timeout=30)
+        self.deploy_fixtures(runner, web3, account, nonce, nonce_db, contracts_db)
+
+        if runner.threads > 1:
+            runner.log.info('Snapshot of ganache not taken as running with %d threads', runner.threads)
+            return
+        Properties.GanacheSnapshot = (Ganache.snapshot(web3), nonce_db.get_latest_nonces(self.env))
+        runner.log.info('Snapshot of ganache taken with id %s', Properties.GanacheSnapshot[0])
+
+    def deploy_fixtures(self, runner, web3, account, nonce, nonce_db, contracts_db):
+        """Deploy the contracts shared across tests, persisting them so that tests get rather than deploy them.
+
+        Contracts are compiled against a stand in for the test, and their abi written to the runner output.
+        """
+        from types import SimpleNamespace
+        from ten.test.contracts.disperse import Disperse
+        fixture = SimpleNamespace(output=runner.output, log=runner.log)
+        for cls in [Disperse]:
+            runner.log.info('Deploying %s contract prior to snapshot', cls.CONTRACT)
+            contract = cls(fixture, web3)
+            tx = contract.contract.build_transaction({'from': account.address, 'nonce': nonce, 'gas': cls.GAS_LIMIT,
+                                                      'gasPrice': web3.eth.gas_price, 'chainId': web3.eth.chain_id})
+            tx_hash = web3.eth.send_raw_transaction(account.sign_transaction(tx).rawTransaction)
+            tx_receipt = web3.eth.wait_for_transaction_receipt(tx_hash, timeout=30)
+            nonce_db.insert(account.address, self.env, nonce, 'CONFIRMED')
+            nonce = nonce + 1
+            if tx_receipt.status != 1:
+                runner.log.warn('Deployment of %s contract failed, tests will deploy it', cls.CONTRACT)
+                continue
+            contracts_db.insert_contract(cls.CONTRACT, self.env, tx_receipt.contractAddress, json.dumps(contract.abi))
+
+    def start_account_pool(self, runner, nonce_db, web3, register=None):
+        """Start the pool of pre-funded ephemeral accounts for use by the tests.
+
+        The pool is funded from a dedicated account, derived from the funded account key, which is itself funded with
+        enough for the pool to be filled twice over. Any funds left in the pool accounts are returned to the funded
+        account when the runner is cleaned up.
+        """
+        props = Properties()
+        tiers = [float(tier) for tier in self.ACCOUNT_POOL_TIERS.split(',')]
+        account = web3.eth.account.from_key(props.fundacntpk())
+        funder = web3.eth.account.from_key(hashlib.sha256(('%s:pool' % props.fundacntpk()).encode('utf-8')).hexdigest())
+        if register is not None: register(funder)
+
+        runner.log.info('Funding account pool of %d accounts for tiers %s ETH', self.ACCOUNT_POOL_SIZE, tiers)
+        persisted = nonce_db.get_latest_nonce(account.address, self.env)
+        nonce = 0 if persisted is None else persisted + 1
+        tx = {'to': funder.address, 'value': web3.to_wei(2 * self.ACCOUNT_POOL_SIZE * sum(tiers), 'ether'),
+              'gasPrice': web3.eth.gas_price, 'nonce': nonce, 'chainId': web3.eth.chain_id}
+        tx['gas'] = web3.eth.estimate_gas({'from': account.address, 'to': funder.address, 'value': tx['value']})
+        nonce_db.insert(account.address, self.env, nonce, 'SIGNED')
+        tx_hash = web3.eth.send_raw_transaction(account.sign_transaction(tx).rawTransaction)
+        tx_receipt = web3.eth.wait_for_transaction_receipt(tx_hash, timeout=60)
+        nonce_db.update(account.address, self.env, nonce, 'CONFIRMED' if tx_receipt.status == 1 else 'FAILED')
+
+        pool = AccountPool(web3, funder, tiers, self.ACCOUNT_POOL_SIZE, runner.log)
+        pool.start()
+        Properties.AccountPool = pool
+        runner.addCleanupFunction(lambda: pool.close(account.address))
+
     def run_wallet(self, runner):
         """Run a single wallet extension for use by the tests. """
         runner.log.info('Starting wallet extension to run tests')
@@ -209,7 +351,7 @@ class TenRunnerPlugin():
 
     def fund_eth_from_faucet_server(self, runner):
         """Allocates native ETH to a users account from the faucet server. """
-        account = Web3().eth.account.from_key(Properties().fundacntpk())
+        account = crypto.account(Properties().fundacntpk())
         url = '%s/fund/eth' % Properties().faucet_url(self.env)
         runner.log.info('Running request on %s', url)
         runner.log.info('Running for user address %s', account.address)
@@ -232,12 +374,23 @@ class TenRunnerPlugin():
 
             sign = '-' if delta < 0 else ''
             runner.log.info(' ')
-            runner.log.info("  %s: %s%d Wei", 'Total cost', sign, Web3().to_wei(abs(delta), 'ether'),
+            runner.log.info("  %s: %s%d Wei", 'Total cost', sign, crypto.to_wei(abs(delta), 'ether'),
                             extra=BaseLogFormatter.tag(LOG_TRACEBACK, 0))
             runner.log.info("  %s: %s%.9f ETH", 'Total cost', sign, abs(delta), extra=BaseLogFormatter.tag(LOG_TRACEBACK, 0))
         except Exception as e:
             pass
 
+    def __rpc_metrics(self, runner):
+        """Write out the run level json rpc metrics and log the methods taking the most time. """
+        Properties.RpcMetrics.write(os.path.join(runner.output, 'rpc_metrics.json'))
+        runner.log.info(' ')
+        Properties.RpcMetrics.log_summary(runner.log, num=10, extra=BaseLogFormatter.tag(LOG_TRACEBACK, 0))
+
+    def __profile(self, runner):
+        """Write out the run level hot function report and collapsed stacks merged across the tests. """
+        Properties.ProfileReport.write(runner.output)
+        runner.log.info('Merged profile of the run written to %s', os.path.join(runner.output, 'profile.txt'))
+
     @staticmethod
     def __stop_process(hprocess):
         """Stop a process started by this runner plugin. """
@@ -251,6 +404,8 @@ class TenRunnerPlugin():
 
     def __register(self, account, url, user_id):
         """Authenticate a user against the token. """
+        from eth_account import Account
+        from eth_account.messages import encode_typed_data
         domain = {'name': 'Ten', 'version': '1.0', 'chainId': Properties().chain_id(self.env)}
         types = {
             'Authentication': [
@@ -269,7 +424,7 @@ class TenRunnerPlugin():
 
     def __set_contract_addresses(self, runner):
         """Get the contract addresses and set into the properties. """
-        data = {"jsonrpc": "2.0", "method": "obscuro_config", "id": self.MSG_ID}
+        data = {"jsonrpc": "2.0", "method": "obscuro_config"}
         response = self.post(runner, data)
         if 'result' in response.json():
             config = response.json()['result']
@@ -289,6 +444,5 @@ class TenRunnerPlugin():
         return contracts[key] if key in contracts else None
 
     def post(self, runner, data):
-        self.MSG_ID += 1
         server = 'http://%s:%s' % (Properties().node_host(self.env, self.NODE_HOST), Properties().node_port_http(self.env))
-        return requests.post(server, json=data)
+        return self.json_rpc.post(data, server)
@@ -1,6 +1,5 @@
-import os, copy, sys, json, base64, re
-import threading, requests
-from web3 import Web3
+import os, copy, sys, json, base64, secrets
+import threading
 from pathlib import Path
 from pysys.basetest import BaseTest
 from pysys.constants import PROJECT, BACKGROUND, FAILED
@@ -11,19 +10,29 @@ from ten.test.persistence.funds import FundsPersistence
 from ten.test.persistence.counts import CountsPersistence
 from ten.test.persistence.results import ResultsPersistence
 from ten.test.persistence.contract import ContractPersistence
+from ten.test.contracts.disperse import Disperse
+from ten.test.helpers.scan_client import ScanClient
+from ten.test.helpers.json_rpc import JsonRpcClient, JsonRpcError, JsonRpcTransportError
+from ten.test.load.barrier import StartBarrier
+from ten.test.load.metrics import LiveMetrics
 from ten.test.utils.properties import Properties
-from ten.test.networks.default import DefaultPostLondon
-from ten.test.networks.ganache import Ganache
-from ten.test.networks.goerli import Goerli
-from ten.test.networks.arbitrum import ArbitrumSepolia
-from ten.test.networks.sepolia import Sepolia
-from ten.test.networks.ten import Ten, TenL1Geth, TenL1Sepolia
+from ten.test.utils import crypto
+from ten.test.utils.accounting import CostAccounting
+from ten.test.utils.rpc_metrics import RpcMetrics
+from ten.test.utils.profiling import Profiler
+from ten.test.utils.scheduler import EXCLUSIVE_LOCK, fixture_lock
+from ten.test.utils.log_scanner import LogScanner
 
 
 class GenericNetworkTest(BaseTest):
     """The base test used by all tests cases, against any request environment. """
-    MSG_ID = 1                      # global used for http message requests numbers
     NODE_HOST = None                # if not none overrides the node host from the properties file
+    COST_BALANCE_CHECK = False      # if true cross-check the test cost against the balances of the accounts
+    FIXTURES = []                   # names of shared fixtures used by the test, e.g. contracts, for scheduling
+    EXCLUSIVE = False               # if true the test needs exclusive access to the network, so is run serially
+    RPC_METRICS_TOP = 5             # the number of json rpc methods to summarise at the end of the test
+    PROFILE = ''                    # if cpu or wall profile the execute and validate methods of the test
+    PROFILE_CLIENTS = False         # if true and profiling also profile the python clients run by the test
 
     def __init__(self, descriptor, outsubdir, runner):
         """Call the parent constructor but set the mode to ten if non is set. """
@@ -32,35 +41,93 @@ class GenericNetworkTest(BaseTest):
         self.block_time = Properties().block_time_secs(self.env)
         self.log.info('Running test in thread %s', threading.currentThread().getName())
 
-        # every test has its own connection to the nonce and contract db
-        db_dir = os.path.join(str(Path.home()), '.tentest')
-        self.nonce_db = NoncePersistence(db_dir)
-        self.contract_db = ContractPersistence(db_dir)
-        self.funds_db = FundsPersistence(db_dir)
-        self.counts_db = CountsPersistence(db_dir)
-        self.results_db = ResultsPersistence(db_dir)
-        self.addCleanupFunction(self.close_db)
-
-        # every test has a unique connection for the funded account
-        self.connections = {}
-        self.network_funding = self.get_network_connection()
-        self.balance = 0
-        self.accounts = []
-        self.transfer_costs = []
-
-        for fn in Properties().accounts():
-            web3, account = self.network_funding.connect(self, fn(), check_funds=False, verbose=False)
-            self.accounts.append((web3, account))
-            self.balance = self.balance + web3.eth.get_balance(account.address)
-        self.addCleanupFunction(self.__test_cost)
+        # exclusive tests wait for all others to complete, and hold off any others until they are done, where the
+        # lock is released if the rest of construction fails as the test is then dropped without its cleanup
+        self.exclusive_lock = False
+        if runner.threads > 1:
+            EXCLUSIVE_LOCK.acquire(self.EXCLUSIVE)
+            self.exclusive_lock = True
+            self.addCleanupFunction(self.__release_exclusive_lock)
+            if self.EXCLUSIVE: self.log.info('Test has exclusive access to the network')
+
+        try:
+            # every test has its own connection to the nonce and contract db
+            db_dir = os.path.join(str(Path.home()), '.tentest')
+            self.nonce_db = NoncePersistence(db_dir)
+            self.contract_db = ContractPersistence(db_dir)
+            self.funds_db = FundsPersistence(db_dir)
+            self.counts_db = CountsPersistence(db_dir)
+            self.results_db = ResultsPersistence(db_dir)
+            self.addCleanupFunction(self.close_db)
+
+            # if requested the execute and validate methods are wrapped to run under the profiler
+            self.profiler = None
+            if self.PROFILE != '':
+                self.profiler = Profiler(self, self.PROFILE)
+                self.execute = self.profiler.wrap(self.execute)
+                self.validate = self.profiler.wrap(self.validate)
+                self.addCleanupFunction(self.__profile)
+
+            # every test records the json rpc requests it makes, and has its own client for raw json rpc requests
+            self.rpc_metrics = RpcMetrics()
+            self.addCleanupFunction(self.__rpc_metrics)
+            self.json_rpc = JsonRpcClient(rpc_metrics=self.rpc_metrics)
+            self.addCleanupFunction(self.json_rpc.close)
+
+            # every test has a unique connection for the funded account, and accounts the cost of its transactions
+            self.connections = {}
+            self.cost_accounting = CostAccounting()
+            self.network_funding = self.get_network_connection()
+            self.balance = 0
+            self.accounts = []
+            self.transfer_costs = []
+            self.disperse = None            # the disperse contract, or false once found not to be available
+
+            # the balance of the accounts is only needed to cross-check the accounted cost
+            if self.COST_BALANCE_CHECK:
+                for fn in Properties().accounts():
+                    web3, account = self.network_funding.connect(self, fn(), check_funds=False, verbose=False)
+                    self.accounts.append((web3, account))
+                    self.balance = self.balance + web3.eth.get_balance(account.address)
+            self.addCleanupFunction(self.__test_cost)
+        except BaseException:
+            self.__release_exclusive_lock()
+            raise
+
+    def __release_exclusive_lock(self):
+        """Release the exclusive lock if held by the test. """
+        if self.exclusive_lock:
+            self.exclusive_lock = False
+            EXCLUSIVE_LOCK.release(self.EXCLUSIVE)
 
     def __test_cost(self):
-        balance = 0
-        for web3, account in self.accounts: balance = balance + web3.eth.get_balance(account.address)
-        delta = abs(self.balance - balance)
-        sign = '-' if (self.balance - balance) < 0 else ''
-        self.log.info("  %s: %s%d Wei", 'Test cost', sign, delta, extra=BaseLogFormatter.tag(LOG_TRACEBACK, 0))
-        self.log.info("  %s: %s%.9f ETH", 'Test cost', sign, Web3().from_wei(delta, 'ether'), extra=BaseLogFormatter.tag(LOG_TRACEBACK, 0))
+        tag = BaseLogFormatter.tag(LOG_TRACEBACK, 0)
+        for address, fees, value in self.cost_accounting.accounts():
+            self.log.info("  %s: %s %.9f ETH (value %.9f ETH)", 'Account cost', address,
+                          crypto.from_wei(fees, 'ether'), crypto.from_wei(value, 'ether'), extra=tag)
+        fees = self.cost_accounting.total_fees()
+        value = self.cost_accounting.total_value()
+        self.log.info("  %s: %d Wei", 'Test cost', fees, extra=tag)
+        self.log.info("  %s: %.9f ETH (value %.9f ETH)", 'Test cost', crypto.from_wei(fees, 'ether'),
+                      crypto.from_wei(value, 'ether'), extra=tag)
+
+        if self.COST_BALANCE_CHECK:
+            balance = 0
+            for web3, account in self.accounts: balance = balance + web3.eth.get_balance(account.address)
+            delta = abs(self.balance - balance)
+            sign = '-' if (self.balance - balance) < 0 else ''
+            self.log.info("  %s: %s%d Wei", 'Balance cost', sign, delta, extra=tag)
+            self.log.info("  %s: %s%.9f ETH", 'Balance cost', sign, crypto.from_wei(delta, 'ether'), extra=tag)
+
+    def __rpc_metrics(self):
+        self.rpc_metrics.write(os.path.join(self.output, 'rpc_metrics.json'))
+        self.rpc_metrics.log_summary(self.log, num=self.RPC_METRICS_TOP, extra=BaseLogFormatter.tag(LOG_TRACEBACK, 0))
+        if Properties.RpcMetrics is not None: Properties.RpcMetrics.merge(self.rpc_metrics, self.descriptor.id)
+
+    def __profile(self):
+        profiles, collapsed = self.profiler.write()
+        self.log.info('Profile written to %s', os.path.join(self.output, 'profile.txt'))
+        if Properties.ProfileReport is not None: Properties.ProfileReport.add(profiles, collapsed)
 
     def close_db(self):
         """Close the connection to the nonce database on completion. """
@@ -85,13 +152,65 @@ class GenericNetworkTest(BaseTest):
         arguments = [script]
         if args is not None: arguments.extend(args)
         if workingDir is None: workingDir = self.output
+        if self.profiler is not None and self.PROFILE_CLIENTS:
+            arguments = self.profiler.client_arguments(os.path.join(workingDir, stdout)) + arguments
 
+        # clients can import the framework utilities, e.g. the light-weight crypto helpers, for faster cold starts
         environ = copy.deepcopy(os.environ)
+        python_path = os.path.join(PROJECT.root, 'src', 'python')
+        environ['PYTHONPATH'] = python_path + os.pathsep + environ['PYTHONPATH'] if 'PYTHONPATH' in environ else python_path
         hprocess = self.startProcess(command=sys.executable, displayName='python', workingDir=workingDir,
                                      arguments=arguments, environs=environ, stdout=stdout, stderr=stderr,
                                      state=state, timeout=timeout)
         return hprocess
 
+    def run_load(self, name, network, operation, args=None, operation_args=None, workingDir=None, state=BACKGROUND,
+                 timeout=120):
+        """Run a load client of the ten.test.load package, writing <name>.out and its samples to <name>.log.
+
+        The arguments of the workload, e.g. the private keys and number of iterations, are given in args, and those
+        of the operation in operation_args. When run in the background this waits until the client has started, and
+        where given a start barrier using --barrier it is then waiting to be released. Where given the address of the
+        live metrics using --metrics the client reports its counters to them as it runs.
+        """
+        self.require_connection_url(network)
+        if workingDir is None: workingDir = self.output
+        stdout = os.path.join(workingDir, '%s.out' % name)
+        stderr = os.path.join(workingDir, '%s.err' % name)
+        script = os.path.join(PROJECT.root, 'src', 'python', 'ten', 'test', 'load', '__main__.py')
+        arguments = ['--network_http', network.connection_url(), '--chain_id', '%s' % network.chain_id(),
+                     '--client_name', name]
+        if args is not None: arguments.extend(args)
+        arguments.append(operation)
+        if operation_args is not None: arguments.extend(operation_args)
+        hprocess = self.run_python(script, stdout, stderr, arguments, workingDir=workingDir, state=state,
+                                   timeout=timeout)
+        if state == BACKGROUND: self.waitForSignal(file=stdout, expr='Starting client %s' % name)
+        return hprocess
+
+    def require_connection_url(self, network):
+        """Skip the test if the network has no connection url, e.g. to run clients against it in a separate process. """
+        if not network.HAS_CONNECTION_URL:
+            self.skipTest('Network %s has no connection url for clients in a separate process' %
+                          network.__class__.__name__)
+
+    def start_barrier(self):
+        """Create a start barrier to release load clients at the same instant, closed when the test completes. """
+        barrier = StartBarrier()
+        self.addCleanupFunction(barrier.close)
+        return barrier
+
+    def live_metrics(self, name='live', error_ratio=None, stall=None):
+        """Create the live metrics of load clients, writing the time series to <name>.log and closed on completion.
+
+        Where given an error ratio or a number of seconds without progress the run is marked as aborted on exceeding
+        them, where error() should be used as the errorIf of waitForGrep when waiting for the clients to complete.
+        """
+        path = os.path.join(self.output, '%s.log' % name)
+        metrics = LiveMetrics(self.log, path, error_ratio=error_ratio, stall=stall)
+        self.addCleanupFunction(metrics.close)
+        return metrics
+
     def run_javascript(self, script, stdout, stderr, args=None, workingDir=None, state=BACKGROUND, timeout=120):
         """Run a javascript process. """
         self.log.info('Running javascript %s', os.path.basename(script))
@@ -133,6 +252,50 @@ class GenericNetworkTest(BaseTest):
                           arguments=arguments, environs=environ, stdout=stdout, stderr=stderr,
                           timeout=timeout)
 
+    def revert_to_snapshot(self):
+        """Revert a ganache network to the snapshot taken by the runner once the common accounts were funded.
+
+        The snapshot includes the shared fixtures, e.g. the disperse contract, deployed by the runner. Reverting
+        rewinds the persisted nonces to those at the time of the snapshot, and a new snapshot is taken so that later
+        tests can also revert. As reverting changes the chain for all tests, the runner only takes the snapshot when
+        running in a single thread, i.e. with -n 1. Returns true if the revert was performed.
+        """
+        if self.env != 'ganache' or Properties.GanacheSnapshot is None:
+            self.log.warn('Reverting to a snapshot is only supported on a runner managed ganache in a single thread')
+            return False
+        if Properties.AccountPool is not None:
+            self.log.warn('Reverting to a snapshot is not supported when running with an account pool')
+            return False
+
+        from ten.test.networks.ganache import Ganache
+        snapshot_id, nonces = Properties.GanacheSnapshot
+        web3, _ = self.network_funding.connect(self, Properties().fundacntpk(), check_funds=False, verbose=False)
+        if not Ganache.revert(web3, snapshot_id):
+            self.log.warn('Unable to revert to snapshot with id %s', snapshot_id)
+            return False
+        self.nonce_db.rewind(self.env, nonces)
+        Properties.GanacheSnapshot = (Ganache.snapshot(web3), nonces)
+        if self.COST_BALANCE_CHECK:
+            self.balance = sum([web3.eth.get_balance(account.address) for web3, account in self.accounts])
+        self.log.info('Reverted to snapshot with id %s', snapshot_id)
+        return True
+
+    def acquire_funded_account(self, min_eth, network=None, timeout=0):
+        """Connect to an ephemeral account holding at least the given funds in ether.
+
+        The account is taken from the pool maintained by the runner when running with -XACCOUNT_POOL_SIZE, waiting up
+        to the timeout for the pool to be refilled. Otherwise, or if no pooled account is available, a new account is
+        created and funded from the funded account. Returns the web3 instance and account as for connect.
+        """
+        if network is None: network = self.network_funding
+        private_key = None
+        if Properties.AccountPool is not None: private_key = Properties.AccountPool.acquire(min_eth, timeout)
+        if private_key is not None: return network.connect(self, private_key=private_key, check_funds=False)
+
+        web3, account = network.connect(self, private_key=secrets.token_hex(32), check_funds=False)
+        self.distribute_native(account, min_eth)
+        return web3, account
+
     def distribute_native(self, account, amount, verbose=True):
         """A native transfer of funds from the funded account to another.
 
@@ -151,17 +314,138 @@ class GenericNetworkTest(BaseTest):
         balance_after = web3_pk.eth.get_balance(account_pk.address)
         self.transfer_costs.append((balance_before - web3_pk.to_wei(amount, 'ether') - balance_after))
 
+    def distribute_native_many(self, accounts, amounts, verbose=True):
+        """A native transfer of funds from the funded account to many others.
+
+        Funds are sent via a disperse contract so that many accounts are funded in a single transaction, with the
+        recipients chunked so that each transaction stays within the gas limit. Where the contract is not available
+        on the network the funding falls back to plain transfers, which are all signed and sent before waiting on
+        any of the receipts. The amounts can be a single value in ether used for all accounts, or a list of values
+        aligned to the list of accounts.
+        """
+        if not isinstance(amounts, (list, tuple)): amounts = [amounts] * len(accounts)
+        if len(accounts) != len(amounts): raise ValueError('Number of accounts and amounts must be the same')
+        if len(accounts) == 0: return
+
+        web3_pk, account_pk = self.network_funding.connect(self, Properties().fundacntpk(), check_funds=False, verbose=verbose)
+        values = [web3_pk.to_wei(amount, 'ether') for amount in amounts]
+        gas_price = web3_pk.eth.gas_price
+
+        disperse = self.__get_disperse(web3_pk, account_pk)
+        if disperse is not None:
+            cost = self.__disperse_native(disperse, web3_pk, account_pk, accounts, values, gas_price, verbose)
+            self.transfer_costs.extend([cost // len(accounts)] * len(accounts))
+        else:
+            gas = web3_pk.eth.estimate_gas({'to': accounts[0].address, 'value': values[0], 'gasPrice': gas_price})
+            self.__pipeline_native(web3_pk, account_pk, accounts, values, gas, gas_price, verbose)
+
+    def __get_disperse(self, web3, account):
+        """Get the disperse contract for the funded account, deploying if needed, or None if not available.
+
+        A failed deployment does not record an outcome against the test, as funding falls back to plain transfers,
+        and is remembered so that later calls in the test do not try to deploy it again.
+        """
+        if self.disperse is None:
+            self.disperse = False
+            try:
+                disperse = Disperse(self, web3)
+                with fixture_lock(Disperse.CONTRACT):
+                    address, _ = self.contract_db.get_contract(Disperse.CONTRACT, disperse.environment)
+                    if address is None or web3.eth.get_code(address) == b'':
+                        address = self.__deploy_disperse(disperse, web3, account)
+                        self.contract_db.insert_contract(Disperse.CONTRACT, disperse.environment, address,
+                                                         json.dumps(disperse.abi))
+                disperse.address = address
+                self.disperse = disperse
+            except Exception as e:
+                self.log.warn('Disperse contract is not available, falling back to plain transfers, %s', e)
+        if self.disperse is False: return None
+        return Disperse.clone(web3, account, self.disperse)
+
+    def __deploy_disperse(self, disperse, web3, account):
+        """Deploy the disperse contract returning its address, raising on failure rather than recording an outcome. """
+        network = self.network_funding
+        nonce = network.get_next_nonce(self, web3, account, True, verbose=False)
+        try:
+            tx = network.build_transaction(self, web3, disperse.contract, nonce, account, Disperse.GAS_LIMIT, False)
+            tx_sign = network.sign_transaction(self, tx, nonce, account, True)
+            tx_hash = web3.eth.send_raw_transaction(tx_sign.rawTransaction)
+            tx_recp = web3.eth.wait_for_transaction_receipt(tx_hash, timeout=60)
+        except Exception:
+            self.nonce_db.update(account.address, self.env, nonce, 'TIMEDOUT')
+            raise
+        self.nonce_db.update(account.address, self.env, nonce, 'CONFIRMED' if tx_recp.status == 1 else 'FAILED')
+        if tx_recp.status != 1: raise Exception('deployment failed with tx %s' % tx_hash.hex())
+        self.log.info('Contract %s deployed at %s', Disperse.CONTRACT, tx_recp.contractAddress)
+        return tx_recp.contractAddress
+
+    def __disperse_native(self, disperse, web3, account, accounts, values, gas_price, verbose):
+        """Fund accounts via the disperse contract, chunking so each transaction is within the gas limit.
+
+        Returns the total cost in wei of the gas used by the disperse transactions, across all the recipients.
+        """
+        cost = 0
+        gas_limit = min(Disperse.GAS_LIMIT, int(web3.eth.get_block('latest').gasLimit / 2))
+        chunk = max(1, int(gas_limit / Disperse.GAS_PER_RECIPIENT))
+        for i in range(0, len(accounts), chunk):
+            addresses = [a.address for a in accounts[i:i+chunk]]
+            chunk_values = values[i:i+chunk]
+            if verbose: self.log.info('Dispersing %.6f ETH to %d accounts', web3.from_wei(sum(chunk_values), 'ether'), len(addresses))
+            target = disperse.contract.functions.disperseEther(addresses, chunk_values)
+            tx_recp = self.network_funding.transact(self, web3, target, account,
+                                                    len(addresses) * Disperse.GAS_PER_RECIPIENT, verbose=verbose,
+                                                    value=sum(chunk_values))
+            cost += tx_recp.gasUsed * tx_recp.get('effectiveGasPrice', gas_price)
+        return cost
+
+    def __pipeline_native(self, web3, account, accounts, values, gas, gas_price, verbose):
+        """Fund accounts via plain transfers, sending all transactions before waiting on the receipts. """
+        network = self.network_funding
+        chain_id = web3.eth.chain_id
+        sent = []
+        for recipient, value in zip(accounts, values):
+            if verbose: self.log.info('Sending %.6f ETH to account %s', web3.from_wei(value, 'ether'), recipient.address)
+            nonce = network.get_next_nonce(self, web3, account, True, verbose=False)
+            tx = {'to': recipient.address, 'value': value, 'gasPrice': gas_price, 'gas': gas, 'nonce': nonce,
+                  'chainId': chain_id}
+            tx_sign = network.sign_transaction(self, tx, nonce, account, True)
+            tx_hash = network.send_transaction(self, web3, nonce, account, tx_sign, True, verbose=False)
+            sent.append((tx, nonce, tx_hash))
+
+        for tx, nonce, tx_hash in sent:
+            tx_recp = network.wait_for_transaction(self, web3, nonce, account, tx_hash, True, verbose=False)
+            if tx_recp.status != 1:
+                network.replay_transaction(web3, tx, tx_recp)
+                self.addOutcome(FAILED, abortOnError=True)
+            self.transfer_costs.append(tx_recp.gasUsed * gas_price)
+        if verbose: self.log.info('Funded %d accounts with plain transfers', len(sent))
+
     def drain_native(self, web3, account, network):
-        """A native transfer of all funds from and account to the funded account."""
-        average_cost = int(sum(self.transfer_costs) / len(self.transfer_costs))
+        """A native transfer of all funds from and account to the funded account.
+
+        An account acquired from the account pool is left as is, as the pool reclaims the funds of all the accounts it
+        issued when it is closed at the end of the run. Where no transfers have been made by the test to give their
+        average cost, the gas estimate of the drain itself is used, and ten times the cost is left in the account.
+        """
+        if Properties.AccountPool is not None and Properties.AccountPool.is_issued(account.address):
+            self.log.info('Account %s is from the account pool, funds will be reclaimed by the pool', account.address)
+            return
+
+        fund_address = crypto.address(Properties().fundacntpk())
+        gas_price = web3.eth.gas_price
+        if len(self.transfer_costs) > 0: average_cost = int(sum(self.transfer_costs) / len(self.transfer_costs))
+        else:
+            estimate = web3.eth.estimate_gas({'from': account.address, 'to': fund_address, 'value': 0})
+            average_cost = estimate * gas_price
         balance = web3.eth.get_balance(account.address)
-        amount = web3.eth.get_balance(account.address) - 10*average_cost
+        amount = balance - 10*average_cost
+        if amount <= 0:
+            self.log.info('Account %s balance %d is below the cost to drain it', account.address, balance)
+            return
         self.log.info("Drain account %s of %d (current balance %d)", account.address, amount, balance)
+        self.log.info('Send to address is %s', fund_address)
 
-        address = Web3().eth.account.from_key(Properties().fundacntpk()).address
-        self.log.info('Send to address is %s', address)
-
-        tx = {'to':  address, 'value': amount, 'gasPrice': web3.eth.gas_price}
+        tx = {'to':  fund_address, 'value': amount, 'gasPrice': gas_price}
         tx['gas'] = web3.eth.estimate_gas(tx)
         self.log.info('Gas estimate for drain native is %d', tx['gas'])
         network.tx(self, web3, tx, account, persist_nonce=False)
@@ -210,26 +494,41 @@ class GenericNetworkTest(BaseTest):
         return token.functions.balanceOf(account.address).call()
 
     def get_network_connection(self, name='primary', **kwargs):
-        """Get the network connection."""
+        """Get the network connection.
+
+        The network classes are imported on first use, so only those for the environment being run against are loaded.
+        """
         if self.is_ten():
+            from ten.test.networks.ten import Ten
             return Ten(self, name, **kwargs)
         elif self.env == 'goerli':
+            from ten.test.networks.goerli import Goerli
             return Goerli(self, name, **kwargs)
         elif self.env == 'ganache':
+            from ten.test.networks.ganache import Ganache
             return Ganache(self, name, **kwargs)
+        elif self.env == 'local.inproc':
+            from ten.test.networks.inproc import InProc
+            return InProc(self, name, **kwargs)
         elif self.env == 'arbitrum.sepolia':
+            from ten.test.networks.arbitrum import ArbitrumSepolia
             return ArbitrumSepolia(self, name, **kwargs)
         elif self.env == 'sepolia':
+            from ten.test.networks.sepolia import Sepolia
             return Sepolia(self, name, **kwargs)
 
+        from ten.test.networks.default import DefaultPostLondon
         return DefaultPostLondon(self, name, **kwargs)
 
     def get_l1_network_connection(self, name='primary_l1_connection', **kwargs):
         """Get the layer 1 network connection used by a layer 2."""
         if self.is_ten() and self.env != 'ten.sepolia':
+            from ten.test.networks.ten import TenL1Geth
             return TenL1Geth(self, name, **kwargs)
         elif self.is_ten() and self.env == 'ten.sepolia':
+            from ten.test.networks.ten import TenL1Sepolia
             return TenL1Sepolia(self, name, **kwargs)
+        from ten.test.networks.default import DefaultPostLondon
         return DefaultPostLondon(self, name, **kwargs)
 
 
@@ -240,99 +539,61 @@ class TenNetworkTest(GenericNetworkTest):
     layer2 of an Ten Network.
     """
 
+    def scan_client(self, url=None, **kwargs):
+        """Return a client for iterating over the scan_ api listings, closed on test cleanup. """
+        client = ScanClient(self, url if url is not None else self.node_url(), **kwargs)
+        self.addCleanupFunction(client.close)
+        return client
+
     def scan_get_latest_transactions(self, num):
         """Return the last x number of L2 transactions. @todo """
-        data = {"jsonrpc": "2.0", "method": "scan_getLatestTransactions", "params": [num], "id": self.MSG_ID }
-        response = self.post(data)
-        if 'result' in response.json(): return response.json()['result']
-        elif 'error' in response.json(): self.log.error(response.json()['error']['message'])
-        return None
+        return self.call('scan_getLatestTransactions', [num])
 
     def scan_get_head_rollup_header(self):
         """Get the rollup header of the head rollup. @todo """
-        data = {"jsonrpc": "2.0", "method": "scan_getLatestRollupHeader", "params": [], "id": self.MSG_ID }
-        response = self.post(data)
-        if 'result' in response.json(): return response.json()['result']
-        elif 'error' in response.json(): self.log.error(response.json()['error']['message'])
-        return None
+        return self.call('scan_getLatestRollupHeader')
 
     def scan_get_batch(self, hash):
         """Get the rollup by its hash. @todo """
-        data = {"jsonrpc": "2.0", "method": "scan_getBatch", "params": [hash], "id": self.MSG_ID }
-        response = self.post(data)
-        if 'result' in response.json(): return response.json()['result']
-        elif 'error' in response.json(): self.log.error(response.json()['error']['message'])
-        return None
+        return self.call('scan_getBatch', [hash])
 
     def scan_get_batch_for_transaction(self, tx_hash):
         """Get the rollup for a given L2 transaction. """
-        data = {"jsonrpc": "2.0", "method": "scan_getBatchByTx", "params": [tx_hash], "id": self.MSG_ID }
-        response = self.post(data)
-        if 'result' in response.json(): return response.json()['result']
-        elif 'error' in response.json(): self.log.error(response.json()['error']['message'])
-        return None
+        return self.call('scan_getBatchByTx', [tx_hash])
 
     def scan_get_public_transaction_data(self, offset, size):
         """Return the last x number of L2 transactions. """
         pagination = {"offset": offset, "size": size}
-        data = {"jsonrpc": "2.0", "method": "scan_getPublicTransactionData", "params": [pagination], "id": self.MSG_ID }
-        response = self.post(data)
-        if 'result' in response.json(): return response.json()['result']
-        elif 'error' in response.json(): self.log.error(response.json()['error']['message'])
-        return None
+        return self.call('scan_getPublicTransactionData', [pagination])
 
     def scan_get_latest_rollup_header(self):
         """Get the latest rollup header as part of the scan_ api. @todo """
-        data = {"jsonrpc": "2.0", "method": "scan_getLatestRollupHeader", "params": [], "id": self.MSG_ID }
-        response = self.post(data)
-        if 'result' in response.json(): return response.json()['result']
-        elif 'error' in response.json(): self.log.error(response.json()['error']['message'])
-        return None
+        return self.call('scan_getLatestRollupHeader')
 
     def scan_get_approx_total_transaction_count(self):
         """Get the approx. total transaction count as part of the scan_ api.
 
         Note this an approx count which reduces overhead on the node and therefore should be used with caution.
         If an exact count is used, use the method scan_get_total_transaction_count. """
-        data = {"jsonrpc": "2.0", "method": "scan_getTotalTransactionCount", "params": [], "id": self.MSG_ID }
-        response = self.post(data)
-        if 'result' in response.json(): return response.json()['result']
-        elif 'error' in response.json(): self.log.error(response.json()['error']['message'])
-        return None
+        return self.call('scan_getTotalTransactionCount')
 
     def scan_get_total_transaction_count(self):
         """Get the total transaction count as part of the scan_ api."""
-        data = {"jsonrpc": "2.0", "method": "scan_getTotalTransactionsQuery", "params": [], "id": self.MSG_ID }
-        response = self.post(data)
-        if 'result' in response.json(): return response.json()['result']
-        elif 'error' in response.json(): self.log.error(response.json()['error']['message'])
-        return None
+        return self.call('scan_getTotalTransactionsQuery')
 
     def scan_get_total_contract_count(self):
         """Get the total contract count as part of the scan_ api."""
-        data = {"jsonrpc": "2.0", "method": "scan_getTotalContractCount", "params": [], "id": self.MSG_ID }
-        response = self.post(data)
-        if 'result' in response.json(): return response.json()['result']
-        elif 'error' in response.json(): self.log.error(response.json()['error']['message'])
-        return None
+        return self.call('scan_getTotalContractCount')
 
     def scan_get_batch_listing(self, offset=0, size=10):
         """Get the batch listing as part of the scan_ api."""
         pagination = {"offset": offset, "size": size}
-        data = {"jsonrpc": "2.0", "method": "scan_getBatchListing", "params": [pagination], "id": self.MSG_ID }
-        response = self.post(data)
-        if 'result' in response.json(): return response.json()['result']
-        elif 'error' in response.json(): self.log.error(response.json()['error']['message'])
-        return None
+        return self.call('scan_getBatchListing', [pagination])
 
     def scan_get_block_listing(self, offset=0, size=10):
         """Get the block listing as part of the scan_ api. @todo """
         pagination = {"offset": offset, "size": size}
-        data = {"jsonrpc": "2.0", "method": "scan_getBlockListing", "params": [pagination], "id": self.MSG_ID }
-        response = self.post(data)
-        if 'result' in response.json(): return response.json()['result']
-        elif 'error' in response.json(): self.log.error(response.json()['error']['message'])
-        return None
+        return self.call('scan_getBlockListing', [pagination])
 
     def json_hex_to_obj(self, hex_str):
         """Convert a json hex string to an object. """
@@ -349,13 +610,9 @@ class TenNetworkTest(GenericNetworkTest):
         as value 2 in the network.
         """
         payload = {"address": address, "pagination": {"offset": offset, "size": size}}
-        data = {"jsonrpc": "2.0", "method": "eth_getStorageAt",
-                "params": ["0x0000000000000000000000000000000000000002", json.dumps(payload), None],
-                "id": self.MSG_ID }
-        response = self.post(data, url)
-        if 'result' in response.json(): return self.json_hex_to_obj(response.json()['result'])
-        elif 'error' in response.json(): self.log.error(response.json()['error']['message'])
-        return None
+        params = ["0x0000000000000000000000000000000000000002", json.dumps(payload), None]
+        result = self.call('eth_getStorageAt', params, url)
+        return self.json_hex_to_obj(result) if result is not None else None
 
     def scan_get_transaction(self):
         """Get TX by hash. @todo """
@@ -391,52 +648,42 @@ class TenNetworkTest(GenericNetworkTest):
 
     def get_debug_event_log_relevancy(self, url, address, signature, fromBlock=0, toBlock='latest'):
         """Get the debug_LogVisibility. """
-        data = {"jsonrpc": "2.0",
-                "method": "debug_eventLogRelevancy",
-                "params": [{
-                    "fromBlock":fromBlock,
-                    "toBlock":toBlock,
-                    "address": address,
-                    "topics": [signature]
-                }],
-                "id": self.MSG_ID }
-        response = self.post(data, server=url)
-        if 'result' in response.json(): return response.json()['result']
-        elif 'error' in response.json(): self.log.error(response.json()['error']['message'])
-        return None
+        params = [{"fromBlock": fromBlock, "toBlock": toBlock, "address": address, "topics": [signature]}]
+        return self.call('debug_eventLogRelevancy', params, url)
 
     def obscuro_health(self):
         """Get the debug_LogVisibility. """
-        data = {"jsonrpc": "2.0", "method": "obscuro_health", "id": self.MSG_ID }
-        response = self.post(data)
-        if 'result' in response.json(): return response.json()['result']
-        elif 'error' in response.json(): self.log.error(response.json()['error']['message'])
-        return None
+        return self.call('obscuro_health')
 
     def obscuro_config(self):
         """Get the obscuro_config. """
-        data = {"jsonrpc": "2.0", "method": "obscuro_config", "id": self.MSG_ID }
-        response = self.post(data)
-        if 'result' in response.json(): return response.json()['result']
-        elif 'error' in response.json(): self.log.error(response.json()['error']['message'])
+        return self.call('obscuro_config')
+
+    def node_url(self):
+        """Return the url of the node host. """
+        return 'http://%s:%s' % (Properties().node_host(self.env, self.NODE_HOST), Properties().node_port_http(self.env))
+
+    def call(self, method, params=None, server=None):
+        """Make a json rpc request to the node host, returning the result or None on an error response.
+
+        Transport errors, e.g. where the node cannot be reached, are raised rather than returned as None.
+        """
+        try:
+            return self.json_rpc.call(method, params, server if server else self.node_url())
+        except JsonRpcTransportError:
+            raise
+        except JsonRpcError as e:
+            self.log.error(e.message)
         return None
 
     def post(self, data, server=None):
         """Post to the node host. """
-        self.MSG_ID += 1
-        if not server:
-            server = 'http://%s:%s' % (Properties().node_host(self.env, self.NODE_HOST), Properties().node_port_http(self.env))
-        return requests.post(server, json=data)
+        return self.json_rpc.post(data, server if server else self.node_url())
 
     def ratio_failures(self, file, threshold=0.05):
-        """Search through a log for failure ratios and fail if above a threshold. """
-        ratio = 0
-        regex = re.compile('Ratio failures = (?P<ratio>.*)$', re.M)
-        with open(file, 'r') as fp:
-            for line in fp.readlines():
-                result = regex.search(line)
-                if result is not None:
-                    ratio = float(result.group('ratio'))
+        """Search through a log for the last failure ratio and fail if above a threshold. """
+        match = LogScanner(file, 'Ratio failures = (?P<ratio>.*)$').last()
+        ratio = float(match.group('ratio')) if match is not None else 0
         self.log.info('Ratio of failures is %.2f' % ratio)
         if ratio > threshold: self.addOutcome(FAILED, outcomeReason='Failure ratio > 0.05', abortOnError=False)
-        return ratio
\ No newline at end of file
+        return ratio
@@ -1,10 +1,11 @@
 import json
 from copy import copy
-from solcx import compile_source
 from pysys.constants import *
 from pysys.constants import LOG_WARN
 from pysys.utils.logutils import BaseLogFormatter
 from ten.test.utils.properties import Properties
+from ten.test.utils.scheduler import fixture_lock
+from ten.test.utils.threading import thread_num
 
 
 class DefaultContract:
@@ -34,8 +35,16 @@ class DefaultContract:
         self.args = args
         self.construct()
 
+    @property
+    def environment(self):
+        """The environment the contract is persisted against, which for ganache per thread is that of the chain. """
+        if self.test.env == 'ganache' and Properties.GanachePorts is not None:
+            return 'ganache:%d' % Properties.GanachePorts[thread_num()]
+        return self.test.env
+
     def construct(self):
         """Compile and construct contract instance. """
+        from solcx import compile_source
         with open(self.SOURCE, 'r') as fp:
             compiled_sol = compile_source(source=fp.read(), output_values=['abi', 'bin'],
                                           solc_binary=Properties().solc_binary(),
@@ -61,27 +70,33 @@ class DefaultContract:
         return tx_receipt
 
     def get_or_deploy(self, network, account, persist_nonce=True, timeout=60):
-        """Get the contract from persistence, or deploy if it is not there."""
-        address, abi = self.test.contract_db.get_contract(self.CONTRACT, self.test.env)
-        if address is not None:
-            self.test.log.info('Using pre-deployed contract at address %s', address)
-            if self.web3.eth.get_code(address) == b'':
-                self.test.log.warn('Contract address does not appear to be a deployed contract ... deploying')
-                self.deploy(network, account, persist_nonce=persist_nonce, timeout=timeout)
-                self.test.contract_db.insert_contract(self.CONTRACT, self.test.env, self.address, json.dumps(self.abi))
+        """Get the contract from persistence, or deploy if it is not there.
+
+        Deployment is serialised across the runner threads, so concurrent tests sharing the contract deploy it once.
+        """
+        with fixture_lock(self.CONTRACT):
+            address, abi = self.test.contract_db.get_contract(self.CONTRACT, self.environment)
+            if address is not None:
+                self.test.log.info('Using pre-deployed contract at address %s', address)
+                if self.web3.eth.get_code(address) == b'':
+                    self.test.log.warn('Contract address does not appear to be a deployed contract ... deploying')
+                    self.deploy(network, account, persist_nonce=persist_nonce, timeout=timeout)
+                    self.test.contract_db.insert_contract(self.CONTRACT, self.environment, self.address,
+                                                          json.dumps(self.abi))
+                else:
+                    self.address = address
+                    self.contract = self.web3.eth.contract(address=address, abi=abi)
             else:
-                self.address = address
-                self.contract = self.web3.eth.contract(address=address, abi=abi)
-        else:
-            self.test.log.warn('Contract does not appear to be deployed ... deploying')
-            self.deploy(network, account, persist_nonce=persist_nonce)
-            self.test.contract_db.insert_contract(self.CONTRACT, self.test.env, self.address, json.dumps(self.abi))
+                self.test.log.warn('Contract does not appear to be deployed ... deploying')
+                self.deploy(network, account, persist_nonce=persist_nonce)
+                self.test.contract_db.insert_contract(self.CONTRACT, self.environment, self.address,
+                                                      json.dumps(self.abi))
 
     def set_persisted_param(self, key, value):
         """Persist a parameter value for this contract."""
-        self.test.contract_db.insert_param(self.address, self.test.env, key, value)
+        self.test.contract_db.insert_param(self.address, self.environment, key, value)
 
     def get_persisted_param(self, key, default):
         """Get a persisted parameter for this contract, or return the default if it does not exist."""
-        value = self.test.contract_db.get_param(self.address, self.test.env, key)
+        value = self.test.contract_db.get_param(self.address, self.environment, key)
         return default if value is None else value
\ No newline at end of file
@@ -0,0 +1,8 @@
+from pysys.constants import *
+from ten.test.contracts.default import DefaultContract
+
+
+class Disperse(DefaultContract):
+    SOURCE = os.path.join(PROJECT.root, 'src', 'solidity', 'contracts', 'disperse', 'Disperse.sol')
+    CONTRACT = 'Disperse'
+    GAS_PER_RECIPIENT = 40_000  # upper bound on the gas to transfer value to a single (possibly new) recipient
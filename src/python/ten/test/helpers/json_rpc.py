@@ -0,0 +1,338 @@
+import threading, time, json, asyncio, requests
+from requests.adapters import HTTPAdapter
+
+_LOCK = threading.Lock()
+_ID = 0                         # the last json rpc request id allocated, shared across all clients
+
+
+def next_id():
+    """Return the next json rpc request id, unique across all clients and threads. """
+    global _ID
+    with _LOCK:
+        _ID += 1
+        return _ID
+
+
+class JsonRpcError(Exception):
+    """Returned when a json rpc request returns an error response. """
+    def __init__(self, method, code, message, data=None):
+        super().__init__('%s: %s (code %s)' % (method, message, code))
+        self.method = method
+        self.code = code
+        self.message = message
+        self.data = data
+
+
+class JsonRpcParseError(JsonRpcError):
+    """Returned when the server could not parse the request. """
+    pass
+
+
+class JsonRpcInvalidRequest(JsonRpcError):
+    """Returned when the request is not a valid json rpc request. """
+    pass
+
+
+class JsonRpcMethodNotFound(JsonRpcError):
+    """Returned when the method does not exist or is not available. """
+    pass
+
+
+class JsonRpcInvalidParams(JsonRpcError):
+    """Returned when the parameters of the method are invalid. """
+    pass
+
+
+class JsonRpcInternalError(JsonRpcError):
+    """Returned on an internal error of the server, or any other server defined error. """
+    pass
+
+
+class JsonRpcTransportError(JsonRpcError):
+    """Returned when the request could not be made, or the response was not valid json. """
+    pass
+
+
+ERRORS = {-32700: JsonRpcParseError, -32600: JsonRpcInvalidRequest, -32601: JsonRpcMethodNotFound,
+          -32602: JsonRpcInvalidParams, -32603: JsonRpcInternalError}
+
+
+def to_error(method, error):
+    """Map a json rpc error object to the typed exception for its code. """
+    code = error.get('code')
+    return ERRORS.get(code, JsonRpcInternalError)(method, code, error.get('message'), error.get('data'))
+
+
+class JsonRpcClient:
+    """A client for making raw json rpc requests over http.
+
+    Request ids are allocated atomically across all clients, so a client can be shared across threads. Requests are
+    made over a pooled session so connections to the server are reused. Errors are raised as a JsonRpcError subclass
+    mapped from the error code. Each request records the number of calls, errors, bytes sent and received, and the
+    time taken against its method, which can be read using metrics(), and if given also into an RpcMetrics instance
+    against the connection of the url.
+    """
+
+    def __init__(self, url=None, timeout=30, pool_size=8, rpc_metrics=None):
+        """Create an instance of the client, where the url is the default for requests that do not supply one. """
+        self.url = url
+        self.timeout = timeout
+        self.rpc_metrics = rpc_metrics
+        self.lock = threading.Lock()
+        self.stats = {}             # method to a list of calls, errors, bytes sent, bytes received, total time
+        self.session = requests.Session()
+        self.session.mount('http://', HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size))
+        self.session.mount('https://', HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size))
+
+    def close(self):
+        """Close the underlying session. """
+        self.session.close()
+
+    def post(self, data, url=None):
+        """Post a json rpc request or batch array, returning the http response.
+
+        The id of each request is replaced with one allocated by the client.
+        """
+        entries = data if isinstance(data, list) else [data]
+        for entry in entries: entry['id'] = next_id()
+        method = entries[0]['method'] if len(entries) == 1 else 'batch'
+
+        url = url if url is not None else self.url
+        start = time.perf_counter()
+        try:
+            response = self.session.post(url, json=data, timeout=self.timeout)
+        except requests.RequestException:
+            self.__record(url, method, time.perf_counter() - start, 0, 0, True)
+            raise
+        sent = len(response.request.body) if response.request.body is not None else 0
+        self.__record(url, method, time.perf_counter() - start, sent, len(response.content), not response.ok)
+        return response
+
+    def call(self, method, params=None, url=None):
+        """Make a json rpc request, returning the result or raising a JsonRpcError on an error response. """
+        data = {"jsonrpc": "2.0", "method": method, "params": params if params is not None else []}
+        try:
+            http_response = self.post(data, url)
+            response = http_response.json()
+        except (requests.RequestException, ValueError) as e:
+            raise JsonRpcTransportError(method, None, str(e))
+        if 'error' in response:
+            if http_response.ok: self.__record(url if url is not None else self.url, method, 0, 0, 0, True, count=False)
+            raise to_error(method, response['error'])
+        return response.get('result')
+
+    def batch(self, calls, url=None):
+        """Make a batch json rpc request of a list of (method, params) tuples.
+
+        The results are returned in the order of the calls, where a call that errored is returned as the
+        JsonRpcError rather than being raised, so the remaining results can still be used.
+        """
+        if len(calls) == 0: return []
+        data = [{"jsonrpc": "2.0", "method": method, "params": params} for method, params in calls]
+        try:
+            response = self.post(data, url).json()
+        except (requests.RequestException, ValueError) as e:
+            raise JsonRpcTransportError('batch', None, str(e))
+        if isinstance(response, dict): raise to_error('batch', response.get('error', {}))
+
+        by_id = {entry.get('id'): entry for entry in response}
+        results = []
+        for request in data:
+            entry = by_id.get(request['id'])
+            if entry is None: results.append(JsonRpcTransportError(request['method'], None, 'No response returned'))
+            elif 'error' in entry: results.append(to_error(request['method'], entry['error']))
+            else: results.append(entry.get('result'))
+        return results
+
+    async def call_async(self, method, params=None, url=None):
+        """Make a json rpc request from a coroutine, running the blocking call in the default executor. """
+        return await asyncio.get_running_loop().run_in_executor(None, self.call, method, params, url)
+
+    async def batch_async(self, calls, url=None):
+        """Make a batch json rpc request from a coroutine, running the blocking call in the default executor. """
+        return await asyncio.get_running_loop().run_in_executor(None, self.batch, calls, url)
+
+    def metrics(self):
+        """Return a dictionary of method to the calls, errors, bytes sent and received, and total time in seconds. """
+        with self.lock:
+            return {method: {'calls': s[0], 'errors': s[1], 'bytes_sent': s[2], 'bytes_received': s[3],
+                             'time': s[4]} for method, s in self.stats.items()}
+
+    def __record(self, url, method, duration, sent, received, error, count=True):
+        """Record the metrics of a request against its method. """
+        if self.rpc_metrics is not None:
+            if count: self.rpc_metrics.record(url, method, duration, sent, received, error)
+            else: self.rpc_metrics.record_error(url, method)
+        with self.lock:
+            stats = self.stats.setdefault(method, [0, 0, 0, 0, 0.0])
+            if count: stats[0] += 1
+            if error: stats[1] += 1
+            stats[2] += sent
+            stats[3] += received
+            stats[4] += duration
+
+
+class AsyncJsonRpcClient:
+    """A client for making raw json rpc requests from coroutines, over http or websockets.
+
+    For http urls requests are made over a pooled session with up to pool_size connections to the server. For ws urls
+    requests are multiplexed over a pool of websocket connections, where responses are matched to their request by id,
+    so many requests can be in flight on each connection. The client must be opened within the running event loop
+    before use and closed when done. Errors are raised as for the JsonRpcClient, and the same metrics are recorded.
+    """
+    WS_CONNECTIONS = 4              # the number of websocket connections requests are multiplexed over
+
+    def __init__(self, url, timeout=30, pool_size=64):
+        """Create an instance of the client. """
+        self.url = url
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.web_socket = url.startswith('ws')
+        self.session = None
+        self.connections = []
+        self.readers = []
+        self.pending = {}           # request id to the connection and future of its response over websockets
+        self.next = 0
+        self.stats = {}             # method to a list of calls, errors, bytes sent, bytes received, total time
+
+    async def open(self):
+        """Open the session, and for ws urls the pool of websocket connections. """
+        import aiohttp
+        self.session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=self.pool_size),
+                                             timeout=aiohttp.ClientTimeout(total=self.timeout))
+        if self.web_socket:
+            for _ in range(0, min(self.WS_CONNECTIONS, self.pool_size)):
+                connection = await self.session.ws_connect(self.url, max_msg_size=0)
+                self.connections.append(connection)
+                self.readers.append(asyncio.create_task(self.__read(connection)))
+        return self
+
+    async def close(self):
+        """Close the websocket connections and session. """
+        for connection in self.connections: await connection.close()
+        for reader in self.readers: reader.cancel()
+        if self.session is not None: await self.session.close()
+
+    async def __aenter__(self):
+        return await self.open()
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def post(self, data):
+        """Post a json rpc request or batch array, returning the parsed json response.
+
+        The id of each request is replaced with one allocated by the client.
+        """
+        import aiohttp
+        entries = data if isinstance(data, list) else [data]
+        for entry in entries: entry['id'] = next_id()
+        method = entries[0]['method'] if len(entries) == 1 else 'batch'
+        body = json.dumps(data)
+
+        start = time.perf_counter()
+        try:
+            if self.web_socket:
+                keys = [('batch', e['id']) for e in entries] if isinstance(data, list) else [data['id']]
+                response, received = await self.__exchange(keys, body)
+            else:
+                async with self.session.post(self.url, data=body, headers={'Content-Type': 'application/json'}) as r:
+                    content = await r.read()
+                    received = len(content)
+                    if r.status >= 400 and len(content) == 0: raise ValueError('Http status %d' % r.status)
+                    response = json.loads(content)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            self.__record(method, time.perf_counter() - start, len(body), 0, True)
+            raise JsonRpcTransportError(method, None, str(e) or e.__class__.__name__)
+        self.__record(method, time.perf_counter() - start, len(body), received, False)
+        return response
+
+    async def call(self, method, params=None):
+        """Make a json rpc request, returning the result or raising a JsonRpcError on an error response. """
+        response = await self.post({"jsonrpc": "2.0", "method": method, "params": params if params is not None else []})
+        if 'error' in response:
+            self.__record(method, 0, 0, 0, True, count=False)
+            raise to_error(method, response['error'])
+        return response.get('result')
+
+    async def batch(self, calls):
+        """Make a batch json rpc request of a list of (method, params) tuples.
+
+        The results are returned in the order of the calls, where a call that errored is returned as the
+        JsonRpcError rather than being raised, as for the blocking client.
+        """
+        if len(calls) == 0: return []
+        data = [{"jsonrpc": "2.0", "method": method, "params": params} for method, params in calls]
+        response = await self.post(data)
+        if isinstance(response, dict): raise to_error('batch', response.get('error', {}))
+
+        by_id = {entry.get('id'): entry for entry in response}
+        results = []
+        for request in data:
+            entry = by_id.get(request['id'])
+            if entry is None: results.append(JsonRpcTransportError(request['method'], None, 'No response returned'))
+            elif 'error' in entry: results.append(to_error(request['method'], entry['error']))
+            else: results.append(entry.get('result'))
+        return results
+
+    def metrics(self):
+        """Return a dictionary of method to the calls, errors, bytes sent and received, and total time in seconds. """
+        return {method: {'calls': s[0], 'errors': s[1], 'bytes_sent': s[2], 'bytes_received': s[3],
+                         'time': s[4]} for method, s in self.stats.items()}
+
+    async def __exchange(self, keys, body):
+        """Send a request over the next websocket connection and wait for the response matching any of its keys.
+
+        A batch is keyed by each of its ids, so its response is matched even where some entries have no id.
+        """
+        future = asyncio.get_running_loop().create_future()
+        connection = self.connections[self.next % len(self.connections)]
+        self.next += 1
+        for key in keys: self.pending[key] = (connection, future)
+        try:
+            await connection.send_str(body)
+            response = await asyncio.wait_for(future, self.timeout)
+        finally:
+            for key in keys: self.pending.pop(key, None)
+        return response
+
+    async def __read(self, connection):
+        """Read responses from a websocket connection, completing the future of the request with the same id.
+
+        A response that cannot be matched to a request, as it is not valid json or has no id, e.g. a parse or invalid
+        request error, fails the requests pending on the connection rather than leaving them to time out, as does the
+        connection closing or the reader ending for any other reason.
+        """
+        import aiohttp
+        try:
+            async for message in connection:
+                if message.type != aiohttp.WSMsgType.TEXT: continue
+                try:
+                    response = json.loads(message.data)
+                    if isinstance(response, list): keys = [('batch', e.get('id')) for e in response]
+                    else: keys = [response.get('id')]
+                    keys = [key for key in keys if key is not None and key != ('batch', None)]
+                except (ValueError, TypeError, AttributeError) as e:
+                    self.__fail(connection, 'Invalid response, %s' % e)
+                    continue
+                if len(keys) == 0:
+                    self.__fail(connection, 'Unmatched response %s' % message.data[:256])
+                    continue
+                pending = next((self.pending[key] for key in keys if key in self.pending), None)
+                if pending is not None and not pending[1].done(): pending[1].set_result((response, len(message.data)))
+        finally:
+            self.__fail(connection, 'Websocket connection closed')
+
+    def __fail(self, connection, reason):
+        """Fail the futures of all requests pending on a websocket connection. """
+        for pending_connection, future in list(self.pending.values()):
+            if pending_connection is connection and not future.done(): future.set_exception(ValueError(reason))
+
+    def __record(self, method, duration, sent, received, error, count=True):
+        """Record the metrics of a request against its method. """
+        stats = self.stats.setdefault(method, [0, 0, 0, 0, 0.0])
+        if count: stats[0] += 1
+        if error: stats[1] += 1
+        stats[2] += sent
+        stats[3] += received
+        stats[4] += duration
@@ -17,6 +17,7 @@ class AllEventsLogSubscriber:
 
     def run(self, pk_to_register=None):
         """Run the javascript client event log subscriber."""
+        self.test.require_connection_url(self.network)
         args = []
         args.extend(['--network_ws', self.network.connection_url(web_socket=True)])
         args.extend(['--contract_address', self.contract_address])
@@ -42,6 +43,7 @@ class FilterLogSubscriber:
             network_ws=None, decode_as_stored_event=False):
         """Run the javascript client event log subscriber."""
         if network_ws is None:
+            self.test.require_connection_url(self.network)
             network_ws = self.network.connection_url(web_socket=True)
 
         args = []
@@ -1,7 +1,8 @@
-import os, shutil, re, base64, ast
+import os, shutil, base64, ast
 from web3 import Web3
 from eth_abi.abi import encode
 from pysys.constants import PROJECT
+from ten.test.utils.log_scanner import LogScanner
 
 
 class MerkleTreeHelper:
@@ -76,14 +77,8 @@ class MerkleTreeHelper:
         self.test.run_javascript(script, stdout, stderr, args)
         self.test.waitForGrep(os.path.join(self.test.output, 'merkle.out'), expr='Proof:')
 
-        root = None
-        proof = None
-        regex1 = re.compile('Root: (?P<root>.*)$', re.M)
-        regex2 = re.compile('Proof: (?P<proof>.*)$', re.M)
-        with open(os.path.join(self.test.output, 'merkle.out'), 'r') as fp:
-            for line in fp.readlines():
-                result1 = regex1.search(line)
-                result2 = regex2.search(line)
-                if result1 is not None: root = result1.group('root')
-                if result2 is not None: proof = result2.group('proof')
-        return root, None if proof=='undefined' else proof
\ No newline at end of file
+        patterns = ['Root: (?P<root>.*)$', 'Proof: (?P<proof>.*)$']
+        root, proof = LogScanner(os.path.join(self.test.output, 'merkle.out'), patterns).last_of_each()
+        root = root.group('root') if root is not None else None
+        proof = proof.group('proof') if proof is not None else None
+        return root, None if proof=='undefined' else proof
@@ -0,0 +1,116 @@
+import json
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from ten.test.helpers.json_rpc import JsonRpcClient, JsonRpcError
+
+
+class ScanClient:
+    """A client for the Ten scan_ api, iterating over the paged listings.
+
+    Requests are made through a JsonRpcClient, so connections are pooled and the client can be shared across threads.
+    Listings are returned as generators over the individual entries, where pages ahead of the one being consumed are
+    fetched concurrently up to the prefetch depth. Iteration stops when a page returns fewer entries than the page
+    size, or when the requested limit is reached.
+    """
+
+    def __init__(self, test, url, page_size=100, prefetch=4, timeout=30):
+        """Create an instance of the client for the given node url. """
+        self.test = test
+        self.url = url
+        self.page_size = page_size
+        self.prefetch = max(1, prefetch)
+        self.client = JsonRpcClient(url, timeout=timeout, pool_size=self.prefetch, rpc_metrics=test.rpc_metrics)
+        self.executor = ThreadPoolExecutor(max_workers=self.prefetch)
+
+    def close(self):
+        """Close the client and the prefetch executor. """
+        self.executor.shutdown(wait=False)
+        self.client.close()
+
+    def request(self, method, params=None, url=None):
+        """Make a single json rpc request, returning the result or None on an error. """
+        try:
+            return self.client.call(method, params, url)
+        except JsonRpcError as e:
+            self.test.log.error(e.message)
+        return None
+
+    def batch(self, calls, url=None):
+        """Make a batch json rpc request of a list of (method, params) tuples, returning the results in order.
+
+        Any call that returned an error is logged and returned as None.
+        """
+        results = []
+        for result in self.client.batch(calls, url):
+            if isinstance(result, JsonRpcError):
+                self.test.log.error(result.message)
+                result = None
+            results.append(result)
+        return results
+
+    def public_transactions(self, offset=0, limit=None, size=None):
+        """Iterate over the public transaction data. """
+        fetch = lambda o, s: self.request('scan_getPublicTransactionData', [{"offset": o, "size": s}])
+        return self.__iterate(fetch, 'TransactionsData', offset, limit, size)
+
+    def batches(self, offset=0, limit=None, size=None):
+        """Iterate over the batch listing. """
+        fetch = lambda o, s: self.request('scan_getBatchListing', [{"offset": o, "size": s}])
+        return self.__iterate(fetch, 'BatchesData', offset, limit, size)
+
+    def blocks(self, offset=0, limit=None, size=None):
+        """Iterate over the block listing. """
+        fetch = lambda o, s: self.request('scan_getBlockListing', [{"offset": o, "size": s}])
+        return self.__iterate(fetch, 'BlocksData', offset, limit, size)
+
+    def personal_transactions(self, url, address, offset=0, limit=None, size=None):
+        """Iterate over the personal transactions of an account, where the url is that of the account's gateway.
+
+        See TenNetworkTest.scan_list_personal_transactions for details of how the listing is requested.
+        """
+        def fetch(o, s):
+            payload = {"address": address, "pagination": {"offset": o, "size": s}}
+            params = ["0x0000000000000000000000000000000000000002", json.dumps(payload), None]
+            result = self.request('eth_getStorageAt', params, url=url)
+            if result is None: return None
+            if result.startswith('0x'): result = result[2:]
+            return json.loads(bytes.fromhex(result).decode('utf-8'))
+        return self.__iterate(fetch, 'Receipts', offset, limit, size)
+
+    def get_batches(self, hashes):
+        """Get a list of batches by their hash in a single batch request. """
+        return self.batch([('scan_getBatch', [h]) for h in hashes])
+
+    def get_batches_for_transactions(self, tx_hashes):
+        """Get a list of the batches containing each of a list of transactions in a single batch request. """
+        return self.batch([('scan_getBatchByTx', [h]) for h in tx_hashes])
+
+    def __iterate(self, fetch, key, offset, limit, size):
+        """Generator over the entries of a paged listing, prefetching pages concurrently.
+
+        Pages still pending are cancelled when the generator completes, or is closed where the consumer stops early.
+        """
+        size = size if size is not None else self.page_size
+        end = offset + limit if limit is not None else None
+        pending = deque()
+        next_offset = offset
+
+        def submit():
+            nonlocal next_offset
+            while len(pending) < self.prefetch and (end is None or next_offset < end):
+                page_size = size if end is None else min(size, end - next_offset)
+                pending.append((page_size, self.executor.submit(fetch, next_offset, page_size)))
+                next_offset += page_size
+
+        try:
+            submit()
+            while len(pending) > 0:
+                page_size, future = pending.popleft()
+                result = future.result()
+                entries = result.get(key) if result is not None else None
+                if entries is None: entries = []
+                for entry in entries: yield entry
+                if len(entries) < page_size: break
+                submit()
+        finally:
+            for _, future in pending: future.cancel()
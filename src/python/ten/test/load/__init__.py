@@ -0,0 +1,19 @@
+"""Package of the common load generation workloads and operations.
+
+Load clients are run as a separate process using the single entry point of the package, e.g.
+
+    python -m ten.test.load --network_http <url> --client_name client_0 --pk <pk> -i 1024 --mode bulk transfer
+
+where tests should use run_load() on the base test to launch them. Each client writes its samples to <name>.log in a
+common format, which can be read back using ten.test.load.workload.read_samples(). Workloads run closed loop in bulk
+or loop mode, or open loop at a constant rate where latencies are also recorded corrected for coordinated omission.
+Many clients can be run in the one process as virtual clients of the async engine in ten.test.load.engine, writing
+<name>_<i>.log for each, and fanned out across processes to use all cores. Clients of a test are released at the same
+instant by a start barrier from start_barrier() on the base test, whose release is the start reference of all samples.
+Transactions signed up front are signed by the bulk signer in ten.test.load.signer, which shards signing over processes
+and optionally caches the signed transactions on disk for reuse by repeated runs. Clients report their counters each
+second to the live metrics of the test from live_metrics() on the base test, in ten.test.load.metrics, so a run is
+visible as it progresses and can be aborted early where it is failing or has stalled. The maximum sustainable throughput
+under a latency objective is found by the saturation search in ten.test.load.saturation, which steps and then binary
+searches the offered load of open loop runs.
+"""
@@ -0,0 +1,169 @@
+# The single entry point of the load clients, run as a separate process by a test, e.g.
+#
+#   python -m ten.test.load -u <url> -n client_0 -p <pk> -i 1024 --mode bulk transfer --num_accounts 8
+#   python -m ten.test.load -u <url> -n client_0 -p <pk> -i 8192 --mode bulk --sign_processes 0 transfer
+#   python -m ten.test.load -u <url> -n client_0 -p <pk> -i 2048 get_balance
+#   python -m ten.test.load -u <url> -n client_0 -p <pk> -i 2048 --mode open --rate 50 get_balance
+#   python -m ten.test.load -u <url> -n client -P <pk_file> -i 2048 --clients 200 --processes 4 get_balance
+#
+# The common arguments of the workload are given before the name of the operation, and those specific to the
+# operation after it. The client logs 'Starting client <name>' once prepared to send, waits to be released by the
+# start barrier of the test if given, and logs 'Client <name> completed' once the samples have been written to
+# <name>.log in the working directory. Given a number of clients the async engine is used instead, running virtual
+# clients <name>_0 to <name>_<n-1> in the one process, or fanned out across a number of worker processes, where each
+# writes its samples to <name>_<i>.log. Worker processes are released by a barrier of the parent, which relays the
+# start reference of the barrier of the test so that the samples of all processes share the one timeline. Transactions
+# signed up front can be signed over a number of processes, and cached in a directory to be reused by later runs.
+# Given the host:port of the live metrics of the test, the client reports its counters each second as it runs, e.g.
+#
+#   python -m ten.test.load -u <url> -n client_0 -p <pk> -i 8192 --mode bulk --metrics 127.0.0.1:40123 transfer
+import os, sys, time, logging, argparse, multiprocessing
+from ten.test.helpers.json_rpc import JsonRpcClient
+from ten.test.load.barrier import StartBarrier, BarrierParty
+from ten.test.load.ops import OPERATIONS
+from ten.test.load.metrics import MetricsReporter
+from ten.test.load.signer import BulkSigner
+from ten.test.load.workload import Workload, MODES, ARRIVALS, read_samples, log_failures, log_summary
+from ten.test.utils import crypto
+
+logging.basicConfig(format='%(asctime)s %(levelname)s %(message)s', stream=sys.stdout, level=logging.INFO)
+
+
+def parse_args(argv=None):
+    """Parse the command line arguments of the workload and the operation. """
+    parser = argparse.ArgumentParser(prog='ten.test.load')
+    parser.add_argument('-u', '--network_http', required=True, help='Connection URL')
+    parser.add_argument('-n', '--client_name', required=True, help='The logical name of the client')
+    parser.add_argument('-p', '--pk', action='append', default=[], help='A private key of an account (repeatable)')
+    parser.add_argument('-P', '--pk_file', help='A file containing a list of private keys to use')
+    parser.add_argument('-c', '--chain_id', type=int, help='The network chain id')
+    parser.add_argument('-i', '--num_iterations', type=int, default=0,
+                        help='Number of requests, or zero to run until stopped')
+    parser.add_argument('-m', '--mode', choices=MODES, default='loop', help='The workload mode')
+    parser.add_argument('-d', '--delay', type=float, default=0, help='Delay in seconds between requests in loop mode')
+    parser.add_argument('-t', '--timeout', type=float, default=600, help='Timeout in seconds to wait for receipts')
+    parser.add_argument('-y', '--gas_limit', type=int, help='The gas limit, estimated if not given')
+    parser.add_argument('-z', '--gas_price_ramp', type=float, default=0,
+                        help='Increase the gas price linearly over the iterations by up to this multiple')
+    parser.add_argument('-R', '--rate', type=float, default=0, help='Requests per second in open loop mode')
+    parser.add_argument('-A', '--arrival', choices=ARRIVALS, default='poisson',
+                        help='The inter-arrival times in open loop mode')
+    parser.add_argument('-C', '--concurrency', type=int, default=64,
+                        help='The maximum number of requests in flight in open loop mode')
+    parser.add_argument('-N', '--clients', type=int, default=0,
+                        help='Number of virtual clients to run using the async engine, or zero for a single client')
+    parser.add_argument('-W', '--processes', type=int, default=1,
+                        help='Number of worker processes to fan the virtual clients out over, or zero for all cores')
+    parser.add_argument('-S', '--sign_processes', type=int, default=1,
+                        help='Number of processes to sign transactions up front over, or zero for all cores')
+    parser.add_argument('--sign_cache', help='A directory to cache transactions signed up front in across runs')
+    parser.add_argument('-B', '--barrier', help='The host:port address of the start barrier to wait to be released by')
+    parser.add_argument('-M', '--metrics', help='The host:port address of the live metrics to report to as it runs')
+    subparsers = parser.add_subparsers(dest='operation', required=True, help='The operation to run')
+    for name, operation in OPERATIONS.items():
+        operation.add_arguments(subparsers.add_parser(name, help=operation.__doc__))
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Run a load client. """
+    args = parse_args(argv)
+    pks = list(args.pk)
+    if args.pk_file is not None:
+        with open(args.pk_file) as fp: pks.extend(line.strip() for line in fp if line.strip() != '')
+    if len(pks) == 0: raise ValueError('At least one private key is needed, using --pk or --pk_file')
+    if args.clients > 0: run_clients(args, pks)
+    else: run_client(args, pks)
+    logging.info('Client %s completed', args.client_name)
+    logging.shutdown()
+
+
+def run_client(args, pks):
+    """Run a single client using the blocking workload. """
+    client = JsonRpcClient(args.network_http, pool_size=max(8, args.concurrency))
+    operation = OPERATIONS[args.operation](client, args)
+    workload = Workload(args.client_name, operation, client, [crypto.account(pk) for pk in pks],
+                        args.num_iterations, mode=args.mode, delay=args.delay, timeout=args.timeout,
+                        gas_limit=args.gas_limit, gas_price_ramp=args.gas_price_ramp, chain_id=args.chain_id,
+                        rate=args.rate, arrival=args.arrival, concurrency=args.concurrency,
+                        signer=BulkSigner(args.sign_processes, args.sign_cache), metrics=reporter(args))
+    workload.run(ready=lambda: ready(args))
+    workload.write()
+    client.close()
+
+
+def run_clients(args, pks):
+    """Run a number of virtual clients using the async engine, fanned out over worker processes if requested. """
+    processes = min(args.processes if args.processes > 0 else os.cpu_count(), args.clients)
+    if processes == 1:
+        engine = create_engine(args, pks, range(0, args.clients))
+        engine.run(ready=lambda: ready(args))
+        engine.write()
+        return
+
+    if OPERATIONS[args.operation].TRANSACT and len(pks) < args.clients:
+        raise ValueError('Each virtual client needs its own account to send transactions from many processes')
+    barrier = StartBarrier()
+    workers = [multiprocessing.Process(target=run_worker, name='%s_worker_%d' % (args.client_name, i),
+                                       args=(args, pks, range(i, args.clients, processes), barrier.address))
+               for i in range(0, processes)]
+    for worker in workers: worker.start()
+    if not barrier.wait(processes, timeout=args.timeout):
+        raise TimeoutError('Timed out waiting for the worker processes to be ready')
+    start_ns = ready(args, sleep=False)
+    barrier.release(processes, start_ns=start_ns)
+    for worker in workers: worker.join()
+    barrier.close()
+    failed = [worker.name for worker in workers if worker.exitcode != 0]
+    if len(failed) > 0: logging.error('Worker processes %s exited with an error', ', '.join(failed))
+
+    samples = []
+    for i in range(0, args.clients):
+        path = '%s_%d.log' % (args.client_name, i)
+        if os.path.exists(path): samples.extend(read_samples(path))
+        else: logging.error('No samples written for virtual client %d', i)
+    log_failures(samples)
+    log_summary(samples, corrected=args.mode == 'open')
+
+
+def run_worker(args, pks, client_ids, address):
+    """Run a share of the virtual clients in a worker process, once released by the barrier of the parent. """
+    engine = create_engine(args, pks, client_ids)
+    engine.run(ready=lambda: BarrierParty(address, multiprocessing.current_process().name).wait())
+    engine.write()
+
+
+def create_engine(args, pks, client_ids):
+    """Create the async engine for the virtual clients with the given ids. """
+    from ten.test.load.engine import Engine
+    operation = OPERATIONS[args.operation](None, args)
+    return Engine(args.client_name, operation, args.network_http, [crypto.account(pk) for pk in pks], client_ids,
+                  args.num_iterations, mode=args.mode, delay=args.delay, timeout=args.timeout,
+                  gas_limit=args.gas_limit, gas_price_ramp=args.gas_price_ramp, chain_id=args.chain_id,
+                  rate=args.rate, arrival=args.arrival, concurrency=args.concurrency,
+                  signer=BulkSigner(args.sign_processes, args.sign_cache), metrics=reporter(args))
+
+
+def reporter(args):
+    """Return the reporter of live metrics if given, named after the client or the worker process it is run in. """
+    if args.metrics is None: return None
+    process = multiprocessing.current_process()
+    name = args.client_name if process.name == 'MainProcess' else process.name
+    return MetricsReporter(args.metrics, name)
+
+
+def ready(args, sleep=True):
+    """Log the client is starting and wait to be released by the start barrier if given, returning the start reference.
+
+    Where sleep is false the start reference is returned as soon as the release is received rather than at its instant.
+    """
+    party = BarrierParty(args.barrier, args.client_name) if args.barrier is not None else None
+    logging.info('Starting client %s', args.client_name)
+    if party is None: return time.perf_counter_ns()
+    start_ns = party.wait(sleep)
+    logging.info('Released ... running client %s', args.client_name)
+    return start_ns
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import time, socket, logging, threading
+
+LEAD = 0.05                     # the time in seconds ahead that a release is scheduled for, to reach all parties
+ROUNDS = 16                     # the number of round trips of the clock offset handshake
+SPIN = 0.002                    # the time in seconds before a release after which a party spins rather than sleeps
+
+
+class StartBarrier:
+    """A barrier to release the load clients of a test at the same instant, on the timeline of the test.
+
+    The barrier listens on a local socket, where each party connects, estimates the offset of its perf_counter_ns clock
+    from that of the test using a number of round trips taking the one with the lowest round trip time, and then
+    reports it is ready. A release is scheduled for a short time ahead and sent to all ready parties, which each wait
+    until that instant as converted to their own clock, so they are released within a fraction of a millisecond of
+    each other regardless of how long the release takes to send. The instant of the release is returned as the start
+    reference of the test, and is the start reference of the samples of all parties, so their timelines align.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0):
+        """Create the barrier listening on a host and port, by default an ephemeral port on the local host. """
+        self.server = socket.create_server((host, port))
+        self.condition = threading.Condition()
+        self.ready = []             # the connections of the parties that are ready to be released
+        self.connections = []
+        self.closed = False
+        self.thread = threading.Thread(target=self.__accept, name='start_barrier', daemon=True)
+        self.thread.start()
+
+    @property
+    def address(self):
+        """The host:port address of the barrier for parties to connect to. """
+        host, port = self.server.getsockname()[0:2]
+        return '%s:%d' % (host, port)
+
+    def wait(self, parties, timeout=60):
+        """Wait until a number of parties are ready, returning true if they are before the timeout. """
+        with self.condition:
+            return self.condition.wait_for(lambda: len(self.ready) >= parties, timeout)
+
+    def release(self, parties=None, timeout=60, lead=LEAD, start_ns=None):
+        """Release all ready parties, optionally after waiting for a number to be ready, returning the start reference.
+
+        The start reference is the instant of the release as perf_counter_ns of the calling process, which is a lead
+        time ahead unless given, e.g. where relaying the release of another barrier.
+        """
+        if parties is not None and not self.wait(parties, timeout):
+            raise TimeoutError('Timed out waiting for %d parties to be ready at the start barrier' % parties)
+        with self.condition:
+            if start_ns is None: start_ns = time.perf_counter_ns() + int(lead * 1e9)
+            for connection in self.ready:
+                try:
+                    connection.sendall(b'go %d\n' % start_ns)
+                except OSError as e:
+                    logging.error('Error releasing party at the start barrier, %s', e)
+            self.ready = []
+        while time.perf_counter_ns() < start_ns: time.sleep(SPIN / 10)
+        return start_ns
+
+    def close(self):
+        """Close the barrier and the connections of all parties. """
+        self.closed = True
+        self.server.close()
+        for connection in self.connections: connection.close()
+
+    def __accept(self):
+        """Accept connections from parties, handling each in its own thread. """
+        while not self.closed:
+            try:
+                connection, _ = self.server.accept()
+            except OSError:
+                return
+            connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.connections.append(connection)
+            threading.Thread(target=self.__handle, args=(connection,), name='start_barrier_party', daemon=True).start()
+
+    def __handle(self, connection):
+        """Reply to the clock requests of a party until it reports it is ready. """
+        reader = connection.makefile('rb')
+        for line in reader:
+            command = line.split()
+            if len(command) == 0: continue
+            if command[0] == b'time': connection.sendall(b'%d\n' % time.perf_counter_ns())
+            elif command[0] == b'ready':
+                logging.debug('Party %s ready with clock offset %s ns and round trip %s ns', command[1].decode(),
+                              command[2].decode(), command[3].decode())
+                with self.condition:
+                    self.ready.append(connection)
+                    self.condition.notify_all()
+                return
+
+
+class BarrierParty:
+    """A party of a start barrier, as used by a load client to wait to be released. """
+
+    def __init__(self, address, name):
+        """Connect to the barrier at a host:port address, estimating the offset of the local clock from it.
+
+        The offset is the barrier clock less the local clock, estimated as the barrier time of the round trip with the
+        lowest round trip time less the local time at the middle of it.
+        """
+        host, port = address.rsplit(':', 1)
+        self.name = name
+        self.connection = socket.create_connection((host, int(port)))
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.reader = self.connection.makefile('rb')
+        self.rtt = None
+        self.offset = 0
+        for _ in range(0, ROUNDS):
+            sent = time.perf_counter_ns()
+            self.connection.sendall(b'time\n')
+            remote = int(self.reader.readline())
+            received = time.perf_counter_ns()
+            if self.rtt is None or received - sent < self.rtt:
+                self.rtt = received - sent
+                self.offset = remote - (sent + received) // 2
+
+    def wait(self, sleep=True):
+        """Report ready and wait to be released, returning the start reference as local perf_counter_ns.
+
+        Unless sleep is false this returns at the instant of the release rather than as soon as it is received.
+        """
+        self.connection.sendall(b'ready %s %d %d\n' % (self.name.encode(), self.offset, self.rtt))
+        line = self.reader.readline().split()
+        self.connection.close()
+        if len(line) != 2 or line[0] != b'go': raise ConnectionError('Start barrier closed before the release')
+        start_ns = int(line[1]) - self.offset
+        while sleep:
+            remaining = (start_ns - time.perf_counter_ns()) / 1e9
+            if remaining <= 0: break
+            time.sleep(remaining - SPIN if remaining > SPIN else 0)
+        return start_ns
@@ -0,0 +1,303 @@
+import time, random, asyncio, logging, itertools
+from ten.test.helpers.json_rpc import AsyncJsonRpcClient, JsonRpcError
+from ten.test.load.signer import BulkSigner
+from ten.test.load.workload import Sample, MODES, ARRIVALS, arrival_times, log_failures, log_summary, write_samples
+from ten.test.load.workload import latency_histogram, report
+
+
+class VirtualClient:
+    """A virtual client of the engine, making its requests from a single account and recording its own samples. """
+    __slots__ = ['name', 'account', 'signed', 'samples']
+
+    def __init__(self, name, account):
+        """Instantiate an instance. """
+        self.name = name
+        self.account = account
+        self.signed = None
+        self.samples = []
+
+
+class Engine:
+    """An asyncio load engine running many virtual clients of an operation in a single process.
+
+    Each virtual client behaves as a client of the blocking workload with a single account, and runs in loop, bulk or
+    open loop mode in the same way, though open loop rates are per virtual client. All virtual clients share a pooled
+    async json rpc client over http or websockets, so the number of clients is limited by the network rather than by
+    the overhead of an interpreter per client. Virtual client i is named <name>_<i> and uses account i modulo the
+    number of accounts, where nonces are allocated from a lane per account, so accounts can be shared by clients in the
+    same process but not across processes. The ids of the virtual clients to run are given so that clients can be
+    fanned out across processes. Each virtual client writes its samples to <name>_<i>.log and its latency histogram to
+    <name>_<i>.hdr. As for the workload, an optional ready function is called once prepared to send to return the start
+    reference, and is run in an executor so as not to block the event loop.
+    """
+    POLL_INTERVAL = 0.1             # interval in seconds to poll for transaction receipts
+    PROGRESS_INTERVAL = 10          # interval in seconds to log the progress of the virtual clients
+    BATCH_SIZE = 100                # the maximum number of requests in a batch for receipts and blocks
+
+    def __init__(self, name, operation, url, accounts, client_ids, iterations, mode='loop', delay=0, timeout=600,
+                 gas_limit=None, gas_price_ramp=0, chain_id=None, rate=0, arrival='poisson', concurrency=64,
+                 signer=None, metrics=None):
+        """Instantiate an instance.
+
+        :param name: The logical name of the engine, used as the prefix of the names of the virtual clients
+        :param operation: The operation to run
+        :param url: The url of the network, over http or websockets
+        :param accounts: The list of local accounts, where virtual clients use them round robin by id
+        :param client_ids: The ids of the virtual clients to run
+        :param iterations: The number of requests per virtual client, or zero to run until stopped in loop mode
+        :param concurrency: The size of the connection pool of the async client
+        The remaining parameters are as for the Workload.
+        """
+        if mode not in MODES: raise ValueError('Unknown workload mode %s, must be one of %s' % (mode, MODES))
+        if mode == 'bulk' and not operation.TRANSACT: raise ValueError('Bulk mode is only for transaction operations')
+        if mode == 'open' and rate <= 0: raise ValueError('Open loop mode needs a rate greater than zero')
+        if mode != 'loop' and iterations == 0:
+            raise ValueError('%s mode needs a number of iterations' % mode.capitalize())
+        if arrival not in ARRIVALS: raise ValueError('Unknown arrival %s, must be one of %s' % (arrival, ARRIVALS))
+        self.name = name
+        self.operation = operation
+        self.url = url
+        self.accounts = accounts
+        self.clients = [VirtualClient('%s_%d' % (name, i), accounts[i % len(accounts)]) for i in client_ids]
+        self.iterations = iterations
+        self.mode = mode
+        self.delay = delay
+        self.timeout = timeout
+        self.gas_limit = gas_limit
+        self.gas_price_ramp = gas_price_ramp
+        self.chain_id = chain_id
+        self.start_ns = None
+        self.rate = rate
+        self.arrival = arrival
+        self.concurrency = concurrency
+        self.signer = signer if signer is not None else BulkSigner()
+        self.metrics = metrics
+        self.client = None
+        self.gas_price = 0
+        self.nonces = {}
+
+    @property
+    def samples(self):
+        """The samples of all virtual clients. """
+        return [sample for client in self.clients for sample in client.samples]
+
+    def run(self, ready=None):
+        """Run the virtual clients to completion in a new event loop. """
+        asyncio.run(self.run_async(ready))
+
+    async def run_async(self, ready=None):
+        """Run the virtual clients to completion in the running event loop.
+
+        :param ready: A function called once prepared to send, returning the start reference as perf_counter_ns
+        """
+        self.operation.setup(self.accounts)
+        async with AsyncJsonRpcClient(self.url, timeout=self.timeout, pool_size=self.concurrency) as client:
+            self.client = client
+            if self.operation.TRANSACT: await self.__setup_transactions()
+            if self.operation.TRANSACT and self.mode != 'loop':
+                logging.info('Creating and signing %d transactions', self.iterations * len(self.clients))
+                # sign by iteration across the clients so clients sharing an account send nonces close in order,
+                # and off the event loop as signing in bulk can take a while
+                txs = [(vc, self.__transaction(vc, index))
+                       for index in range(0, self.iterations) for vc in self.clients]
+                signed = await asyncio.get_running_loop().run_in_executor(
+                    None, self.signer.sign, [(vc.account.key, tx) for vc, tx in txs])
+                for vc in self.clients: vc.signed = []
+                for (vc, _), tx in zip(txs, signed): vc.signed.append(tx)
+
+            if ready is not None: self.start_ns = await asyncio.get_running_loop().run_in_executor(None, ready)
+            else: self.start_ns = time.perf_counter_ns()
+            logging.info('Running %d virtual clients in %s mode', len(self.clients), self.mode)
+            if self.metrics is not None: self.metrics.start()
+            progress = asyncio.create_task(self.__progress())
+            try:
+                await asyncio.gather(*[self.__run_client(vc) for vc in self.clients])
+            finally:
+                progress.cancel()
+            if self.metrics is not None: self.metrics.close()
+
+            log_failures(self.samples)
+            if self.operation.TRANSACT: await self.__resolve_timestamps()
+        self.log_summary()
+
+    def write(self):
+        """Write the samples and histogram of each virtual client to <name>.log and <name>.hdr. """
+        for vc in self.clients:
+            write_samples(vc.samples, '%s.log' % vc.name)
+            latency_histogram(vc.samples, corrected=True).write('%s.hdr' % vc.name)
+
+    def log_summary(self):
+        """Log a summary of the number of requests, failures and the latency across all virtual clients. """
+        log_summary(self.samples, corrected=self.mode == 'open')
+
+    async def __run_client(self, vc):
+        """Run the requests of a virtual client according to the mode. """
+        if self.mode == 'loop':
+            for index in range(0, self.iterations) if self.iterations > 0 else itertools.count():
+                if self.operation.TRANSACT: vc.samples.append(await self.__transact(vc, index))
+                else: vc.samples.append(await self.__call(vc, index))
+                if self.delay > 0: await asyncio.sleep(self.delay)
+
+        elif self.mode == 'bulk':
+            for index, tx in enumerate(vc.signed): vc.samples.append(await self.__send(vc, index, tx))
+            await self.__wait_receipts(vc)
+
+        else:
+            # stagger the schedules of the virtual clients so fixed arrivals are not in step
+            schedule_ns = time.perf_counter_ns() + int(random.uniform(0, 1e9 / self.rate))
+            offset = self.__relative(schedule_ns)
+            tasks = []
+            for index, intended in zip(range(0, self.iterations), arrival_times(self.rate, self.arrival)):
+                wait = intended - (time.perf_counter_ns() - schedule_ns) / 1e9
+                if wait > 0: await asyncio.sleep(wait)
+                if vc.signed is not None: request = self.__send(vc, index, vc.signed[index], offset + intended)
+                else: request = self.__call(vc, index, offset + intended)
+                tasks.append(asyncio.create_task(request))
+                tasks[-1].add_done_callback(lambda task: vc.samples.append(task.result()))
+            await asyncio.gather(*tasks)
+            vc.samples.sort(key=lambda s: s.index)
+            if self.operation.TRANSACT: await self.__wait_receipts(vc)
+
+    async def __call(self, vc, index, intended=None):
+        """Make a call request, returning its sample. """
+        start_ns = time.perf_counter_ns()
+        try:
+            result = await self.operation.call_async(self.client, index, vc.account)
+            ok = True
+            logging.debug('Request %d of %s returned %s', index, vc.name, result)
+        except Exception as e:
+            logging.error('Error in request %d of %s, %s', index, vc.name, e)
+            ok = False
+        end_ns = time.perf_counter_ns()
+        sample = Sample(index, self.__relative(start_ns), (end_ns - start_ns) / 1e6, ok, intended=intended)
+        report(self.metrics, sample)
+        return sample
+
+    async def __send(self, vc, index, tx, intended=None):
+        """Send a signed transaction without waiting for its receipt, returning its sample. """
+        start_ns = time.perf_counter_ns()
+        try:
+            await self.client.call('eth_sendRawTransaction', [tx.rawTransaction.hex()])
+            ok = True
+        except JsonRpcError as e:
+            logging.error('Error sending raw transaction %d of %s, %s', index, vc.name, e)
+            ok = False
+        end_ns = time.perf_counter_ns()
+        sample = Sample(index, self.__relative(start_ns), (end_ns - start_ns) / 1e6, ok,
+                        hash=tx.hash.hex() if ok else None, intended=intended)
+        report(self.metrics, sample, completed=False)
+        return sample
+
+    async def __transact(self, vc, index):
+        """Sign and send a transaction and wait for its receipt, returning its sample. """
+        start_ns = time.perf_counter_ns()
+        sample = Sample(index, self.__relative(start_ns), 0, False)
+        nonce = self.nonces[vc.account.address]
+        try:
+            tx = self.__sign(vc, index)
+            await self.client.call('eth_sendRawTransaction', [tx.rawTransaction.hex()])
+            sample.hash = tx.hash.hex()
+            sample.ok = True
+        except Exception as e:
+            logging.error('Error sending transaction %d of %s, %s', index, vc.name, e)
+            # give the nonce back to the lane only if no other client of the account has taken one since
+            if self.nonces[vc.account.address] == nonce + 1: self.nonces[vc.account.address] = nonce
+        if sample.ok: await self.__wait_receipts(vc, [sample])
+        sample.latency = (time.perf_counter_ns() - start_ns) / 1e6
+        report(self.metrics, sample)
+        return sample
+
+    async def __setup_transactions(self):
+        """Get the gas price, chain id, nonces and gas limit needed to sign transactions. """
+        self.gas_price = int(await self.client.call('eth_gasPrice'), 16)
+        if self.chain_id is None: self.chain_id = int(await self.client.call('eth_chainId'), 16)
+        accounts = list({vc.account.address: vc.account for vc in self.clients}.values())
+        counts = await asyncio.gather(*[self.client.call('eth_getTransactionCount', [account.address, 'pending'])
+                                        for account in accounts])
+        for account, count in zip(accounts, counts): self.nonces[account.address] = int(count, 16)
+        if self.gas_limit is None:
+            account = accounts[0]
+            tx = self.operation.transaction(0, account)
+            params = {'from': account.address, 'to': tx['to'], 'value': hex(tx['value'])}
+            if 'data' in tx: params['data'] = tx['data']
+            self.gas_limit = int(await self.client.call('eth_estimateGas', [params]), 16)
+            logging.info('Estimated gas limit is %d', self.gas_limit)
+
+    def __sign(self, vc, index):
+        """Sign the transaction for an iteration of a virtual client, using the next nonce from its account lane. """
+        return vc.account.sign_transaction(self.__transaction(vc, index))
+
+    def __transaction(self, vc, index):
+        """Return the unsigned transaction for an iteration of a virtual client, using the next nonce of its lane. """
+        nonce = self.nonces[vc.account.address]
+        self.nonces[vc.account.address] = nonce + 1
+
+        scale = 1 + (self.gas_price_ramp * index / self.iterations if self.iterations > 0 else 0)
+        tx = self.operation.transaction(index, vc.account)
+        tx.update({'nonce': nonce, 'gas': self.gas_limit, 'gasPrice': int(scale * self.gas_price),
+                   'chainId': self.chain_id})
+        return tx
+
+    async def __wait_receipts(self, vc, samples=None):
+        """Poll in batches for the receipts of the sent transactions of a virtual client, until the timeout.
+
+        Where waiting for all the sent transactions of the client each is reported to the live metrics once resolved.
+        """
+        metrics = self.metrics if samples is None else None
+        deadline = time.time() + self.timeout
+        pending = [s for s in (samples if samples is not None else vc.samples) if s.ok]
+        while len(pending) > 0:
+            for i in range(0, len(pending), self.BATCH_SIZE):
+                chunk = pending[i:i + self.BATCH_SIZE]
+                try:
+                    receipts = await self.client.batch([('eth_getTransactionReceipt', [s.hash]) for s in chunk])
+                except JsonRpcError as e:
+                    logging.error('Error getting receipts for %s, %s', vc.name, e)
+                    receipts = [None] * len(chunk)
+                for sample, receipt in zip(chunk, receipts):
+                    if isinstance(receipt, JsonRpcError):
+                        logging.error('Error getting receipt for transaction %d of %s, %s', sample.index, vc.name,
+                                      receipt)
+                    elif receipt is not None:
+                        sample.block = int(receipt['blockNumber'], 16)
+                        sample.ok = int(receipt['status'], 16) == 1
+                        if not sample.ok:
+                            logging.error('Transaction %d of %s failed with status %s', sample.index, vc.name,
+                                          receipt['status'])
+                        report(metrics, sample, sent=False)
+            pending = [s for s in pending if s.block is None and s.ok]
+            if len(pending) > 0 and time.time() > deadline:
+                logging.error('Timed out waiting for %d receipts of %s', len(pending), vc.name)
+                for sample in pending:
+                    sample.ok = False
+                    report(metrics, sample, sent=False)
+                return
+            if len(pending) > 0: await asyncio.sleep(self.POLL_INTERVAL)
+
+    async def __resolve_timestamps(self):
+        """Set the timestamp of the samples from the blocks their transactions were included in. """
+        blocks = sorted({s.block for s in self.samples if s.block is not None})
+        timestamps = {}
+        for i in range(0, len(blocks), self.BATCH_SIZE):
+            chunk = blocks[i:i + self.BATCH_SIZE]
+            try:
+                results = await self.client.batch([('eth_getBlockByNumber', [hex(b), False]) for b in chunk])
+            except JsonRpcError as e:
+                results = [e] * len(chunk)
+            for number, block in zip(chunk, results):
+                if isinstance(block, JsonRpcError) or block is None:
+                    logging.error('Error getting block %d, %s', number, block)
+                    timestamps[number] = None
+                else: timestamps[number] = int(block['timestamp'], 16)
+        for sample in self.samples:
+            if sample.block is not None: sample.timestamp = timestamps[sample.block]
+
+    async def __progress(self):
+        """Periodically log the number of requests completed across the virtual clients. """
+        while True:
+            await asyncio.sleep(self.PROGRESS_INTERVAL)
+            logging.info('Completed %d requests', sum(len(vc.samples) for vc in self.clients))
+
+    def __relative(self, ns):
+        """Return a perf_counter_ns time in seconds relative to the start reference. """
+        return (ns - self.start_ns) / 1e9
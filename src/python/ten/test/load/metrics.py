@@ -0,0 +1,201 @@
+import json, time, socket, logging, threading
+from ten.test.utils.histogram import Histogram
+
+INTERVAL = 1.0                  # the interval in seconds that clients report their counters over
+DIGITS = 2                      # the significant digits of the latency histograms, kept low so reports are small
+MAX_REPORT = 65000              # the maximum size in bytes of a report datagram
+
+
+class MetricsReporter:
+    """A reporter of the live counters of a load client, sent to the live metrics of the test as it runs.
+
+    Each interval the number of requests sent, confirmed and failed since the last report, and a histogram of the
+    latency of those confirmed, are sent as a json datagram over udp to the live metrics of the test. The counters are
+    reset on each report, so a lost datagram only loses the counts of that interval. Reporting is started once the
+    client is released to run, and a final report is sent when it is closed.
+    """
+
+    def __init__(self, address, name, interval=INTERVAL):
+        """Create the reporter for a client to the live metrics at a host:port address. """
+        host, port = address.rsplit(':', 1)
+        self.address = (host, int(port))
+        self.name = name
+        self.interval = interval
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.thread = None
+        self.__reset()
+
+    def start(self):
+        """Start reporting the counters each interval. """
+        self.thread = threading.Thread(target=self.__run, name='metrics_reporter', daemon=True)
+        self.thread.start()
+
+    def sent(self):
+        """Count a request as sent. """
+        with self.lock: self.counts[0] += 1
+
+    def confirmed(self, latency=None):
+        """Count a request as confirmed, i.e. a call returned or a transaction receipt was successful. """
+        with self.lock:
+            self.counts[1] += 1
+            if latency is not None: self.histogram.record(latency)
+
+    def failed(self):
+        """Count a request as failed, i.e. it errored or a transaction failed or timed out. """
+        with self.lock: self.counts[2] += 1
+
+    def close(self):
+        """Stop reporting, sending a final report of the counters since the last. """
+        self.stopped.set()
+        if self.thread is not None: self.thread.join()
+        self.__report()
+        self.socket.close()
+
+    def __run(self):
+        """Report the counters each interval until stopped. """
+        while not self.stopped.wait(self.interval): self.__report()
+
+    def __report(self):
+        """Send the counters since the last report, and reset them. """
+        with self.lock:
+            counts, histogram = self.counts, self.histogram
+            self.__reset()
+        report = json.dumps({'client': self.name, 'sent': counts[0], 'confirmed': counts[1], 'failed': counts[2],
+                             'latency': histogram.encode() if histogram.count > 0 else None}).encode('utf-8')
+        if len(report) > MAX_REPORT: logging.warning('Live metrics report of %d bytes is too large', len(report))
+        try:
+            self.socket.sendto(report, self.address)
+        except OSError as e:
+            logging.warning('Error sending live metrics report, %s', e)
+
+    def __reset(self):
+        """Reset the counters of sent, confirmed and failed requests, and the latency histogram. """
+        self.counts = [0, 0, 0]
+        self.histogram = Histogram(DIGITS)
+
+
+class LiveMetrics:
+    """The live metrics of the load clients of a test, aggregated each second as they run.
+
+    Clients given the address using --metrics report their counters over udp, which are aggregated across clients
+    into the second they were received in. Each second a line of the throughput is logged, and the sent, confirmed and
+    failed requests and the p50 and p99 latency are appended to a time series file. The run is marked as aborted if
+    the ratio of failed requests exceeds a threshold once a minimum number have completed, or if there has been no
+    progress for a number of seconds once clients have started reporting. Tests pass error() as the errorIf of
+    waitForGrep when waiting for the clients, so that the wait fails fast rather than running to the timeout.
+    """
+
+    def __init__(self, log, path, error_ratio=None, stall=None, min_requests=100, host='127.0.0.1', port=0):
+        """Create the live metrics listening on a host and port, by default an ephemeral port on the local host.
+
+        :param log: The logger to log the live throughput to
+        :param path: The path of the time series file
+        :param error_ratio: The ratio of failed to completed requests to abort at, or None to not check
+        :param stall: The number of seconds without progress to abort after, or None to not check
+        :param min_requests: The minimum number of completed requests before the error ratio is checked
+        """
+        self.log = log
+        self.path = path
+        self.error_ratio = error_ratio
+        self.stall = stall
+        self.min_requests = min_requests
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind((host, port))
+        self.socket.settimeout(0.5)
+        self.lock = threading.Lock()
+        self.clients = set()
+        self.current = self.__interval()
+        self.totals = [0, 0, 0]     # the total sent, confirmed and failed requests
+        self.histogram = Histogram(DIGITS)
+        self.started = None         # the second the first report was received in
+        self.idle = 0               # the number of consecutive seconds without progress
+        self.aborted = None         # the reason the run was aborted, if it was
+        self.closed = threading.Event()
+        self.start = time.time()
+        self.receiver = threading.Thread(target=self.__receive, name='live_metrics_receiver', daemon=True)
+        self.receiver.start()
+        self.ticker = threading.Thread(target=self.__tick, name='live_metrics_ticker', daemon=True)
+        self.ticker.start()
+
+    @property
+    def address(self):
+        """The host:port address of the live metrics for clients to report to. """
+        host, port = self.socket.getsockname()[0:2]
+        return '%s:%d' % (host, port)
+
+    def error(self):
+        """Return the reason the run was aborted, or None if it has not been, e.g. as the errorIf of waitForGrep. """
+        return self.aborted
+
+    def close(self):
+        """Stop the live metrics, adding the partial second closed in to the totals, and logging them. """
+        if self.closed.is_set(): return
+        self.closed.set()
+        self.ticker.join()
+        self.receiver.join()
+        self.socket.close()
+        with self.lock:
+            (sent, confirmed, failed), histogram = self.current
+            self.current = self.__interval()
+            for i, count in enumerate([sent, confirmed, failed]): self.totals[i] += count
+            self.histogram.merge(histogram)
+        self.log.info('Live totals: sent %d, confirmed %d, failed %d from %d clients', self.totals[0],
+                      self.totals[1], self.totals[2], len(self.clients))
+
+    def __receive(self):
+        """Receive the reports of the clients, adding them to the current second. """
+        while not self.closed.is_set():
+            try:
+                data, _ = self.socket.recvfrom(MAX_REPORT + 1024)
+                report = json.loads(data)
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            except ValueError as e:
+                logging.warning('Invalid live metrics report, %s', e)
+                continue
+            with self.lock:
+                self.clients.add(report['client'])
+                for i, key in enumerate(['sent', 'confirmed', 'failed']): self.current[0][i] += report[key]
+                if report['latency'] is not None: self.current[1].merge(Histogram.decode(report['latency']))
+                if self.started is None: self.started = int(time.time() - self.start)
+
+    def __tick(self):
+        """Each second close the current second, appending it to the time series and checking the abort conditions. """
+        with open(self.path, 'w') as fp:
+            fp.write('# second sent confirmed failed p50 p99\n')
+            second = 0
+            while not self.closed.wait(max(0.0, self.start + second + 1 - time.time())):
+                second += 1
+                with self.lock:
+                    (sent, confirmed, failed), histogram = self.current
+                    self.current = self.__interval()
+                    for i, count in enumerate([sent, confirmed, failed]): self.totals[i] += count
+                    self.histogram.merge(histogram)
+                p50, p99 = histogram.percentile(50), histogram.percentile(99)
+                fp.write('%d %d %d %d %.3f %.3f\n' % (second, sent, confirmed, failed, p50 or 0, p99 or 0))
+                fp.flush()
+                if self.started is None: continue
+                self.log.info('Live %4ds: sent %d/s, confirmed %d/s, failed %d/s, p99 %s ms, total confirmed %d',
+                              second, sent, confirmed, failed, '%.1f' % p99 if p99 is not None else '-',
+                              self.totals[1])
+                self.__check(sent + confirmed + failed > 0)
+
+    def __check(self, progress):
+        """Check the abort conditions, marking the run as aborted if any are met. """
+        if self.aborted is not None: return
+        self.idle = 0 if progress else self.idle + 1
+        completed = self.totals[1] + self.totals[2]
+        ratio = float(self.totals[2]) / completed if completed >= self.min_requests else 0
+        if self.error_ratio is not None and ratio > self.error_ratio:
+            self.aborted = 'ratio of failed requests %.2f is above %.2f' % (ratio, self.error_ratio)
+        elif self.stall is not None and self.idle >= self.stall:
+            self.aborted = 'no progress of the load clients for %d seconds' % self.idle
+        if self.aborted is not None: self.log.warn('Aborting run, %s', self.aborted)
+
+    def __interval(self):
+        """Return the counters and latency histogram of a new interval. """
+        return [0, 0, 0], Histogram(DIGITS)
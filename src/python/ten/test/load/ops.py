@@ -0,0 +1,215 @@
+import json, random, secrets, string, functools
+from eth_abi import encode, decode
+from eth_utils.abi import collapse_if_tuple, function_abi_to_4byte_selector
+from ten.test.utils import crypto
+
+
+def rand_string(length=10):
+    """Return a random string of upper case letters and digits. """
+    return ''.join(random.choices(string.ascii_uppercase + string.digits, k=length))
+
+
+def to_int(value):
+    """Return the integer value of a hex quantity returned by a json rpc request. """
+    return int(value, 16)
+
+
+def rand_value(abi_type, address):
+    """Return a random value of an abi type for use as a function argument, where addresses are the sender. """
+    if abi_type.endswith('[]'): return [rand_value(abi_type[:-2], address) for _ in range(0, 2)]
+    if abi_type.startswith('uint') or abi_type.startswith('int'): return random.randint(0, 100)
+    if abi_type == 'string': return rand_string()
+    if abi_type == 'address': return address
+    if abi_type == 'bool': return random.choice([True, False])
+    if abi_type == 'bytes32': return secrets.token_bytes(32)
+    raise ValueError('Unsupported abi type %s for a random argument' % abi_type)
+
+
+class Contract:
+    """A light-weight contract for encoding function calls and decoding their results from the abi.
+
+    This avoids importing web3 in the load clients, as they only need the call data of a transaction or call. Functions
+    are looked up by name, so overloaded functions are not supported.
+    """
+
+    def __init__(self, address, abi):
+        """Instantiate an instance from the contract address and abi. """
+        self.address = address
+        self.functions = {entry['name']: entry for entry in abi if entry.get('type') == 'function'}
+
+    @classmethod
+    def load(cls, address, abi_path):
+        """Instantiate an instance with the abi read from a file. """
+        with open(abi_path) as fp: return cls(address, json.load(fp))
+
+    def inputs(self, name):
+        """Return the abi types of the inputs of a function. """
+        return [collapse_if_tuple(i) for i in self.function(name)['inputs']]
+
+    def encode(self, name, *args):
+        """Return the call data of a function call as a hex string. """
+        function = self.function(name)
+        return '0x' + (function_abi_to_4byte_selector(function) + encode(self.inputs(name), list(args))).hex()
+
+    def decode(self, name, data):
+        """Decode the hex result of a call to a function, returning a single value or a tuple for multiple outputs. """
+        types = [collapse_if_tuple(o) for o in self.function(name)['outputs']]
+        values = decode(types, bytes.fromhex(data[2:] if data.startswith('0x') else data))
+        return values[0] if len(values) == 1 else values
+
+    def function(self, name):
+        """Return the abi entry of a function. """
+        if name not in self.functions: raise ValueError('Function %s is not in the contract abi' % name)
+        return self.functions[name]
+
+
+class Operation:
+    """The base of an operation run by a workload.
+
+    Transaction operations return the fields of a transaction specific to the operation, i.e. the recipient, value and
+    data, where the workload sets the nonce, gas and chain id, then signs and sends it. Call operations return the
+    method and params of a single json rpc request, along with a function to parse its result, so that the request
+    can be made from either the blocking or async client. Each operation registers its own command line arguments.
+    """
+    NAME = None
+    TRANSACT = False                # true if the operation sends transactions rather than making calls
+
+    def __init__(self, client, args):
+        """Instantiate an instance with the json rpc client and parsed command line arguments. """
+        self.client = client
+        self.args = args
+
+    @classmethod
+    def add_arguments(cls, parser):
+        """Add the command line arguments of the operation to its parser. """
+        pass
+
+    def setup(self, accounts):
+        """Setup the operation for the accounts of the workload, called once before it runs. """
+        pass
+
+    def transaction(self, index, account):
+        """Return the operation specific fields of a transaction sent from an account. """
+        raise NotImplementedError()
+
+    def request(self, index, account):
+        """Return the json rpc method, params and a function to parse the result of a call made for an account. """
+        raise NotImplementedError()
+
+    def call(self, index, account):
+        """Make the call of an operation for an account, returning the parsed result. """
+        method, params, parse = self.request(index, account)
+        return parse(self.client.call(method, params))
+
+    async def call_async(self, client, index, account):
+        """Make the call of an operation for an account using an async client, returning the parsed result. """
+        method, params, parse = self.request(index, account)
+        return parse(await client.call(method, params))
+
+
+class ContractOperation(Operation):
+    """The base of an operation against a deployed contract. """
+
+    @classmethod
+    def add_arguments(cls, parser):
+        parser.add_argument('-a', '--contract_address', required=True, help='Address of the contract')
+        parser.add_argument('-b', '--contract_abi', required=True, help='Abi of the contract')
+
+    def setup(self, accounts):
+        self.contract = Contract.load(self.args.contract_address, self.args.contract_abi)
+
+
+class TransferOperation(Operation):
+    """Transfer native funds to one of a set of random recipient accounts. """
+    NAME = 'transfer'
+    TRANSACT = True
+
+    @classmethod
+    def add_arguments(cls, parser):
+        parser.add_argument('-r', '--num_accounts', type=int, default=8, help='Number of accounts to send funds to')
+        parser.add_argument('-x', '--amount', type=int, default=100, help='The amount to send in wei')
+
+    def setup(self, accounts):
+        self.recipients = [crypto.address(secrets.token_hex(32)) for _ in range(0, self.args.num_accounts)]
+
+    def transaction(self, index, account):
+        return {'to': random.choice(self.recipients), 'value': self.args.amount}
+
+
+class StoreOperation(ContractOperation):
+    """Store a random value in a storage contract, or the index against a key in a key storage contract. """
+    NAME = 'store'
+    TRANSACT = True
+
+    @classmethod
+    def add_arguments(cls, parser):
+        super().add_arguments(parser)
+        parser.add_argument('-k', '--key', help='Key to store the index against using setItem rather than store')
+
+    def transaction(self, index, account):
+        if self.args.key is not None: data = self.contract.encode('setItem', self.args.key, index)
+        else: data = self.contract.encode('store', random.randint(0, 100))
+        return {'to': self.contract.address, 'value': 0, 'data': data}
+
+
+class EmitOperation(ContractOperation):
+    """Emit a random choice of the events of the event emitter contract, tagged with the id of the client. """
+    NAME = 'emit'
+    TRANSACT = True
+
+    @classmethod
+    def add_arguments(cls, parser):
+        super().add_arguments(parser)
+        parser.add_argument('-e', '--id', type=int, default=0, help='The id of the client to tag the events with')
+
+    def transaction(self, index, account):
+        choice = random.randrange(4)
+        if choice == 0: data = self.contract.encode('emitSimpleEvent', self.args.id, rand_string())
+        elif choice == 1:
+            data = self.contract.encode('emitArrayEvent', self.args.id, [1, 2], [rand_string(), rand_string()])
+        elif choice == 2: data = self.contract.encode('emitStructEvent', self.args.id, rand_string())
+        else: data = self.contract.encode('emitMappingEvent', self.args.id, [account.address], [random.randrange(100)])
+        return {'to': self.contract.address, 'value': 0, 'data': data}
+
+
+class CallOperation(ContractOperation):
+    """Call a random choice of contract functions using eth_call, with random arguments. """
+    NAME = 'call'
+
+    @classmethod
+    def add_arguments(cls, parser):
+        super().add_arguments(parser)
+        parser.add_argument('-g', '--function', action='append', help='Function to call (repeatable, default retrieve)')
+
+    def request(self, index, account):
+        name = random.choice(self.args.function if self.args.function is not None else ['retrieve'])
+        data = self.contract.encode(name, *[rand_value(t, account.address) for t in self.contract.inputs(name)])
+        return ('eth_call', [{'from': account.address, 'to': self.contract.address, 'data': data}, 'latest'],
+                functools.partial(self.contract.decode, name))
+
+
+class EstimateGasOperation(ContractOperation):
+    """Estimate the gas of a contract function using eth_estimateGas, with random arguments. """
+    NAME = 'estimate_gas'
+
+    @classmethod
+    def add_arguments(cls, parser):
+        super().add_arguments(parser)
+        parser.add_argument('-g', '--function', default='store', help='Function to estimate')
+
+    def request(self, index, account):
+        name = self.args.function
+        data = self.contract.encode(name, *[rand_value(t, account.address) for t in self.contract.inputs(name)])
+        return 'eth_estimateGas', [{'from': account.address, 'to': self.contract.address, 'data': data}], to_int
+
+
+class GetBalanceOperation(Operation):
+    """Get the native balance of the account using eth_getBalance. """
+    NAME = 'get_balance'
+
+    def request(self, index, account):
+        return 'eth_getBalance', [account.address, 'latest'], to_int
+
+
+OPERATIONS = {op.NAME: op for op in [TransferOperation, StoreOperation, EmitOperation, CallOperation,
+                                     EstimateGasOperation, GetBalanceOperation]}
@@ -0,0 +1,134 @@
+from collections import namedtuple
+
+Point = namedtuple('Point', 'offered throughput p50 p99 error_ratio')
+
+
+def _ms(latency):
+    """Return a latency in milliseconds formatted for logging, where None is shown as a dash. """
+    return '-' if latency is None else '%.1f' % latency
+
+
+class SaturationSearch:
+    """A search for the maximum sustainable throughput of a network under a service level objective on latency.
+
+    The offered load, as the rate of requests per second of an open loop run, is stepped geometrically from a start
+    rate until one rate is within the objective and another breaks it, i.e. its p99 latency or ratio of failed
+    requests is above the limit, or the throughput achieved falls short of that offered as the network can no longer
+    keep up. The rate is then binary searched between the two to a relative precision. Each rate is run by a probe, a
+    function of the rate returning the Point measured, so the search is independent of how the load is generated. The
+    max sustainable throughput is the highest throughput of a rate within the objective, and the knee is the point of
+    the load latency curve where latency starts to rise steeply, taken as the point furthest below the chord from the
+    first to the last point once both axes are normalised. Where the max rate is reached within the objective the
+    network is not saturated, and the max sustainable throughput is only a lower bound.
+    """
+    FACTOR = 2.0                    # the factor the rate is stepped by until the objective is bracketed
+    PRECISION = 0.1                 # the relative precision the rate is binary searched to
+    MAX_PROBES = 16                 # the maximum number of rates to probe
+    KEEP_UP = 0.9                   # the minimum ratio of the throughput achieved to that offered for a rate to pass
+
+    def __init__(self, log, probe, p99, error_ratio=0.01, start=10.0, max_rate=None, factor=FACTOR,
+                 precision=PRECISION, max_probes=MAX_PROBES):
+        """Instantiate an instance.
+
+        :param log: The logger to log the search to
+        :param probe: The function to run the load at a rate of requests per second, returning the Point measured
+        :param p99: The maximum p99 latency in milliseconds of the objective
+        :param error_ratio: The maximum ratio of failed requests of the objective
+        :param start: The rate in requests per second to start the search from
+        :param max_rate: The maximum rate to probe, or None for no maximum
+        """
+        self.log = log
+        self.probe = probe
+        self.p99 = p99
+        self.error_ratio = error_ratio
+        self.start = start
+        self.max_rate = max_rate
+        self.factor = factor
+        self.precision = precision
+        self.max_probes = max_probes
+        self.points = []
+        self.best = None            # the point of the highest throughput within the objective
+        self.saturated = False      # true once a rate has been found to break the objective
+
+    def run(self):
+        """Run the search, returning the point of the max sustainable throughput, or None if no rate was within. """
+        low, high = None, None      # the highest rate within the objective and the lowest rate outside of it
+        rate = self.start if self.max_rate is None else min(self.start, self.max_rate)
+        while len(self.points) < self.max_probes and (low is None or high is None):
+            if self.__run(rate): low = rate
+            else: high = rate
+            if high is None and self.max_rate is not None and rate >= self.max_rate: break
+            rate = rate * self.factor if high is None else rate / self.factor
+            if self.max_rate is not None: rate = min(rate, self.max_rate)
+
+        while low is not None and high is not None and (high - low) / low > self.precision:
+            if len(self.points) >= self.max_probes:
+                self.log.warn('Reached the maximum of %d probes before the precision of the search', self.max_probes)
+                break
+            rate = (low + high) / 2
+            if self.__run(rate): low = rate
+            else: high = rate
+        self.saturated = high is not None
+        return self.best
+
+    def breaches(self, point):
+        """Return a list of the reasons a point breaks the objective, which is empty if it is within it. """
+        reasons = []
+        if point.p99 is None or point.p99 > self.p99:
+            reasons.append('p99 %s ms is above %.1f ms' % (_ms(point.p99), self.p99))
+        if point.error_ratio > self.error_ratio:
+            reasons.append('ratio of failed requests %.3f is above %.3f' % (point.error_ratio, self.error_ratio))
+        if point.throughput < self.KEEP_UP * point.offered:
+            reasons.append('throughput %.2f is short of the offered %.2f' % (point.throughput, point.offered))
+        return reasons
+
+    @property
+    def curve(self):
+        """The load latency curve, as the list of points probed in order of the rate offered. """
+        return sorted(self.points, key=lambda p: p.offered)
+
+    @property
+    def max_throughput(self):
+        """The max sustainable throughput, or zero if no rate was within the objective. """
+        return self.best.throughput if self.best is not None else 0.0
+
+    @property
+    def knee(self):
+        """The point of the load latency curve where latency starts to rise steeply, or None if none were probed. """
+        curve = [p for p in self.curve if p.p99 is not None]
+        if len(curve) < 3: return self.best
+        x = [p.offered for p in curve]
+        y = [p.p99 for p in curve]
+        x_range, y_range = max(x) - min(x), max(y) - min(y)
+        if x_range <= 0 or y_range <= 0: return self.best
+        distance = [(a - min(x)) / x_range - (b - min(y)) / y_range for a, b in zip(x, y)]
+        return curve[distance.index(max(distance))]
+
+    def log_summary(self):
+        """Log the max sustainable throughput and knee, warning if the network was not saturated. """
+        knee = self.knee
+        self.log.info('Max sustainable throughput %.2f (requests/sec) at an offered %.2f within p99 %.1f ms',
+                      self.max_throughput, self.best.offered if self.best is not None else 0, self.p99)
+        if knee is not None: self.log.info('Knee of the load latency curve at %.2f (requests/sec), p99 %.1f ms',
+                                           knee.throughput, knee.p99)
+        if not self.saturated: self.log.warn('Saturation was not reached, the max throughput is a lower bound')
+
+    def write(self, path):
+        """Write the load latency curve to a file, one point per line. """
+        with open(path, 'w') as fp:
+            fp.write('# offered throughput p50 p99 error_ratio within\n')
+            for p in self.curve:
+                fp.write('%.2f %.2f %.3f %.3f %.4f %d\n' % (p.offered, p.throughput, p.p50 or 0, p.p99 or 0,
+                                                           p.error_ratio, 0 if self.breaches(p) else 1))
+
+    def __run(self, rate):
+        """Probe a rate, returning true if the point measured is within the objective. """
+        self.log.info('Probing an offered load of %.2f (requests/sec)', rate)
+        point = self.probe(rate)
+        self.points.append(point)
+        reasons = self.breaches(point)
+        self.log.info('Throughput %.2f (requests/sec), p50 %s ms, p99 %s ms, ratio failures %.3f, %s',
+                      point.throughput, _ms(point.p50), _ms(point.p99), point.error_ratio,
+                      'breaks the objective, %s' % ', '.join(reasons) if reasons else 'within')
+        if not reasons and (self.best is None or point.throughput > self.best.throughput): self.best = point
+        return not reasons
@@ -0,0 +1,99 @@
+import os, json, math, hashlib, logging, multiprocessing
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from eth_utils import keccak
+from hexbytes import HexBytes
+from ten.test.utils import crypto
+
+MIN_PARALLEL = 256              # the number of transactions below which signing is not worth sharding over processes
+SHARDS = 4                      # the number of shards per process, so a slow shard does not hold back the others
+
+Signed = namedtuple('Signed', 'rawTransaction hash')
+
+
+def _sign_shard(key, txs):
+    """Sign a shard of transactions from the account of a private key, returning the raw transactions. """
+    account = crypto.account(key)
+    return [bytes(account.sign_transaction(tx).rawTransaction) for tx in txs]
+
+
+def _signed(raw):
+    """Return the signed transaction of a raw transaction, where the hash is the keccak of the raw bytes. """
+    return Signed(HexBytes(raw), HexBytes(keccak(raw)))
+
+
+class BulkSigner:
+    """A signer of transactions in bulk, sharding the signing over a pool of processes.
+
+    Signing is cpu bound, so where a workload signs all its transactions up front this dominates the setup time of a
+    large run. Transactions are grouped by the account signing them and split into shards which are signed in parallel
+    across processes, returning the signed transactions in the order given. Optionally the signed transactions are
+    cached on disk in a corpus keyed by the account, chain id, nonce range and a digest of the unsigned transactions as
+    the template, so repeated runs against a freshly reset local network, where the accounts and nonces are the same,
+    reuse the raw transactions already signed. As signatures are deterministic for the same key and transaction a
+    cached corpus is identical to what would be signed. The processes are spawned rather than forked, as the signer is
+    used from within the threads of the runner, where a forked child can deadlock on a lock held by another thread.
+    """
+
+    def __init__(self, processes=1, cache_dir=None):
+        """Instantiate an instance.
+
+        :param processes: The number of processes to sign over, one to sign in process, or zero for all cores
+        :param cache_dir: The directory of the corpus of signed transactions, or None to not cache them
+        """
+        self.processes = processes if processes > 0 else os.cpu_count()
+        self.cache_dir = cache_dir
+        if cache_dir is not None: os.makedirs(cache_dir, exist_ok=True)
+
+    def sign(self, transactions):
+        """Sign a list of (private key, transaction) pairs, returning the list of signed transactions in order. """
+        by_key = {}
+        for position, (key, tx) in enumerate(transactions): by_key.setdefault(key, []).append((position, tx))
+
+        signed = [None] * len(transactions)
+        pending = []                # the groups not in the cache, as the key, positions, transactions and cache path
+        for key, group in by_key.items():
+            positions, txs = [p for p, _ in group], [tx for _, tx in group]
+            path = self.__path(key, txs)
+            raws = self.__read(path, len(txs)) if path is not None else None
+            if raws is not None:
+                for position, raw in zip(positions, raws): signed[position] = _signed(raw)
+            else: pending.append((key, positions, txs, path))
+
+        count = sum(len(txs) for _, _, txs, _ in pending)
+        if len(pending) > 0 and (self.processes == 1 or count < MIN_PARALLEL):
+            for key, positions, txs, path in pending: self.__store(signed, positions, _sign_shard(key, txs), path)
+        elif len(pending) > 0:
+            size = max(1, math.ceil(count / (self.processes * SHARDS)))
+            logging.info('Signing %d transactions over %d processes', count, self.processes)
+            context = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(max_workers=self.processes, mp_context=context) as pool:
+                futures = [[pool.submit(_sign_shard, key, txs[i:i + size]) for i in range(0, len(txs), size)]
+                           for key, _, txs, _ in pending]
+                for (key, positions, txs, path), shards in zip(pending, futures):
+                    self.__store(signed, positions, [raw for shard in shards for raw in shard.result()], path)
+        if len(transactions) > count: logging.info('Reused %d signed transactions from the corpus cache',
+                                                   len(transactions) - count)
+        return signed
+
+    def __store(self, signed, positions, raws, path):
+        """Set the signed transactions of a group at their positions, writing them to the cache if enabled. """
+        for position, raw in zip(positions, raws): signed[position] = _signed(raw)
+        if path is not None:
+            with open(path + '.tmp', 'w') as fp:
+                for raw in raws: fp.write(raw.hex() + '\n')
+            os.replace(path + '.tmp', path)
+
+    def __read(self, path, count):
+        """Read the raw transactions of a group from the cache, or None if not cached or incomplete. """
+        if not os.path.exists(path): return None
+        with open(path) as fp: raws = [bytes.fromhex(line.strip()) for line in fp if line.strip() != '']
+        return raws if len(raws) == count else None
+
+    def __path(self, key, txs):
+        """Return the cache path of a group of transactions from an account, or None if not caching. """
+        if self.cache_dir is None: return None
+        nonces = [tx['nonce'] for tx in txs]
+        template = hashlib.sha256(json.dumps(txs, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, '%s_%s_%d-%d_%s.txs' % (crypto.address(key), txs[0].get('chainId'),
+                                                                    min(nonces), max(nonces), template[:16]))
@@ -0,0 +1,392 @@
+import os, time, random, logging, itertools, threading
+from concurrent.futures import ThreadPoolExecutor
+from ten.test.helpers.json_rpc import JsonRpcError
+from ten.test.load.signer import BulkSigner
+from ten.test.utils.histogram import Histogram
+from ten.test.utils.block_scanner import BlockScanner
+
+MODES = ['bulk', 'loop', 'open']
+ARRIVALS = ['fixed', 'poisson']
+UNKNOWN = -1                    # the block or timestamp of a sample that is not known, as written to the samples file
+
+
+class Sample:
+    """The outcome of a single request of a workload.
+
+    The start is the time in seconds the request was made relative to the start reference of the workload, and the
+    latency is in milliseconds. The intended time is when the request should have been made, which in open loop mode
+    is from the arrival schedule, and otherwise is the same as the start. For transactions the block and timestamp are
+    those the transaction was included in, if known, and otherwise None.
+    """
+    __slots__ = ['index', 'intended', 'start', 'latency', 'ok', 'block', 'timestamp', 'hash']
+
+    def __init__(self, index, start, latency, ok, block=None, timestamp=None, hash=None, intended=None):
+        """Instantiate an instance. """
+        self.index = index
+        self.intended = intended if intended is not None else start
+        self.start = start
+        self.latency = latency
+        self.ok = ok
+        self.block = block
+        self.timestamp = timestamp
+        self.hash = hash
+
+    @property
+    def end(self):
+        """The time in seconds the request completed, relative to the start reference of the workload. """
+        return self.start + self.latency / 1000.0
+
+    @property
+    def lag(self):
+        """The time in milliseconds the request was made after its intended time. """
+        return (self.start - self.intended) * 1000.0
+
+    @property
+    def corrected(self):
+        """The latency in milliseconds from the intended time, i.e. corrected for coordinated omission. """
+        return self.latency + self.lag
+
+
+def arrival_times(rate, arrival):
+    """Generator of the times in seconds from zero of requests arriving at a rate per second.
+
+    Fixed arrivals are evenly spaced, whereas poisson arrivals have exponentially distributed inter-arrival times, so
+    that requests arrive independently of each other at the same average rate.
+    """
+    if arrival not in ARRIVALS: raise ValueError('Unknown arrival %s, must be one of %s' % (arrival, ARRIVALS))
+    t = 0.0
+    while True:
+        yield t
+        t += 1.0 / rate if arrival == 'fixed' else random.expovariate(rate)
+
+
+def log_failures(samples):
+    """Log the ratio of failed samples, as searched for by tests. """
+    failures = sum(1 for s in samples if not s.ok)
+    logging.warning('Ratio failures = %.2f', float(failures) / len(samples) if len(samples) > 0 else 0)
+
+
+def report(metrics, sample, sent=True, completed=True):
+    """Report a sample to the live metrics if given, as sent and or completed, where failures are always reported. """
+    if metrics is None: return
+    if sent: metrics.sent()
+    if completed and sample.ok: metrics.confirmed(sample.latency)
+    elif not sample.ok: metrics.failed()
+
+
+def latency_histogram(samples, corrected=False):
+    """Return a histogram of the latency of the successful samples, or of the corrected latency if requested. """
+    histogram = Histogram()
+    for s in samples:
+        if s.ok: histogram.record(s.corrected if corrected else s.latency)
+    return histogram
+
+
+def log_summary(samples, corrected=False):
+    """Log a summary of the number of requests, failures and the latency, and optionally the corrected latency. """
+    latencies = latency_histogram(samples)
+    failures = len(samples) - latencies.count
+    duration = max((s.end for s in samples), default=0) - min((s.start for s in samples), default=0)
+    logging.info('Completed %d requests in %.3f secs with %d failures', len(samples), duration, failures)
+    if latencies.count > 0: logging.info('Latency %s', format_summary(latencies))
+    if corrected and latencies.count > 0:
+        lags = [s.lag for s in samples]
+        logging.info('Corrected latency %s', format_summary(latency_histogram(samples, corrected=True)))
+        logging.info('Send lag mean %.3f ms, max %.3f ms', sum(lags) / len(lags), max(lags))
+
+
+def format_summary(histogram):
+    """Return the mean and percentiles of a latency histogram formatted for logging. """
+    return ', '.join('%s %.3f ms' % (key, value) for key, value in histogram.summary().items() if key != 'count')
+
+
+def write_samples(samples, path):
+    """Write a list of samples to a file, one per line. """
+    with open(path, 'w') as fp:
+        fp.write('# index intended start latency ok block timestamp\n')
+        for s in samples:
+            fp.write('%d %.6f %.6f %.3f %d %d %d\n' % (s.index, s.intended, s.start, s.latency, 1 if s.ok else 0,
+                                                       UNKNOWN if s.block is None else s.block,
+                                                       UNKNOWN if s.timestamp is None else s.timestamp))
+
+
+def read_samples(path):
+    """Read a list of samples from a file written by a workload. """
+    samples = []
+    with open(path) as fp:
+        for line in fp:
+            if line.startswith('#'): continue
+            index, intended, start, latency, ok, block, timestamp = line.split()
+            samples.append(Sample(int(index), float(start), float(latency), ok == '1',
+                                  None if int(block) == UNKNOWN else int(block),
+                                  None if int(timestamp) == UNKNOWN else int(timestamp), intended=float(intended)))
+    return samples
+
+
+class Workload:
+    """A workload running an operation for a number of iterations, recording the outcome of each request.
+
+    In loop mode each request is made only once the previous one completes, where a transaction completes once its
+    receipt is returned, and a delay can be set between requests. A number of iterations of zero runs until the process
+    is stopped. In bulk mode, which is only for transactions, all transactions are signed up front, sent as fast as
+    possible, and then the receipts are waited for. Transactions are sent round robin from the accounts, where the
+    nonces are tracked locally. A request fails if it raises an error, or for transactions if the receipt is not
+    returned within the timeout or has a failed status. On completion the ratio of failures is logged, the timestamp
+    of the block of each transaction is resolved, and the samples are written to file along with a histogram of their
+    latency, which can be merged across clients to report percentiles.
+
+    Loop and bulk mode are closed loop, in that a slow response holds back the requests after it, so the latency under
+    overload is understated. In open loop mode requests are made at a constant rate from a pool of threads, with fixed
+    or poisson inter-arrival times, independently of when earlier requests complete. Each sample records the time it
+    was intended to be made from the schedule, so where the pool cannot keep up the lag is added to the corrected
+    latency, i.e. the latency is corrected for coordinated omission. Transactions are signed up front as in bulk mode,
+    and their receipts waited for once all are sent.
+
+    Once prepared to send, i.e. after any signing, an optional ready function is called to return the start reference
+    of the samples, e.g. as the release of a start barrier. Otherwise the start reference is the time it is prepared.
+    Where given a reporter of live metrics, the requests sent, confirmed and failed are reported from then as it runs.
+    """
+    POLL_INTERVAL = 0.1             # interval in seconds to poll for transaction receipts
+
+    def __init__(self, name, operation, client, accounts, iterations, mode='loop', delay=0, timeout=600,
+                 gas_limit=None, gas_price_ramp=0, chain_id=None, rate=0, arrival='poisson', concurrency=64,
+                 signer=None, metrics=None):
+        """Instantiate an instance.
+
+        :param name: The logical name of the client, used for logging and the samples file
+        :param operation: The operation to run
+        :param client: The json rpc client to the network
+        :param accounts: The list of local accounts to run the operation for
+        :param iterations: The number of requests to make, or zero to run until stopped
+        :param mode: The mode of the workload, one of bulk, loop or open
+        :param delay: The delay in seconds between requests in loop mode
+        :param timeout: The timeout in seconds to wait for transaction receipts
+        :param gas_limit: The gas limit of transactions, or None to estimate from the first transaction
+        :param gas_price_ramp: Increase the gas price linearly over the iterations by up to this multiple
+        :param chain_id: The chain id of the network, or None to request it
+        :param rate: The rate of requests per second in open loop mode
+        :param arrival: The inter-arrival times in open loop mode, either fixed or poisson
+        :param concurrency: The maximum number of requests in flight in open loop mode
+        :param signer: The bulk signer of transactions signed up front, or None to sign them in process
+        :param metrics: The reporter of live metrics to the test, or None to not report them
+        """
+        if mode not in MODES: raise ValueError('Unknown workload mode %s, must be one of %s' % (mode, MODES))
+        if mode == 'bulk' and not operation.TRANSACT: raise ValueError('Bulk mode is only for transaction operations')
+        if mode == 'open' and rate <= 0: raise ValueError('Open loop mode needs a rate greater than zero')
+        if mode != 'loop' and operation.TRANSACT and iterations == 0:
+            raise ValueError('%s mode needs a number of iterations for transactions' % mode.capitalize())
+        if arrival not in ARRIVALS: raise ValueError('Unknown arrival %s, must be one of %s' % (arrival, ARRIVALS))
+        self.name = name
+        self.operation = operation
+        self.client = client
+        self.accounts = accounts
+        self.iterations = iterations
+        self.mode = mode
+        self.delay = delay
+        self.timeout = timeout
+        self.gas_limit = gas_limit
+        self.gas_price_ramp = gas_price_ramp
+        self.chain_id = chain_id
+        self.start_ns = None
+        self.signed = None
+        self.rate = rate
+        self.arrival = arrival
+        self.concurrency = concurrency
+        self.signer = signer if signer is not None else BulkSigner()
+        self.metrics = metrics
+        self.gas_price = 0
+        self.nonces = {}
+        self.samples = []
+
+    def run(self, ready=None):
+        """Run the workload, returning the list of samples.
+
+        :param ready: A function called once prepared to send, returning the start reference as perf_counter_ns
+        """
+        self.operation.setup(self.accounts)
+        if self.operation.TRANSACT: self.__setup_transactions()
+        if self.operation.TRANSACT and self.mode != 'loop':
+            logging.info('Creating and signing %d transactions', self.iterations)
+            txs = [self.__transaction(index) for index in range(0, self.iterations)]
+            self.signed = self.signer.sign([(account.key, tx) for account, tx in txs])
+        self.start_ns = ready() if ready is not None else time.perf_counter_ns()
+        if self.metrics is not None: self.metrics.start()
+
+        if self.mode == 'bulk': self.__run_bulk()
+        elif self.mode == 'open': self.__run_open()
+        else: self.__run_loop()
+        if self.metrics is not None: self.metrics.close()
+
+        log_failures(self.samples)
+        if self.operation.TRANSACT: self.__resolve_timestamps()
+        self.log_summary()
+        return self.samples
+
+    def write(self, path=None):
+        """Write the samples to file, by default <name>.log in the working directory, and the histogram to <name>.hdr.
+
+        The histogram is of the corrected latency, which is the same as the latency in closed loop mode.
+        """
+        path = path if path is not None else '%s.log' % self.name
+        write_samples(self.samples, path)
+        latency_histogram(self.samples, corrected=True).write('%s.hdr' % os.path.splitext(path)[0])
+
+    def log_summary(self):
+        """Log a summary of the number of requests, failures and the latency. """
+        log_summary(self.samples, corrected=self.mode == 'open')
+
+    def __run_loop(self):
+        """Make each request once the previous one completes. """
+        logging.info('Running %s requests in a loop', self.iterations if self.iterations > 0 else 'unbounded')
+        for index in range(0, self.iterations) if self.iterations > 0 else itertools.count():
+            if self.operation.TRANSACT: self.samples.append(self.__transact(index))
+            else: self.samples.append(self.__call(index))
+            if (index + 1) % 100 == 0: logging.info('Completed %d requests', index + 1)
+            if self.delay > 0: time.sleep(self.delay)
+
+    def __run_bulk(self):
+        """Send the signed transactions as fast as possible, and then wait for their receipts. """
+        logging.info('Bulk sending transactions to the network')
+        for index, tx in enumerate(self.signed): self.samples.append(self.__send(index, tx))
+        self.__wait_receipts()
+
+    def __run_open(self):
+        """Make requests at the intended times of the arrival schedule, independently of when earlier ones complete. """
+        logging.info('Running %s requests at %.2f per second with %s arrivals',
+                     self.iterations if self.iterations > 0 else 'unbounded', self.rate, self.arrival)
+        lock = threading.Lock()
+        def request(index, intended):
+            if self.signed is not None: sample = self.__send(index, self.signed[index], intended)
+            else: sample = self.__call(index, intended)
+            with lock: self.samples.append(sample)
+
+        schedule_ns = time.perf_counter_ns()
+        offset = self.__relative(schedule_ns)
+        indexes = range(0, self.iterations) if self.iterations > 0 else itertools.count()
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='open_loop') as executor:
+            for index, intended in zip(indexes, arrival_times(self.rate, self.arrival)):
+                wait = intended - (time.perf_counter_ns() - schedule_ns) / 1e9
+                if wait > 0: time.sleep(wait)
+                executor.submit(request, index, offset + intended)
+                if (index + 1) % 100 == 0: logging.info('Scheduled %d requests', index + 1)
+        self.samples.sort(key=lambda s: s.index)
+        if self.operation.TRANSACT: self.__wait_receipts()
+
+    def __call(self, index, intended=None):
+        """Make a call request, returning its sample. """
+        account = self.accounts[index % len(self.accounts)]
+        start_ns = time.perf_counter_ns()
+        try:
+            result = self.operation.call(index, account)
+            ok = True
+            logging.debug('Request %d returned %s', index, result)
+        except Exception as e:
+            logging.error('Error in request %d, %s', index, e)
+            ok = False
+        end_ns = time.perf_counter_ns()
+        sample = Sample(index, self.__relative(start_ns), (end_ns - start_ns) / 1e6, ok, intended=intended)
+        report(self.metrics, sample)
+        return sample
+
+    def __send(self, index, tx, intended=None):
+        """Send a signed transaction without waiting for its receipt, returning its sample. """
+        start_ns = time.perf_counter_ns()
+        try:
+            self.client.call('eth_sendRawTransaction', [tx.rawTransaction.hex()])
+            ok = True
+        except JsonRpcError as e:
+            logging.error('Error sending raw transaction %d, %s', index, e)
+            ok = False
+        end_ns = time.perf_counter_ns()
+        sample = Sample(index, self.__relative(start_ns), (end_ns - start_ns) / 1e6, ok,
+                        hash=tx.hash.hex() if ok else None, intended=intended)
+        report(self.metrics, sample, completed=False)
+        return sample
+
+    def __transact(self, index):
+        """Sign and send a transaction and wait for its receipt, returning its sample. """
+        start_ns = time.perf_counter_ns()
+        sample = Sample(index, self.__relative(start_ns), 0, False)
+        try:
+            tx = self.__sign(index)
+            self.client.call('eth_sendRawTransaction', [tx.rawTransaction.hex()])
+            sample.hash = tx.hash.hex()
+            sample.ok = True
+        except Exception as e:
+            logging.error('Error sending transaction %d, %s', index, e)
+            account = self.accounts[index % len(self.accounts)]
+            self.nonces[account.address] = self.nonces[account.address] - 1
+        if sample.ok: self.__receipt(sample, time.time() + self.timeout)
+        sample.latency = (time.perf_counter_ns() - start_ns) / 1e6
+        report(self.metrics, sample)
+        return sample
+
+    def __wait_receipts(self):
+        """Wait for the receipts of all sent transactions. """
+        logging.info('Waiting for transaction receipts')
+        deadline = time.time() + self.timeout
+        for sample in self.samples:
+            if not sample.ok: continue
+            self.__receipt(sample, deadline)
+            report(self.metrics, sample, sent=False)
+
+    def __setup_transactions(self):
+        """Get the gas price, chain id, nonces and gas limit needed to sign transactions. """
+        self.gas_price = int(self.client.call('eth_gasPrice'), 16)
+        if self.chain_id is None: self.chain_id = int(self.client.call('eth_chainId'), 16)
+        for account in self.accounts:
+            self.nonces[account.address] = int(self.client.call('eth_getTransactionCount',
+                                                                [account.address, 'pending']), 16)
+        if self.gas_limit is None:
+            account = self.accounts[0]
+            tx = self.operation.transaction(0, account)
+            params = {'from': account.address, 'to': tx['to'], 'value': hex(tx['value'])}
+            if 'data' in tx: params['data'] = tx['data']
+            self.gas_limit = int(self.client.call('eth_estimateGas', [params]), 16)
+            logging.info('Estimated gas limit is %d', self.gas_limit)
+
+    def __sign(self, index):
+        """Sign the transaction for an iteration, from the next account and nonce. """
+        account, tx = self.__transaction(index)
+        return account.sign_transaction(tx)
+
+    def __transaction(self, index):
+        """Return the account and unsigned transaction for an iteration, from the next account and nonce. """
+        account = self.accounts[index % len(self.accounts)]
+        nonce = self.nonces[account.address]
+        self.nonces[account.address] = nonce + 1
+
+        scale = 1 + (self.gas_price_ramp * index / self.iterations if self.iterations > 0 else 0)
+        tx = self.operation.transaction(index, account)
+        tx.update({'nonce': nonce, 'gas': self.gas_limit, 'gasPrice': int(scale * self.gas_price),
+                   'chainId': self.chain_id})
+        return account, tx
+
+    def __receipt(self, sample, deadline):
+        """Wait for the receipt of the transaction of a sample until a deadline, marking it failed if not returned. """
+        while True:
+            try:
+                receipt = self.client.call('eth_getTransactionReceipt', [sample.hash])
+            except JsonRpcError as e:
+                logging.error('Error getting receipt for transaction %d, %s', sample.index, e)
+                receipt = None
+            if receipt is not None:
+                sample.block = int(receipt['blockNumber'], 16)
+                sample.ok = int(receipt['status'], 16) == 1
+                if not sample.ok: logging.error('Transaction %d failed with status %s', sample.index, receipt['status'])
+                return
+            if time.time() > deadline:
+                logging.error('Timed out waiting for receipt of transaction %d', sample.index)
+                sample.ok = False
+                return
+            time.sleep(self.POLL_INTERVAL)
+
+    def __resolve_timestamps(self):
+        """Set the timestamp of the samples from the blocks their transactions were included in, in batches. """
+        timestamps = BlockScanner(self.client).timestamps(s.block for s in self.samples if s.block is not None)
+        for sample in self.samples:
+            if sample.block is not None: sample.timestamp = timestamps[sample.block]
+
+    def __relative(self, ns):
+        """Return a perf_counter_ns time in seconds relative to the start reference. """
+        return (ns - self.start_ns) / 1e9
@@ -21,6 +21,11 @@ def attributedict_to_dict(obj):
         return obj
 
 
+class NoConnectionUrl(Exception):
+    """Raised on requesting the connection url of a network that cannot be reached from a separate process. """
+    pass
+
+
 class DefaultPostLondon:
     """A default connection giving access to an underlying network.
 
@@ -28,6 +33,7 @@ class DefaultPostLondon:
     ETH_LIMIT = 0.001                   # lower than this then allocate more funds
     ETH_ALLOC = 0.005                   # the allocation amount (for configured accounts)
     ETH_ALLOC_EPHEMERAL = 0.001         # the allocation amount (for ephemeral accounts)
+    HAS_CONNECTION_URL = True           # false if there is no url to reach the network from a separate process
 
     def __init__(self, test, name=None, **kwargs):
         """Construct and instance of the network connection abstraction."""
@@ -46,7 +52,10 @@ class DefaultPostLondon:
         return self.CHAIN_ID
 
     def connection_url(self, web_socket=False):
-        """Return the connection URL to the network."""
+        """Return the connection URL to the network.
+
+        Callers should check HAS_CONNECTION_URL first, as networks without a url raise NoConnectionUrl.
+        """
         port = self.PORT if not web_socket else self.WS_PORT
         host = self.HOST if not web_socket else self.WS_HOST
         return '%s:%d' % (host, port)
@@ -57,7 +66,9 @@ class DefaultPostLondon:
 
         if not web_socket: web3 = Web3(Web3.HTTPProvider(url))
         else: web3 = Web3(Web3.WebsocketProvider(url, websocket_timeout=120))
+        test.cost_accounting.attach(web3)
         account = web3.eth.account.from_key(private_key)
+        test.rpc_metrics.attach(web3, self.__class__.__name__, account.address)
         balance = web3.from_wei(web3.eth.get_balance(account.address), 'ether')
         if verbose: self.log.info('Account %s connected to %s (%.6f ETH), wss=%s', account.address, self.__class__.__name__, balance, web_socket)
 
@@ -144,6 +155,7 @@ class DefaultPostLondon:
             'maxPriorityFeePerGas': max_priority_fee_per_gas  # Priority fee to include the transaction in the block
         }
         if 'access_list' in kwargs: params['accessList'] = kwargs['access_list']
+        if 'value' in kwargs: params['value'] = kwargs['value']
         if estimate:
             while gas_attempts > 0:
                 try:
@@ -239,6 +251,7 @@ class DefaultPreLondon(DefaultPostLondon):
             'gasPrice': gas_price             # the current gas price
         }
         if 'access_list' in kwargs: params['accessList'] = kwargs['access_list']
+        if 'value' in kwargs: params['value'] = kwargs['value']
         if estimate:
             while gas_attempts > 0:
                 try:
@@ -1,5 +1,6 @@
 from ten.test.networks.default import DefaultPreLondon
 from ten.test.utils.properties import Properties
+from ten.test.utils.threading import thread_num
 
 
 class Ganache(DefaultPreLondon):
@@ -16,3 +17,16 @@ class Ganache(DefaultPreLondon):
         self.PORT = props.port_http('ganache')
         self.WS_PORT = props.port_ws('ganache')
         self.CHAIN_ID = props.chain_id('ganache')
+        if Properties.GanachePorts is not None:
+            self.PORT = Properties.GanachePorts[thread_num()]
+            self.WS_PORT = self.PORT
+
+    @classmethod
+    def snapshot(cls, web3):
+        """Snapshot the state of the chain, returning the id of the snapshot. """
+        return web3.provider.make_request('evm_snapshot', [])['result']
+
+    @classmethod
+    def revert(cls, web3, snapshot_id):
+        """Revert the state of the chain to a snapshot, noting that the snapshot is consumed on revert. """
+        return web3.provider.make_request('evm_revert', [snapshot_id])['result']
@@ -16,5 +16,7 @@ class Geth(DefaultPreLondon):
         if not web_socket: web3 = Web3(Web3.HTTPProvider(url))
         else: web3 = Web3(Web3.WebsocketProvider(url, websocket_timeout=120))
         web3.middleware_onion.inject(geth_poa_middleware, layer=0)
+        test.cost_accounting.attach(web3)
         account = web3.eth.account.from_key(private_key)
+        test.rpc_metrics.attach(web3, self.__class__.__name__, account.address)
         return web3, account
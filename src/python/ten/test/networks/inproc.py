@@ -0,0 +1,79 @@
+import threading
+from web3 import Web3
+from web3.providers.eth_tester import EthereumTesterProvider
+from ten.test.networks.default import DefaultPostLondon, NoConnectionUrl
+from ten.test.utils.properties import Properties
+from ten.test.utils import crypto
+
+
+class LockedEthereumTesterProvider(EthereumTesterProvider):
+    """An eth-tester provider serialising requests, as the underlying chain is shared across the runner threads. """
+    LOCK = threading.RLock()
+
+    def make_request(self, method, params):
+        with self.LOCK: return super().make_request(method, params)
+
+
+class InProc(DefaultPostLondon):
+    """An in-process network backed by the eth-tester py-evm backend.
+
+    The chain is created on first use and shared by all tests in the run, with transactions mined instantly on
+    submission. The funded and common accounts are allocated funds at genesis. As there is no external process there
+    is no connection url, so tests that run clients in a separate process are not supported against this network,
+    and are skipped by the helpers that launch them.
+    """
+    ETH_LIMIT = 0.05
+    ETH_ALLOC = 0.1
+    ETH_ALLOC_EPHEMERAL = 0.01
+    ETH_GENESIS = 1000000               # the genesis allocation for the funded account
+    GAS_LIMIT = 30000000                # the block gas limit
+    TESTER = None                       # the eth tester instance shared across the tests
+    HAS_CONNECTION_URL = False
+
+    @classmethod
+    def tester(cls):
+        """Return the shared eth tester instance, creating it on first use. """
+        with LockedEthereumTesterProvider.LOCK:
+            if cls.TESTER is None:
+                from eth_tester import EthereumTester, PyEVMBackend
+                props = Properties()
+                state = {}
+                allocations = [(props.fundacntpk(), cls.ETH_GENESIS)]
+                allocations.extend([(fn(), 10*cls.ETH_ALLOC) for fn in props.accounts()])
+                for pk, value in allocations:
+                    address = bytes.fromhex(crypto.address(pk)[2:])
+                    if address in state: continue
+                    state[address] = {'balance': Web3.to_wei(value, 'ether'), 'nonce': 0, 'code': b'', 'storage': {}}
+                params = PyEVMBackend.generate_genesis_params(overrides={'gas_limit': cls.GAS_LIMIT})
+                cls.TESTER = EthereumTester(PyEVMBackend(genesis_parameters=params, genesis_state=state))
+            return cls.TESTER
+
+    def __init__(self, test, name=None, **kwargs):
+        super().__init__(test, name, **kwargs)
+        props = Properties()
+        self.HOST = None
+        self.WS_HOST = None
+        self.PORT = None
+        self.WS_PORT = None
+        self.CHAIN_ID = props.chain_id('local.inproc')
+
+    def connection_url(self, web_socket=False):
+        """Raise NoConnectionUrl, as an in-process network cannot be reached from a separate process. """
+        raise NoConnectionUrl('The in-process network %s has no connection url' % self.__class__.__name__)
+
+    def connect(self, test, private_key, web_socket=False, check_funds=True, verbose=True):
+        """Connect to the network using a given private key, where web sockets use the same in-process provider. """
+        web3 = Web3(LockedEthereumTesterProvider(self.tester()))
+        test.cost_accounting.attach(web3)
+        account = web3.eth.account.from_key(private_key)
+        test.rpc_metrics.attach(web3, self.__class__.__name__, account.address)
+        balance = web3.from_wei(web3.eth.get_balance(account.address), 'ether')
+        if verbose: self.log.info('Account %s connected to %s (%.6f ETH)', account.address, self.__class__.__name__, balance)
+
+        if check_funds and balance < self.ETH_LIMIT:
+            if verbose: self.log.info('Account %s balance is below threshold %s ... need to distribute funds', account.address, self.ETH_LIMIT)
+            test.distribute_native(account, self.ETH_ALLOC)
+            if verbose:
+                balance = web3.from_wei(web3.eth.get_balance(account.address), 'ether')
+                self.log.info('Account %s balance is now %.6f ETH', account.address, balance)
+        return web3, account
@@ -34,7 +34,9 @@ class TenL1Sepolia(Sepolia):
 
         if not web_socket: web3 = Web3(Web3.HTTPProvider(url))
         else: web3 = Web3(Web3.WebsocketProvider(url, websocket_timeout=120))
+        test.cost_accounting.attach(web3)
         account = web3.eth.account.from_key(private_key)
+        test.rpc_metrics.attach(web3, self.__class__.__name__, account.address)
         balance = web3.from_wei(web3.eth.get_balance(account.address), 'ether')
         if verbose: self.log.info('Account %s connected to %s (%.6f ETH)', account.address, self.__class__.__name__, balance)
 
@@ -68,7 +70,9 @@ class TenL1Geth(Geth):
         if not web_socket: web3 = Web3(Web3.HTTPProvider(url))
         else: web3 = Web3(Web3.WebsocketProvider(url, websocket_timeout=120))
         web3.middleware_onion.inject(geth_poa_middleware, layer=0)
+        test.cost_accounting.attach(web3)
         account = web3.eth.account.from_key(private_key)
+        test.rpc_metrics.attach(web3, self.__class__.__name__, account.address)
         balance = web3.from_wei(web3.eth.get_balance(account.address), 'ether')
         if verbose: self.log.info('Account %s connected to %s (%.6f ETH)', account.address, self.__class__.__name__, balance)
 
@@ -139,7 +143,9 @@ class Ten(DefaultPreLondon):
 
         if not web_socket: web3 = Web3(Web3.HTTPProvider(url))
         else: web3 = Web3(Web3.WebsocketProvider(url, websocket_timeout=120))
+        test.cost_accounting.attach(web3)
         account = web3.eth.account.from_key(private_key)
+        test.rpc_metrics.attach(web3, self.__class__.__name__, account.address)
         self.__register(test, account)
         balance = web3.from_wei(web3.eth.get_balance(account.address), 'ether')
         if verbose: self.log.info('Account %s connected to %s (%.6f ETH), wss=%s', account.address, self.__class__.__name__, balance, web_socket)
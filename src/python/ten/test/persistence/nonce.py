@@ -13,6 +13,7 @@ class NoncePersistence:
     SQL_DELENV = "DELETE from nonce_db WHERE environment=?"
     SQL_ACCNTS = "SELECT DISTINCT account from nonce_db where environment=?"
     SQL_DELENT = "DELETE from nonce_db WHERE account=? AND environment=? AND nonce=?"
+    SQL_LATALL = "SELECT account, MAX(nonce) FROM nonce_db WHERE environment=? GROUP BY account"
 
     def __init__(self, db_dir):
         """Instantiate an instance. """
@@ -91,3 +92,19 @@ class NoncePersistence:
             return int(result)
         except:
             return None
+
+    def get_latest_nonces(self, environment):
+        """Get the latest nonce for all accounts with persisted values for a given environment. """
+        self.cursor.execute(self.SQL_LATALL, (environment, ))
+        return {account: int(nonce) for account, nonce in self.cursor.fetchall()}
+
+    def rewind(self, environment, nonces):
+        """Rewind the persistence for an environment to a set of latest nonces, e.g. on reverting to a snapshot.
+
+        Accounts not in the set of latest nonces have all their entries deleted, otherwise entries after the latest
+        nonce for an account are deleted.
+        """
+        for account, in self.get_accounts(environment):
+            if account not in nonces: self.cursor.execute(self.SQL_DELETE, (account, environment))
+            else: self.cursor.execute(self.SQL_DELFRO, (account, environment, nonces[account]+1))
+        self.connection.commit()
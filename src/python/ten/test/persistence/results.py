@@ -1,4 +1,6 @@
-import sqlite3, os
+import sqlite3, os, json
+from ten.test.load.saturation import Point
+from ten.test.utils.histogram import Histogram
 
 
 class ResultsPersistence:
@@ -11,6 +13,33 @@ class ResultsPersistence:
     SQL_DELETE = "DELETE from results WHERE environment=?"
     SQL_SELECT = "SELECT time, result FROM results WHERE test=? AND environment=? ORDER BY time ASC"
 
+    SQL_CREATE_LATENCY = "CREATE TABLE IF NOT EXISTS latencies " \
+                         "(test TEXT, environment TEXT, time INTEGER, count INTEGER, mean REAL, p50 REAL, p90 REAL, " \
+                         "p99 REAL, p999 REAL, max REAL, histogram TEXT, PRIMARY KEY (test, environment, time))"
+    SQL_INSERT_LATENCY = "INSERT INTO latencies VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+    SQL_DELETE_LATENCY = "DELETE from latencies WHERE environment=?"
+    SQL_SELECT_LATENCY = "SELECT time, count, mean, p50, p90, p99, p999, max FROM latencies " \
+                         "WHERE test=? AND environment=? ORDER BY time ASC"
+    SQL_SELECT_HISTOGRAM = "SELECT histogram FROM latencies WHERE test=? AND environment=? ORDER BY time ASC"
+
+    SQL_CREATE_THROUGHPUT = "CREATE TABLE IF NOT EXISTS throughputs " \
+                            "(test TEXT, environment TEXT, time INTEGER, throughput REAL, lower REAL, upper REAL, " \
+                            "duration INTEGER, stable INTEGER, PRIMARY KEY (test, environment, time))"
+    SQL_INSERT_THROUGHPUT = "INSERT INTO throughputs VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+    SQL_DELETE_THROUGHPUT = "DELETE from throughputs WHERE environment=?"
+    SQL_SELECT_THROUGHPUT = "SELECT time, throughput, lower, upper, duration, stable FROM throughputs " \
+                            "WHERE test=? AND environment=? ORDER BY time ASC"
+
+    SQL_CREATE_SATURATION = "CREATE TABLE IF NOT EXISTS saturations " \
+                            "(test TEXT, environment TEXT, time INTEGER, throughput REAL, offered REAL, knee REAL, " \
+                            "knee_p99 REAL, slo_p99 REAL, slo_error_ratio REAL, saturated INTEGER, curve TEXT, " \
+                            "PRIMARY KEY (test, environment, time))"
+    SQL_INSERT_SATURATION = "INSERT INTO saturations VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+    SQL_DELETE_SATURATION = "DELETE from saturations WHERE environment=?"
+    SQL_SELECT_SATURATION = "SELECT time, throughput, offered, knee, knee_p99, saturated FROM saturations " \
+                            "WHERE test=? AND environment=? ORDER BY time ASC"
+    SQL_SELECT_CURVE = "SELECT curve FROM saturations WHERE test=? AND environment=? ORDER BY time DESC LIMIT 1"
+
     def __init__(self, db_dir):
         """Instantiate an instance."""
         self.db = os.path.join(db_dir, 'results.db')
@@ -20,6 +49,9 @@ class ResultsPersistence:
     def create(self):
         """Create the cursor to the underlying persistence."""
         self.cursor.execute(self.SQL_CREATE)
+        self.cursor.execute(self.SQL_CREATE_LATENCY)
+        self.cursor.execute(self.SQL_CREATE_THROUGHPUT)
+        self.cursor.execute(self.SQL_CREATE_SATURATION)
 
     def close(self):
         """Close the connection to the underlying persistence."""
@@ -28,6 +60,9 @@ class ResultsPersistence:
     def delete_environment(self, environment):
         """Delete all stored performance results for a particular environment."""
         self.cursor.execute(self.SQL_DELETE, (environment, ))
+        self.cursor.execute(self.SQL_DELETE_LATENCY, (environment, ))
+        self.cursor.execute(self.SQL_DELETE_THROUGHPUT, (environment, ))
+        self.cursor.execute(self.SQL_DELETE_SATURATION, (environment, ))
         self.connection.commit()
 
     def insert_result(self, test, environment, time, result):
@@ -40,3 +75,56 @@ class ResultsPersistence:
         self.cursor.execute(self.SQL_SELECT, (test, environment))
         return self.cursor.fetchall()
 
+    def insert_latency(self, test, environment, time, histogram):
+        """Insert the summary and serialised histogram of a latency result into the persistence. """
+        summary = histogram.summary()
+        self.cursor.execute(self.SQL_INSERT_LATENCY, (test, environment, time, summary['count'], summary['mean'],
+                                                      summary['p50'], summary['p90'], summary['p99'],
+                                                      summary['p99.9'], summary['max'], histogram.encode()))
+        self.connection.commit()
+
+    def get_latencies(self, test, environment):
+        """Return the time, count, mean, p50, p90, p99, p99.9 and max of the latency results of a test. """
+        self.cursor.execute(self.SQL_SELECT_LATENCY, (test, environment))
+        return self.cursor.fetchall()
+
+    def get_latency_histogram(self, test, environment):
+        """Return the latency histogram of a test merged across all its results, e.g. for a long term percentile. """
+        self.cursor.execute(self.SQL_SELECT_HISTOGRAM, (test, environment))
+        histogram = Histogram()
+        for row in self.cursor.fetchall(): histogram.merge(Histogram.decode(row[0]))
+        return histogram
+
+    def insert_throughput(self, test, environment, time, steady_state):
+        """Insert the steady state throughput estimate with its confidence interval into the persistence. """
+        self.cursor.execute(self.SQL_INSERT_THROUGHPUT, (test, environment, time, steady_state.throughput,
+                                                         steady_state.lower, steady_state.upper,
+                                                         steady_state.duration, 1 if steady_state.stable else 0))
+        self.connection.commit()
+
+    def get_throughputs(self, test, environment):
+        """Return the time, throughput, lower and upper bound, duration and stability of the throughput results. """
+        self.cursor.execute(self.SQL_SELECT_THROUGHPUT, (test, environment))
+        return self.cursor.fetchall()
+
+    def insert_saturation(self, test, environment, time, search):
+        """Insert the max sustainable throughput, knee and load latency curve of a saturation search. """
+        best, knee = search.best, search.knee
+        self.cursor.execute(self.SQL_INSERT_SATURATION, (test, environment, time, search.max_throughput,
+                                                         best.offered if best is not None else 0,
+                                                         knee.throughput if knee is not None else None,
+                                                         knee.p99 if knee is not None else None, search.p99,
+                                                         search.error_ratio, 1 if search.saturated else 0,
+                                                         json.dumps([list(p) for p in search.curve])))
+        self.connection.commit()
+
+    def get_saturations(self, test, environment):
+        """Return the time, max throughput, offered rate, knee, its p99 and if saturated of the saturation searches. """
+        self.cursor.execute(self.SQL_SELECT_SATURATION, (test, environment))
+        return self.cursor.fetchall()
+
+    def get_saturation_curve(self, test, environment):
+        """Return the load latency curve of the most recent saturation search of a test as a list of points. """
+        self.cursor.execute(self.SQL_SELECT_CURVE, (test, environment))
+        row = self.cursor.fetchone()
+        return [Point(*p) for p in json.loads(row[0])] if row is not None else []
@@ -0,0 +1,150 @@
+import threading, secrets
+from collections import deque
+
+
+class AccountPool:
+    """A pool of pre-funded ephemeral accounts, held per amount tier.
+
+    The pool is owned by the runner and funded from a dedicated funder account, so that refilling it does not contend
+    with the tests for the nonces of the funded account. A background thread tops up each tier to the target size,
+    sending all the transfers of a refill before waiting on any of the receipts. Tests acquire the private key of an
+    account from the smallest tier that covers the amount they need, and any funds left in the accounts are reclaimed
+    when the pool is closed at the end of the run. A refill that errors, e.g. on an rpc timeout, is retried with
+    backoff, and the pool is only marked as exhausted once the funder has insufficient funds for another account.
+    """
+    GAS_RECLAIM = 21000                 # the gas used to return funds from an ephemeral account
+    BACKOFF = 1.0                       # the initial delay in seconds before retrying a failed refill
+    MAX_BACKOFF = 30.0                  # the maximum delay in seconds between retries of a failed refill
+
+    def __init__(self, web3, funder, tiers, size, log):
+        """Instantiate an instance, where tiers is a list of amounts in ether and size the target per tier. """
+        self.web3 = web3
+        self.funder = funder
+        self.tiers = sorted(tiers)
+        self.size = size
+        self.log = log
+        self.pools = {tier: deque() for tier in self.tiers}
+        self.issued = []                # every account funded by the pool, for reclaiming funds at the end
+        self.condition = threading.Condition()
+        self.stopped = False
+        self.exhausted = False
+        self.thread = None
+
+    def start(self):
+        """Start the background thread refilling the pool. """
+        self.thread = threading.Thread(target=self.__refill, name='account_pool', daemon=True)
+        self.thread.start()
+
+    def tier(self, min_eth):
+        """Return the smallest tier covering the amount, or None if no tier is large enough. """
+        for tier in self.tiers:
+            if tier >= min_eth: return tier
+        return None
+
+    def acquire(self, min_eth, timeout=0):
+        """Acquire the private key of an account with at least the given funds in ether, or None if not available.
+
+        If the tier is empty the call waits up to the timeout for the pool to be refilled.
+        """
+        tier = self.tier(min_eth)
+        if tier is None: return None
+        with self.condition:
+            if len(self.pools[tier]) == 0 and timeout > 0 and not self.exhausted:
+                self.condition.wait_for(lambda: len(self.pools[tier]) > 0 or self.exhausted, timeout)
+            private_key = self.pools[tier].popleft() if len(self.pools[tier]) > 0 else None
+            self.condition.notify_all()
+        return private_key
+
+    def is_issued(self, address):
+        """Return true if an address is that of an account funded by the pool, whose funds are reclaimed on close. """
+        return any(account.address == address for account in list(self.issued))
+
+    def close(self, address):
+        """Stop refilling the pool and reclaim the funds of all issued accounts to the given address. """
+        with self.condition:
+            self.stopped = True
+            self.condition.notify_all()
+        if self.thread is not None: self.thread.join(timeout=60)
+        self.reclaim(self.issued, address)
+        self.reclaim([self.funder], address)
+
+    def reclaim(self, accounts, address):
+        """Return the funds of a list of accounts to an address, leaving only the gas needed for the transfer. """
+        web3 = self.web3
+        gas_price = web3.eth.gas_price
+        chain_id = web3.eth.chain_id
+        tx_hashes = []
+        for account in accounts:
+            try:
+                balance = web3.eth.get_balance(account.address)
+                if balance <= self.GAS_RECLAIM * gas_price: continue
+                tx = {'to': address, 'value': balance - self.GAS_RECLAIM * gas_price, 'gas': self.GAS_RECLAIM,
+                      'gasPrice': gas_price, 'nonce': web3.eth.get_transaction_count(account.address),
+                      'chainId': chain_id}
+                tx_hashes.append(web3.eth.send_raw_transaction(account.sign_transaction(tx).rawTransaction))
+            except Exception as e:
+                self.log.warn('Unable to reclaim funds from %s, %s', account.address, e)
+        for tx_hash in tx_hashes:
+            try:
+                web3.eth.wait_for_transaction_receipt(tx_hash, timeout=60)
+            except Exception as e:
+                self.log.warn('Timed out reclaiming funds with tx %s, %s', tx_hash.hex(), e)
+        self.log.info('Reclaimed funds from %d accounts in the account pool', len(tx_hashes))
+
+    def __refill(self):
+        """Refill each tier to the target size until the pool is stopped or the funder is exhausted. """
+        backoff = self.BACKOFF
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.stopped or self.__needed() > 0)
+                if self.stopped: return
+            for tier in self.tiers:
+                needed = self.size - len(self.pools[tier])
+                if needed <= 0: continue
+                try:
+                    private_keys = self.__fund(tier, needed)
+                    backoff = self.BACKOFF
+                except Exception as e:
+                    self.log.warn('Unable to refill the account pool, retrying in %.1f secs, %s', backoff, e)
+                    with self.condition: self.condition.wait_for(lambda: self.stopped, backoff)
+                    backoff = min(2 * backoff, self.MAX_BACKOFF)
+                    break
+                with self.condition:
+                    if private_keys is None:
+                        self.log.warn('Funder of the account pool has insufficient funds, no longer refilling')
+                        self.exhausted = True
+                    else: self.pools[tier].extend(private_keys)
+                    self.condition.notify_all()
+                    if self.exhausted: return
+
+    def __needed(self):
+        """Return the number of accounts needed to bring all tiers to the target size. """
+        return sum([max(0, self.size - len(pool)) for pool in self.pools.values()])
+
+    def __fund(self, tier, number):
+        """Create and fund a number of accounts for a tier, returning their private keys, or None if out of funds. """
+        web3 = self.web3
+        value = web3.to_wei(tier, 'ether')
+        gas_price = web3.eth.gas_price
+        gas = web3.eth.estimate_gas({'from': self.funder.address, 'to': self.funder.address, 'value': value})
+        balance = web3.eth.get_balance(self.funder.address)
+        number = min(number, balance // (value + gas * gas_price))
+        if number == 0: return None
+
+        chain_id = web3.eth.chain_id
+        nonce = web3.eth.get_transaction_count(self.funder.address)
+        funded = []
+        for _ in range(0, number):
+            private_key = secrets.token_hex(32)
+            account = web3.eth.account.from_key(private_key)
+            tx = {'to': account.address, 'value': value, 'gas': gas, 'gasPrice': gas_price, 'nonce': nonce,
+                  'chainId': chain_id}
+            tx_hash = web3.eth.send_raw_transaction(self.funder.sign_transaction(tx).rawTransaction)
+            self.issued.append(account)
+            funded.append((private_key, tx_hash))
+            nonce = nonce + 1
+
+        private_keys = []
+        for private_key, tx_hash in funded:
+            if web3.eth.wait_for_transaction_receipt(tx_hash, timeout=60).status == 1: private_keys.append(private_key)
+        return private_keys
@@ -0,0 +1,96 @@
+import threading, rlp
+from eth_utils import keccak, to_checksum_address, big_endian_to_int
+
+
+def _to_int(value):
+    """Return an integer from a json rpc quantity, which may already have been converted. """
+    if value is None: return None
+    if isinstance(value, str): return int(value, 16)
+    return int(value)
+
+
+def _to_hex(value):
+    """Return a lowercase hex string for a transaction hash given as bytes or a string. """
+    if isinstance(value, (bytes, bytearray)): return '0x' + bytes(value).hex()
+    return value.lower() if value.startswith('0x') else '0x' + value.lower()
+
+
+def decode_raw_transaction(raw):
+    """Decode a signed raw transaction to its hash, value and gas price (max fee for a dynamic fee transaction). """
+    raw = bytes.fromhex(raw[2:]) if isinstance(raw, str) else bytes(raw)
+    if raw[0] > 0x7f:
+        fields = rlp.decode(raw)                        # legacy [nonce, gasPrice, gas, to, value, ...]
+        price, value = fields[1], fields[4]
+    elif raw[0] == 1:
+        fields = rlp.decode(raw[1:])                    # access list [chainId, nonce, gasPrice, gas, to, value, ...]
+        price, value = fields[2], fields[5]
+    else:
+        fields = rlp.decode(raw[1:])                    # dynamic fee [chainId, nonce, tip, maxFee, gas, to, value, ...]
+        price, value = fields[3], fields[6]
+    return '0x' + keccak(raw).hex(), big_endian_to_int(value), big_endian_to_int(price)
+
+
+class CostAccounting:
+    """Accounting of the cost of transactions sent by a test, as seen on the web3 connections made by the test.
+
+    A middleware is attached to each connection that records the value and gas price of raw transactions as they are
+    sent, and the gas used and effective gas price from their receipts when they are returned. The cost of a
+    transaction is only accounted once its receipt has been seen, so no additional requests are made to the network.
+    Transactions sent outside of the test's connections, e.g. by client processes, are not accounted.
+    """
+
+    def __init__(self):
+        """Instantiate an instance. """
+        self.lock = threading.Lock()
+        self.sent = {}              # tx hash to the value and gas price of sent transactions
+        self.seen = set()           # tx hashes where the receipt has been accounted
+        self.fees = {}              # account address to the total fees paid
+        self.values = {}            # account address to the total value transferred
+
+    def attach(self, web3):
+        """Attach the accounting middleware to a web3 connection. """
+        if 'cost_accounting' not in web3.middleware_onion: web3.middleware_onion.add(self.middleware, 'cost_accounting')
+        return web3
+
+    def middleware(self, make_request, web3):
+        """The web3 middleware recording sent transactions and their receipts. """
+        def accounting_middleware(method, params):
+            response = make_request(method, params)
+            if method == 'eth_sendRawTransaction' and 'error' not in response:
+                self.record_sent(params[0])
+            elif method == 'eth_getTransactionReceipt' and response.get('result') is not None:
+                self.record_receipt(response['result'])
+            return response
+        return accounting_middleware
+
+    def record_sent(self, raw):
+        """Record a raw transaction that has been sent. """
+        try:
+            tx_hash, value, price = decode_raw_transaction(raw)
+            with self.lock: self.sent[tx_hash] = (value, price)
+        except Exception:
+            pass
+
+    def record_receipt(self, receipt):
+        """Record a transaction receipt, accounting the cost if the transaction was sent by the test. """
+        tx_hash = _to_hex(receipt['transactionHash'])
+        with self.lock:
+            if tx_hash not in self.sent or tx_hash in self.seen: return
+            self.seen.add(tx_hash)
+            value, price = self.sent[tx_hash]
+            if receipt.get('effectiveGasPrice') is not None: price = _to_int(receipt['effectiveGasPrice'])
+            address = to_checksum_address(receipt['from'])
+            self.fees[address] = self.fees.get(address, 0) + _to_int(receipt['gasUsed']) * price
+            self.values[address] = self.values.get(address, 0) + (value if _to_int(receipt['status']) == 1 else 0)
+
+    def total_fees(self):
+        """Return the total fees paid across all accounts. """
+        with self.lock: return sum(self.fees.values())
+
+    def total_value(self):
+        """Return the total value transferred across all accounts. """
+        with self.lock: return sum(self.values.values())
+
+    def accounts(self):
+        """Return a list of tuples of the account address, fees paid and value transferred. """
+        with self.lock: return [(address, self.fees[address], self.values[address]) for address in self.fees]
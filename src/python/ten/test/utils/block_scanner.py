@@ -0,0 +1,136 @@
+import logging
+from collections import OrderedDict, namedtuple
+from ten.test.helpers.json_rpc import JsonRpcError, JsonRpcMethodNotFound
+
+Inclusion = namedtuple('Inclusion', 'block timestamp status gas_used')
+
+
+def _hex(tx_hash):
+    """Return a transaction hash given as a hex string or bytes as a lower case hex string with the 0x prefix. """
+    if isinstance(tx_hash, str): return (tx_hash if tx_hash.startswith('0x') else '0x' + tx_hash).lower()
+    return '0x' + bytes(tx_hash).hex()
+
+
+class BlockScanner:
+    """A resolver of the inclusion of transactions in bulk, for the analysis of a run once it has completed.
+
+    Rather than a request for each transaction and then for its block, the blocks of a range are scanned once in
+    batches, and the receipts of the blocks that include the transactions are requested in batches using
+    eth_getBlockReceipts, so resolving thousands of transactions takes a few hundred requests. Where the block range
+    is not known, or eth_getBlockReceipts is not supported, the receipts are instead requested in batches by hash and
+    the timestamps of their distinct blocks looked up. Blocks are held in a least recently used cache, so blocks are
+    only requested once across calls.
+    """
+    BATCH_SIZE = 100                # the maximum number of requests in a batch
+    CACHE_SIZE = 4096               # the maximum number of blocks held in the cache
+
+    def __init__(self, client, url=None, batch_size=BATCH_SIZE, cache_size=CACHE_SIZE):
+        """Instantiate an instance.
+
+        :param client: The json rpc client to the network
+        :param url: The url of the network, or None for the default url of the client
+        """
+        self.client = client
+        self.url = url
+        self.batch_size = batch_size
+        self.cache_size = cache_size
+        self.cache = OrderedDict()      # block number to the timestamp and transaction hashes, least recent first
+        self.block_receipts = True      # false once eth_getBlockReceipts is found not to be supported
+
+    def resolve(self, hashes, first=None, last=None):
+        """Resolve the inclusion of a list of transaction hashes, optionally scanning a known range of blocks.
+
+        Returns a dictionary of each hash as given to its Inclusion, i.e. the block number, timestamp, status and gas
+        used, where transactions that are not found are not included. Hashes not found in the range of blocks, e.g. as
+        they were mined outside of it or a block could not be requested, fall back to a request for their receipt.
+        """
+        wanted = {_hex(h): h for h in hashes}
+        if first is None or last is None: resolved = self.__receipts(list(wanted))
+        else:
+            blocks = self.blocks(range(first, last + 1))
+            included = OrderedDict()    # block number to the wanted hashes it includes
+            for number, block in blocks.items():
+                found = [h for h in block[1] if h in wanted] if block is not None else []
+                if len(found) > 0: included[number] = found
+            resolved = self.__block_receipts(included, blocks) if self.block_receipts else None
+            if resolved is None: resolved = self.__receipts([h for found in included.values() for h in found])
+            missing = [h for h in wanted if h not in resolved]
+            if len(missing) > 0:
+                logging.info('%d transactions not found in blocks %d to %d, requesting receipts by hash',
+                             len(missing), first, last)
+                resolved.update(self.__receipts(missing))
+        if len(resolved) < len(wanted): logging.warning('%d transactions not found', len(wanted) - len(resolved))
+        return {wanted[h]: inclusion for h, inclusion in resolved.items() if h in wanted}
+
+    def timestamps(self, numbers):
+        """Return a dictionary of block number to its timestamp, or None if the block could not be requested. """
+        return {number: block[0] if block is not None else None for number, block in self.blocks(numbers).items()}
+
+    def blocks(self, numbers):
+        """Return a dictionary of block number to its timestamp and transaction hashes, or None if not requested. """
+        blocks = {}
+        for number in sorted(set(numbers)):
+            blocks[number] = self.cache.get(number)
+            if number in self.cache: self.cache.move_to_end(number)
+        missing = [number for number, block in blocks.items() if block is None]
+        for chunk, results in self.__batch('eth_getBlockByNumber', [[hex(n), False] for n in missing]):
+            for (number, _), block in zip(chunk, results):
+                if isinstance(block, JsonRpcError) or block is None:
+                    logging.error('Error getting block %s, %s', int(number, 16), block)
+                    continue
+                number = int(number, 16)
+                blocks[number] = (int(block['timestamp'], 16), [_hex(h) for h in block['transactions']])
+                self.__cache(number, blocks[number])
+        return blocks
+
+    def __block_receipts(self, included, blocks):
+        """Return the inclusion of the wanted hashes of blocks from their block receipts, or None if not supported. """
+        resolved, failed = {}, []
+        numbers = list(included)
+        for chunk, results in self.__batch('eth_getBlockReceipts', [[hex(n)] for n in numbers]):
+            for (number, ), receipts in zip(chunk, results):
+                number = int(number, 16)
+                if isinstance(receipts, JsonRpcMethodNotFound):
+                    logging.info('Block receipts are not supported, requesting receipts by hash')
+                    self.block_receipts = False
+                    return None
+                if isinstance(receipts, JsonRpcError) or receipts is None: failed.extend(included[number])
+                else:
+                    wanted = set(included[number])
+                    timestamp = blocks[number][0]
+                    for receipt in receipts:
+                        if _hex(receipt['transactionHash']) in wanted:
+                            resolved[_hex(receipt['transactionHash'])] = self.__inclusion(receipt, timestamp)
+        if len(failed) > 0: resolved.update(self.__receipts(failed))
+        return resolved
+
+    def __receipts(self, hashes):
+        """Return the inclusion of a list of hashes from their receipts, looking up the timestamps of their blocks. """
+        receipts = {}
+        for chunk, results in self.__batch('eth_getTransactionReceipt', [[h] for h in hashes]):
+            for (tx_hash, ), receipt in zip(chunk, results):
+                if isinstance(receipt, JsonRpcError): logging.error('Error getting receipt %s, %s', tx_hash, receipt)
+                elif receipt is not None: receipts[tx_hash] = receipt
+        timestamps = self.timestamps(int(r['blockNumber'], 16) for r in receipts.values())
+        return {h: self.__inclusion(r, timestamps.get(int(r['blockNumber'], 16))) for h, r in receipts.items()}
+
+    def __inclusion(self, receipt, timestamp):
+        """Return the inclusion of a transaction from its receipt and the timestamp of its block. """
+        return Inclusion(int(receipt['blockNumber'], 16), timestamp, int(receipt['status'], 16),
+                         int(receipt['gasUsed'], 16))
+
+    def __batch(self, method, params):
+        """Generator over the params and results of batches of requests of a method, where errors are returned. """
+        for i in range(0, len(params), self.batch_size):
+            chunk = params[i:i + self.batch_size]
+            try:
+                results = self.client.batch([(method, p) for p in chunk], self.url)
+            except JsonRpcError as e:
+                results = [e] * len(chunk)
+            yield chunk, results
+
+    def __cache(self, number, block):
+        """Add a block to the cache, evicting the least recently used if full. """
+        self.cache[number] = block
+        self.cache.move_to_end(number)
+        while len(self.cache) > self.cache_size: self.cache.popitem(last=False)
@@ -1,10 +1,10 @@
 import time, os
-from web3._utils.events import EventLogErrorFlags
 from ten.test.contracts.erc20 import ERC20Token
 from ten.test.contracts.bridge import WrappedERC20
 from ten.test.contracts.bridge import ObscuroBridge, EthereumBridge, Management
 from ten.test.contracts.bridge import L1MessageBus, L2MessageBus, L1CrossChainMessenger, L2CrossChainMessenger
 from ten.test.helpers.log_subscriber import AllEventsLogSubscriber
+from ten.test.utils.events import EventDecoder
 from ten.test.utils.properties import Properties
 
 
@@ -20,6 +20,7 @@ class BridgeDetails:
         self.bus = bus
         self.xchain = xchain
         self.name = name
+        self.decoder = EventDecoder(bus.abi, bridge.abi)
 
     def wait_for_message(self, xchain_msg, timeout=60):
         """Wait for a cross chain message to be verified as final. """
@@ -117,7 +118,7 @@ class L1BridgeDetails(BridgeDetails):
                                            self.account, gas_limit=self.bridge.GAS_LIMIT, persist_nonce=False,
                                            timeout=timeout)
 
-        logs = self.bus.contract.events.LogMessagePublished().process_receipt(tx_receipt, EventLogErrorFlags.Discard)
+        logs = self.decoder.decode_logs([tx_receipt], 'LogMessagePublished')
         return tx_receipt, self.get_cross_chain_message(logs[0])
 
     def send_erc20(self, symbol, address, amount, timeout=60):
@@ -131,7 +132,7 @@ class L1BridgeDetails(BridgeDetails):
                                                                                     amount, address),
                                            self.account, gas_limit=self.bridge.GAS_LIMIT, persist_nonce=False,
                                            timeout=timeout)
-        logs = self.bus.contract.events.LogMessagePublished().process_receipt(tx_receipt, EventLogErrorFlags.Discard)
+        logs = self.decoder.decode_logs([tx_receipt], 'LogMessagePublished')
         return tx_receipt, self.get_cross_chain_message(logs[0])
 
     def send_native(self, address, amount, timeout=60):
@@ -145,8 +146,8 @@ class L1BridgeDetails(BridgeDetails):
         )
         tx_receipt = self.network.tx(self.test, self.web3, build_tx, self.account, persist_nonce=False, timeout=timeout)
 
-        value_transfer = self.bus.contract.events.ValueTransfer().process_receipt(tx_receipt, EventLogErrorFlags.Discard)
-        log_message = self.bus.contract.events.LogMessagePublished().process_receipt(tx_receipt, EventLogErrorFlags.Discard)
+        value_transfer = self.decoder.decode_logs([tx_receipt], 'ValueTransfer')
+        log_message = self.decoder.decode_logs([tx_receipt], 'LogMessagePublished')
         return tx_receipt, self.get_value_transfer_event(value_transfer[0]), self.get_cross_chain_message(log_message[0])
 
     def send_to_msg_bus(self, amount, timeout=60):
@@ -159,7 +160,7 @@ class L1BridgeDetails(BridgeDetails):
         }
         tx_receipt = self.network.tx(self.test, self.web3, tx, self.account, persist_nonce=False, timeout=timeout)
 
-        logs = self.bus.contract.events.ValueTransfer().process_receipt(tx_receipt, EventLogErrorFlags.Discard)
+        logs = self.decoder.decode_logs([tx_receipt], 'ValueTransfer')
         return tx_receipt, logs
 
     def relay_message(self, xchain_msg, timeout=60):
@@ -222,7 +223,7 @@ class L2BridgeDetails(BridgeDetails):
         """Relay a cross chain message specific to a whitelisting. """
         tx_receipt = self.relay_message(xchain_msg, timeout=timeout)
         if dump_file: self.network.dump(tx_receipt, dump_file)
-        logs = self.bridge.contract.events.CreatedWrappedToken().process_receipt(tx_receipt, EventLogErrorFlags.Discard)
+        logs = self.decoder.decode_logs([tx_receipt], 'CreatedWrappedToken')
         return tx_receipt, logs[0]['args']['localAddress']
 
     def approve_token(self, symbol, approval_address, amount, timeout=60, dump_file=None):
@@ -249,7 +250,7 @@ class L2BridgeDetails(BridgeDetails):
                                            timeout=timeout)
         if dump_file: self.network.dump(tx_receipt, dump_file)
 
-        logs = self.bus.contract.events.LogMessagePublished().process_receipt(tx_receipt, EventLogErrorFlags.Discard)
+        logs = self.decoder.decode_logs([tx_receipt], 'LogMessagePublished')
         return tx_receipt, self.get_cross_chain_message(logs[0])
 
     def send_native(self, address, amount, timeout=60, dump_file=None):
@@ -263,7 +264,7 @@ class L2BridgeDetails(BridgeDetails):
         tx_receipt = self.network.tx(self.test, self.web3, build_tx, self.account, timeout=timeout)
         if dump_file: self.network.dump(tx_receipt, os.path.join(self.test.output, dump_file))
 
-        value_transfer = self.bus.contract.events.ValueTransfer().process_receipt(tx_receipt, EventLogErrorFlags.Discard)
+        value_transfer = self.decoder.decode_logs([tx_receipt], 'ValueTransfer')
         return tx_receipt, self.get_value_transfer_event(value_transfer[0])
 
     def relay_message(self, xchain_msg, timeout=60, dump_file=None):
@@ -0,0 +1,38 @@
+import functools
+from eth_keys import keys
+from eth_utils import to_wei, from_wei
+
+_CODEC = None                   # the abi codec shared across all users, created on first use
+
+
+def _to_bytes(private_key):
+    """Return the bytes of a private key given as a hex string, with or without the 0x prefix, or bytes. """
+    if isinstance(private_key, (bytes, bytearray)): return bytes(private_key)
+    return bytes.fromhex(private_key[2:] if private_key.startswith('0x') else private_key)
+
+
+@functools.lru_cache(maxsize=4096)
+def address(private_key):
+    """Return the checksum address of the account for a private key.
+
+    The address is derived offline without importing eth_account, which is slow to import as it pulls in the keyfile
+    and bls dependencies, so this can be used by light-weight clients that only need account addresses.
+    """
+    return keys.PrivateKey(_to_bytes(private_key)).public_key.to_checksum_address()
+
+
+@functools.lru_cache(maxsize=4096)
+def account(private_key):
+    """Return the local account for a private key, for use where transactions or messages need to be signed. """
+    from eth_account import Account
+    return Account.from_key(private_key)
+
+
+def codec():
+    """Return the abi codec shared across all users, the same as that of a default Web3 instance. """
+    global _CODEC
+    if _CODEC is None:
+        from eth_abi.codec import ABICodec
+        from web3._utils.abi import build_strict_registry
+        _CODEC = ABICodec(build_strict_registry())
+    return _CODEC
@@ -0,0 +1,133 @@
+import json, threading
+from hexbytes import HexBytes
+from eth_utils import to_checksum_address, event_abi_to_log_topic
+from web3.datastructures import AttributeDict
+from web3._utils.abi import map_abi_data, named_tree, get_abi_input_names
+from web3._utils.abi import exclude_indexed_event_inputs, get_indexed_event_inputs, normalize_event_input_types
+from web3._utils.events import get_event_abi_types_for_decoding
+from web3._utils.normalizers import BASE_RETURN_NORMALIZERS
+from ten.test.utils.crypto import codec
+
+_LOCK = threading.Lock()
+_INDEXES = {}                   # cache of topic0 to event decoders, keyed on the json of the abi
+
+
+class CompiledEvent:
+    """A decoder for a single event, where the topic hash, types and names are derived once from the abi.
+
+    Decoding follows the same steps as web3 get_event_data, so the decoded event is identical to that returned from
+    process_receipt, but without re-deriving the event abi types on every call.
+    """
+
+    def __init__(self, event_abi):
+        """Instantiate an instance from the event abi entry. """
+        self.name = event_abi['name']
+        self.topic = HexBytes(event_abi_to_log_topic(event_abi))
+        topics_abi = get_indexed_event_inputs(event_abi)
+        self.topic_types = get_event_abi_types_for_decoding(normalize_event_input_types(topics_abi))
+        self.topic_names = get_abi_input_names({'inputs': topics_abi})
+        self.data_inputs = normalize_event_input_types(exclude_indexed_event_inputs(event_abi))
+        self.data_types = get_event_abi_types_for_decoding(self.data_inputs)
+        self.normalise = any(('address' in t or '(' in t or '[' in t) for t in self.topic_types + self.data_types)
+
+    def decode(self, codec, log):
+        """Decode a log entry, returning None if the log does not match the layout of this event. """
+        topics = log['topics']
+        if len(topics) != len(self.topic_types) + 1: return None
+
+        try:
+            data = codec.decode(self.data_types, HexBytes(log['data']))
+            topic_data = [codec.decode([t], HexBytes(topic))[0] for t, topic in zip(self.topic_types, topics[1:])]
+        except Exception:
+            return None
+
+        if self.normalise:
+            data = map_abi_data(BASE_RETURN_NORMALIZERS, self.data_types, data)
+            topic_data = map_abi_data(BASE_RETURN_NORMALIZERS, self.topic_types, topic_data)
+        args = dict(zip(self.topic_names, topic_data))
+        args.update(named_tree(self.data_inputs, data))
+
+        event = {
+            'args': args,
+            'event': self.name,
+            'logIndex': log['logIndex'],
+            'transactionIndex': log['transactionIndex'],
+            'transactionHash': log['transactionHash'],
+            'address': log['address'],
+            'blockHash': log['blockHash'],
+            'blockNumber': log['blockNumber'],
+        }
+        return AttributeDict.recursive(event) if isinstance(log, AttributeDict) else event
+
+
+def abi_index(abi):
+    """Return the index of topic0 to compiled event decoders for an abi, building and caching on first use. """
+    if isinstance(abi, str): abi = json.loads(abi)
+    key = json.dumps(abi, sort_keys=True)
+    with _LOCK:
+        if key not in _INDEXES:
+            index = {}
+            for entry in abi:
+                if entry.get('type') != 'event' or entry.get('anonymous', False): continue
+                event = CompiledEvent(entry)
+                index.setdefault(event.topic, []).append(event)
+            _INDEXES[key] = index
+        return _INDEXES[key]
+
+
+class EventDecoder:
+    """Bulk decoder of event logs across many contracts.
+
+    ABIs are added to the decoder, optionally restricted to a contract address, and event logs are then decoded in a
+    single pass by looking up the decoder on the first topic of each log. Logs with an unknown topic are skipped. The
+    decoded events have the same structure as those returned from web3 process_receipt, i.e. args, event, address etc.
+    Note that events sharing a signature but with different indexed fields are disambiguated on the number of topics.
+    """
+
+    def __init__(self, *abis):
+        """Instantiate an instance, optionally with a set of abis that apply to any contract address. """
+        self.codec = codec()
+        self.any_address = {}
+        self.by_address = {}
+        for abi in abis: self.add_abi(abi)
+
+    def add_abi(self, abi, address=None):
+        """Add an abi to the decoder, where if an address is given the events only apply to that address. """
+        target = self.any_address if address is None else self.by_address.setdefault(to_checksum_address(address), {})
+        for topic, events in abi_index(abi).items():
+            target.setdefault(topic, []).extend(events)
+        return self
+
+    def add_contract(self, contract):
+        """Add a contract to the decoder, e.g. a web3 contract or one of the contract abstractions. """
+        return self.add_abi(contract.abi, contract.address)
+
+    def decode_log(self, log):
+        """Decode a single log entry, returning None if the topic is not known. """
+        topics = log['topics']
+        if len(topics) == 0: return None
+        topic = HexBytes(topics[0])
+
+        candidates = None
+        if len(self.by_address) > 0 and log.get('address') is not None:
+            candidates = self.by_address.get(to_checksum_address(log['address']), {}).get(topic)
+        if candidates is None: candidates = self.any_address.get(topic)
+        if candidates is None: return None
+
+        for event in candidates:
+            decoded = event.decode(self.codec, log)
+            if decoded is not None: return decoded
+        return None
+
+    def decode_logs(self, receipts_or_logs, event=None):
+        """Decode event logs from a list of transaction receipts and/or log entries.
+
+        If an event name is given, only events of that name are returned.
+        """
+        decoded = []
+        for item in receipts_or_logs:
+            logs = item['logs'] if 'logs' in item else [item]
+            for log in logs:
+                result = self.decode_log(log)
+                if result is not None and (event is None or result['event'] == event): decoded.append(result)
+        return decoded
@@ -0,0 +1,196 @@
+import zlib, base64
+
+PERCENTILES = [50, 90, 99, 99.9]    # the percentiles reported in a summary, along with the max
+
+
+def _write_varint(out, value):
+    """Append an unsigned integer to a byte array as a little endian base 128 varint. """
+    while value >= 0x80:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data, offset):
+    """Read a varint from bytes at an offset, returning the value and the offset after it. """
+    value, shift = 0, 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80: return value, offset
+        shift += 7
+
+
+class Histogram:
+    """A high dynamic range histogram of latencies in milliseconds.
+
+    Latencies are recorded as integer microseconds into log linear buckets, where each power of two range is split
+    into a number of linear sub buckets set by the number of significant digits, so the relative error of any value
+    is bounded across the whole range, e.g. to within 0.1% for three digits, without needing an upper bound. Buckets
+    are held sparsely, so the memory used depends on the spread of the latencies rather than the number recorded, and
+    histograms with the same digits can be merged losslessly across clients and runs. A histogram serialises to a
+    compact string of the delta encoded bucket counts, compressed and base64 encoded, which can be written to file.
+    Percentiles are reported as the highest value of the bucket they fall in, capped to the exact max recorded.
+    """
+    UNIT = 1000.0                   # the number of recorded units per millisecond, i.e. microsecond resolution
+    VERSION = 'hdr1'
+
+    def __init__(self, digits=3):
+        """Instantiate an empty histogram with a number of significant digits of precision. """
+        self.digits = digits
+        self.sub_bits = (2 * 10 ** digits - 1).bit_length()
+        self.half = 1 << (self.sub_bits - 1)
+        self.counts = {}            # bucket index to count
+        self.count = 0
+        self.total = 0              # sum of the recorded values in units, for the mean
+        self.min_value = None
+        self.max_value = None
+
+    def record(self, millis, count=1):
+        """Record a latency in milliseconds, optionally a number of times. """
+        value = max(0, int(round(millis * self.UNIT)))
+        index = self.__index(value)
+        self.counts[index] = self.counts.get(index, 0) + count
+        self.count += count
+        self.total += value * count
+        if self.min_value is None or value < self.min_value: self.min_value = value
+        if self.max_value is None or value > self.max_value: self.max_value = value
+
+    def merge(self, other):
+        """Merge the counts of another histogram into this one, returning this histogram. """
+        if other.digits != self.digits: raise ValueError('Cannot merge histograms of different precision')
+        for index, count in other.counts.items(): self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        if other.min_value is not None and (self.min_value is None or other.min_value < self.min_value):
+            self.min_value = other.min_value
+        if other.max_value is not None and (self.max_value is None or other.max_value > self.max_value):
+            self.max_value = other.max_value
+        return self
+
+    @property
+    def mean(self):
+        """The mean latency in milliseconds, or None if empty. """
+        return self.total / self.count / self.UNIT if self.count > 0 else None
+
+    @property
+    def min(self):
+        """The minimum latency in milliseconds, or None if empty. """
+        return self.min_value / self.UNIT if self.min_value is not None else None
+
+    @property
+    def max(self):
+        """The maximum latency in milliseconds, or None if empty. """
+        return self.max_value / self.UNIT if self.max_value is not None else None
+
+    def percentile(self, percent):
+        """Return the latency in milliseconds at a percentile, or None if empty. """
+        if self.count == 0: return None
+        target = max(1, self.count * percent / 100.0)
+        running = 0
+        for index in sorted(self.counts):
+            running += self.counts[index]
+            if running >= target: return min(self.__highest(index), self.max_value) / self.UNIT
+        return self.max
+
+    def summary(self):
+        """Return a dictionary of the count, mean, p50, p90, p99, p99.9 and max latency in milliseconds. """
+        summary = {'count': self.count, 'mean': self.mean}
+        for percent in PERCENTILES: summary['p%s' % ('%g' % percent)] = self.percentile(percent)
+        summary['max'] = self.max
+        return summary
+
+    def buckets(self):
+        """Return a sorted list of the (lowest, highest, count) of the non-empty buckets in milliseconds. """
+        return [(self.__lowest(i) / self.UNIT, self.__highest(i) / self.UNIT, self.counts[i])
+                for i in sorted(self.counts)]
+
+    def bins(self, num_bins=40, width=None):
+        """Return a list of (start, count) of linear bins in milliseconds from the min to max, e.g. for plotting.
+
+        Bins are either a number spread evenly over the range, or a fixed width starting from a multiple of it.
+        Buckets are attributed to the bin their lowest value falls in.
+        """
+        if self.count == 0: return []
+        if width is None:
+            start = self.min
+            width = (self.max - self.min) / num_bins if self.max > self.min else 1.0
+        else:
+            start = width * int(self.min / width)
+            num_bins = int((self.max - start) / width) + 1
+        counts = [0] * num_bins
+        for lowest, _, count in self.buckets():
+            counts[min(max(0, int((max(lowest, self.min) - start) / width)), num_bins - 1)] += count
+        return [(start + i * width, counts[i]) for i in range(0, num_bins)]
+
+    def mode(self, num_bins=40):
+        """Return the start in milliseconds of the linear bin with the most entries, or None if empty. """
+        bins = self.bins(num_bins)
+        return max(bins, key=lambda b: b[1])[0] if len(bins) > 0 else None
+
+    def encode(self):
+        """Return the histogram serialised as a compact string. """
+        out = bytearray()
+        for value in [self.digits, self.count, self.total, self.min_value or 0, self.max_value or 0, len(self.counts)]:
+            _write_varint(out, value)
+        last = 0
+        for index in sorted(self.counts):
+            _write_varint(out, index - last)
+            _write_varint(out, self.counts[index])
+            last = index
+        return '%s:%s' % (self.VERSION, base64.b64encode(zlib.compress(bytes(out))).decode('ascii'))
+
+    @classmethod
+    def decode(cls, encoded):
+        """Return a histogram deserialised from a string returned by encode. """
+        version, _, payload = encoded.strip().partition(':')
+        if version != cls.VERSION: raise ValueError('Unknown histogram encoding %s' % version)
+        data = zlib.decompress(base64.b64decode(payload))
+        values, offset = [], 0
+        for _ in range(0, 6):
+            value, offset = _read_varint(data, offset)
+            values.append(value)
+        histogram = cls(values[0])
+        histogram.count, histogram.total = values[1], values[2]
+        if histogram.count > 0: histogram.min_value, histogram.max_value = values[3], values[4]
+        index = 0
+        for _ in range(0, values[5]):
+            delta, offset = _read_varint(data, offset)
+            count, offset = _read_varint(data, offset)
+            index += delta
+            histogram.counts[index] = count
+        return histogram
+
+    def write(self, path):
+        """Write the serialised histogram to a file. """
+        with open(path, 'w') as fp: fp.write(self.encode() + '\n')
+
+    @classmethod
+    def read(cls, path):
+        """Read a histogram from a file written by write. """
+        with open(path) as fp: return cls.decode(fp.read())
+
+    @classmethod
+    def merged(cls, paths, digits=3):
+        """Return a histogram merged from the files of a list of paths. """
+        histogram = cls(digits)
+        for path in paths: histogram.merge(cls.read(path))
+        return histogram
+
+    def __index(self, value):
+        """Return the bucket index of a value in units. """
+        shift = max(0, value.bit_length() - self.sub_bits)
+        return shift * self.half + (value >> shift)
+
+    def __lowest(self, index):
+        """Return the lowest value in units of a bucket. """
+        if index < 2 * self.half: return index
+        shift = index // self.half - 1
+        return (index - shift * self.half) << shift
+
+    def __highest(self, index):
+        """Return the highest value in units of a bucket. """
+        if index < 2 * self.half: return index
+        shift = index // self.half - 1
+        return ((index - shift * self.half + 1) << shift) - 1
@@ -0,0 +1,119 @@
+import os, re
+
+
+def _size(text):
+    """Return the size in bytes of text decoded from the file. """
+    return len(text.encode('utf-8', errors='surrogateescape'))
+
+
+class LogScanner:
+    """A streaming scanner for regular expressions over a log file.
+
+    The file is read in chunks of complete lines, and each compiled pattern is applied across the whole chunk rather
+    than line by line, so large files are scanned quickly without being held in memory. Patterns are compiled with
+    re.M so ^ and $ match at line boundaries, and should not match across lines. Searching for the first match of a
+    pattern stops reading as soon as it is found, and the last match is found by reading the file backwards from the
+    end. The scanner tracks its position in the file after forward scans, so a file that is still being written can be
+    rescanned incrementally. A trailing line without a newline is scanned, but not consumed, so it is scanned again
+    once complete.
+    """
+    CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, file, patterns, chunk_size=CHUNK_SIZE):
+        """Create a scanner over a file, for a single pattern or a list of patterns (strings or compiled). """
+        self.file = file
+        patterns = patterns if isinstance(patterns, (list, tuple)) else [patterns]
+        self.patterns = [p if isinstance(p, re.Pattern) else re.compile(p, re.M) for p in patterns]
+        self.chunk_size = chunk_size
+        self.position = 0               # byte offset of the first line not yet consumed by a forward scan
+
+    def matches(self):
+        """Generator over the (pattern index, match) of all matches from the current position, in file order. """
+        for start, block in self.__forwards():
+            found = []
+            for i, pattern in enumerate(self.patterns):
+                for match in pattern.finditer(block): found.append((match.start(), i, match))
+            found.sort(key=lambda f: (f[0], f[1]))
+            for _, i, match in found:
+                self.__consume(start, block, match)
+                yield i, match
+            if block.endswith('\n'): self.position = start + _size(block)
+
+    def first(self, index=0):
+        """Return the first match of a pattern from the current position, or None, stopping once it is found. """
+        for i, match in self.matches():
+            if i == index: return match
+        return None
+
+    def first_of_each(self):
+        """Return a list of the first match of each pattern from the current position, stopping once all are found. """
+        results = [None] * len(self.patterns)
+        for i, match in self.matches():
+            if results[i] is None: results[i] = match
+            if all(r is not None for r in results): break
+        return results
+
+    def last(self, index=0):
+        """Return the last match of a pattern in the file, or None, reading backwards from the end of the file. """
+        return self.__last([index])[index]
+
+    def last_of_each(self):
+        """Return a list of the last match of each pattern in the file, stopping once all are found. """
+        return self.__last(range(0, len(self.patterns)))
+
+    def count(self, index=0):
+        """Return the number of matches of a pattern from the current position. """
+        return sum(1 for i, _ in self.matches() if i == index)
+
+    def __last(self, indexes):
+        results = [None] * len(self.patterns)
+        for block in self.__backwards():
+            for i in indexes:
+                if results[i] is not None: continue
+                for match in self.patterns[i].finditer(block): results[i] = match
+            if all(results[i] is not None for i in indexes): break
+        return results
+
+    def __consume(self, start, block, match):
+        """Advance the position past the line of a match, if the line is complete. """
+        end = block.find('\n', match.end())
+        if end != -1: self.position = max(self.position, start + _size(block[:end+1]))
+
+    def __forwards(self):
+        """Generator over the byte offset and decoded text of blocks of complete lines from the position. """
+        if not os.path.exists(self.file): return
+        with open(self.file, 'rb') as fp:
+            fp.seek(self.position)
+            offset = self.position
+            carry = b''
+            while True:
+                data = fp.read(self.chunk_size)
+                if not data: break
+                data = carry + data
+                newline = data.rfind(b'\n')
+                if newline == -1:
+                    carry = data
+                    continue
+                carry = data[newline+1:]
+                yield offset, data[:newline+1].decode('utf-8', errors='surrogateescape')
+                offset = offset + newline + 1
+            if len(carry) > 0: yield offset, carry.decode('utf-8', errors='surrogateescape')
+
+    def __backwards(self):
+        """Generator over the decoded text of blocks of complete lines from the end of the file backwards. """
+        if not os.path.exists(self.file): return
+        with open(self.file, 'rb') as fp:
+            end = fp.seek(0, os.SEEK_END)
+            carry = b''
+            while end > 0:
+                start = max(0, end - self.chunk_size)
+                fp.seek(start)
+                data = fp.read(end - start) + carry
+                end = start
+                if start > 0:
+                    newline = data.find(b'\n')
+                    if newline == -1:
+                        carry = data
+                        continue
+                    carry, data = data[:newline+1], data[newline+1:]
+                yield data.decode('utf-8', errors='surrogateescape')
@@ -0,0 +1,147 @@
+import os, io, sys, time, pstats, cProfile, threading
+from collections import Counter
+
+MODES = ['cpu', 'wall']
+
+
+def _label(code):
+    """Return the label of a code object for use in a collapsed stack. """
+    return '%s (%s:%d)' % (code.co_name, os.path.basename(code.co_filename), code.co_firstlineno)
+
+
+def write_collapsed(counts, path):
+    """Write a counter of stacks to a file in collapsed stack format, i.e. one 'frame;frame;frame count' per line. """
+    with open(path, 'w') as fp:
+        for stack, count in sorted(counts.items()): fp.write('%s %d\n' % (stack, count))
+
+
+def read_collapsed(path):
+    """Read a file in collapsed stack format into a counter of stacks. """
+    counts = Counter()
+    with open(path) as fp:
+        for line in fp:
+            stack, _, count = line.rstrip('\n').rpartition(' ')
+            if stack != '': counts[stack] += int(count)
+    return counts
+
+
+def write_hot_functions(files, path, sort, limit=50):
+    """Write a report of the hottest functions across a list of pstats files. """
+    files = [f for f in files if os.path.exists(f)]
+    if len(files) == 0: return
+    stream = io.StringIO()
+    stats = pstats.Stats(files[0], stream=stream)
+    for file in files[1:]: stats.add(file)
+    stats.strip_dirs().sort_stats(sort).print_stats(limit)
+    with open(path, 'w') as fp: fp.write(stream.getvalue())
+
+
+class StackSampler:
+    """Sample the stack of a thread at a fixed interval of wall-clock time. """
+
+    def __init__(self, ident, interval=0.005):
+        """Instantiate an instance to sample the thread with the given identifier. """
+        self.ident = ident
+        self.interval = interval
+        self.counts = Counter()
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def start(self):
+        """Start sampling in a background thread. """
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self.__sample, name='stack_sampler', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop sampling. """
+        self.stopped.set()
+        if self.thread is not None: self.thread.join()
+
+    def __sample(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.ident)
+            stack = []
+            while frame is not None:
+                stack.append(_label(frame.f_code))
+                frame = frame.f_back
+            if len(stack) > 0: self.counts[';'.join(reversed(stack))] += 1
+
+
+class Profiler:
+    """Profile the execute and validate methods of a test.
+
+    In cpu mode a deterministic profiler is run against the cpu time of the test thread, so time spent waiting on
+    the network or sleeping is excluded, as is that of other threads of the process such as other tests when the
+    runner is run over multiple threads, whereas in wall mode it is run against wall-clock time. In both modes the
+    stack of the test thread is also sampled on wall-clock time to give collapsed stacks, e.g. for rendering as a
+    flame graph. Profiles of the python clients run by the test, if enabled, are written alongside the client output
+    and merged into the hot function report of the test.
+    """
+
+    def __init__(self, test, mode):
+        """Instantiate an instance for a test, where mode is one of cpu or wall. """
+        if mode not in MODES: raise ValueError('Unknown profile mode %s, must be one of %s' % (mode, MODES))
+        self.test = test
+        self.mode = mode
+        self.profile = cProfile.Profile(time.thread_time if mode == 'cpu' else time.perf_counter)
+        self.samples = Counter()        # stacks sampled across all profiled methods
+        self.clients = []               # pstats files written by profiled client processes
+
+    def wrap(self, method):
+        """Return a wrapper of a test method which runs it under the profiler. """
+        def wrapper(*args, **kwargs):
+            sampler = StackSampler(threading.get_ident())
+            sampler.start()
+            self.profile.enable()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.profile.disable()
+                sampler.stop()
+                self.samples.update(sampler.counts)
+        return wrapper
+
+    def client_arguments(self, stdout):
+        """Return the python arguments to run a client under the profiler, writing the profile next to its stdout. """
+        path = '%s.pstats' % os.path.splitext(stdout)[0]
+        self.clients.append(path)
+        return ['-m', 'cProfile', '-o', path]
+
+    def write(self):
+        """Write the profile, collapsed stacks and hot function report to the test output, returning their paths. """
+        profile = os.path.join(self.test.output, 'profile.pstats')
+        collapsed = os.path.join(self.test.output, 'profile.collapsed')
+        self.profile.dump_stats(profile)
+        write_collapsed(self.samples, collapsed)
+        write_hot_functions([profile] + self.clients, os.path.join(self.test.output, 'profile.txt'), self.sort())
+        return [profile] + [c for c in self.clients if os.path.exists(c)], collapsed
+
+    def sort(self):
+        """Return the pstats sort key for the hot function report. """
+        return 'tottime' if self.mode == 'cpu' else 'cumulative'
+
+
+class ProfileReport:
+    """The run level report merging the profiles of all tests. """
+
+    def __init__(self, mode):
+        """Instantiate an instance. """
+        self.mode = mode
+        self.lock = threading.Lock()
+        self.profiles = []
+        self.counts = Counter()
+
+    def add(self, profiles, collapsed):
+        """Add the profiles and collapsed stacks written by a test. """
+        counts = read_collapsed(collapsed)
+        with self.lock:
+            self.profiles.extend(profiles)
+            self.counts.update(counts)
+
+    def write(self, directory):
+        """Write the merged hot function report and collapsed stacks to a directory. """
+        with self.lock:
+            write_hot_functions(self.profiles, os.path.join(directory, 'profile.txt'),
+                                'tottime' if self.mode == 'cpu' else 'cumulative')
+            write_collapsed(self.counts, os.path.join(directory, 'profile.collapsed'))
@@ -1,4 +1,4 @@
-import getpass, configparser
+import getpass, configparser, hashlib
 from pathlib import Path
 from pysys.constants import *
 from pysys.exceptions import FileNotFoundException
@@ -14,6 +14,12 @@ class Properties:
     L2BridgeAddress = None
     L2MessageBusAddress = None
     L2CrossChainMessengerAddress = None
+    GanacheSnapshot = None          # tuple of the snapshot id and persisted nonces taken by the runner on ganache
+    GanachePorts = None             # map of runner thread number to port when running a ganache instance per thread
+    AccountPool = None              # the pool of pre-funded ephemeral accounts maintained by the runner
+    Threads = 1                     # the number of runner threads, each of which has its own set of accounts
+    RpcMetrics = None               # the run level rollup of the json rpc metrics of each test
+    ProfileReport = None            # the run level report merging the profiles of each test, if profiling
 
     def __init__(self):
         self.default_config = configparser.ConfigParser()
@@ -80,20 +86,47 @@ class Properties:
     def block_time_secs(self, key):
         return self.get('env.'+key, 'BlockTimeSecs')
 
-    # all accounts on the network layer that may hold funds
+    def max_threads(self, key):
+        value = self.get('env.'+key, 'MaxThreads')
+        return int(value) if value is not None else 1
+
+    # all accounts on the network layer that may hold funds, for all runner threads
     def accounts(self):
-        return [
+        accounts = [
             self.fundacntpk,
             self.account1_1pk, self.account2_1pk, self.account3_1pk, self.account4_1pk,
-            self.account2_2pk, self.account2_2pk, self.account3_2pk, self.account4_2pk,
+            self.account1_2pk, self.account2_2pk, self.account3_2pk, self.account4_2pk,
             self.account1_3pk, self.account2_3pk, self.account3_3pk, self.account4_3pk
         ]
-
-    def fundacntpk(self): return self.get('env.all', 'FundAcntPK')
-    def account1pk(self): return getattr(self, "account1_%dpk" % thread_num())()
-    def account2pk(self): return getattr(self, "account2_%dpk" % thread_num())()
-    def account3pk(self): return getattr(self, "account3_%dpk" % thread_num())()
-    def account4pk(self): return getattr(self, "account4_%dpk" % thread_num())()
+        for num in range(4, Properties.Threads + 1):
+            accounts.extend([self.__derived_fn(index, num) for index in range(1, 5)])
+        return accounts
+
+    def fundacntpk(self, num=None):
+        # when running a ganache instance per thread each instance has its own funded account derived from the key
+        pk = self.get('env.all', 'FundAcntPK')
+        num = thread_num() if num is None else num
+        if Properties.GanachePorts is None or num == 1: return pk
+        return hashlib.sha256(('%s:%d' % (pk, num)).encode('utf-8')).hexdigest()
+
+    def account1pk(self): return self.account_pk(1)
+    def account2pk(self): return self.account_pk(2)
+    def account3pk(self): return self.account_pk(3)
+    def account4pk(self): return self.account_pk(4)
+
+    # accounts 1 to 4 for a runner thread, where threads after the third derive their keys deterministically from
+    # the seed (or the funded account key if not set) so the same keys are used on every run
+    def account_pk(self, index, num=None):
+        num = thread_num() if num is None else num
+        if num <= 3: return getattr(self, 'account%d_%dpk' % (index, num))()
+        seed = self.get('env.all', 'AccountSeed')
+        if seed is None: seed = self.get('env.all', 'FundAcntPK')
+        return hashlib.sha256(('%s:account%d:%d' % (seed, index, num)).encode('utf-8')).hexdigest()
+
+    def __derived_fn(self, index, num):
+        fn = lambda: self.account_pk(index, num)
+        fn.__name__ = 'account%d_%dpk' % (index, num)
+        return fn
 
     # accounts 1 to 4 used by thread-1 or the main thread
     def account1_1pk(self): return self.get('env.all', 'Account1PK')
@@ -0,0 +1,155 @@
+import json, time, threading
+from ten.test.utils.histogram import Histogram
+
+
+class MethodStats:
+    """The request statistics of a single json rpc method. """
+
+    def __init__(self):
+        """Instantiate an instance. """
+        self.calls = 0
+        self.errors = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.time = 0.0
+        self.histogram = Histogram(digits=2)
+
+    def record(self, duration, sent, received, error):
+        """Record a request of the given duration in seconds. """
+        self.calls += 1
+        if error: self.errors += 1
+        self.bytes_sent += sent
+        self.bytes_received += received
+        self.time += duration
+        self.histogram.record(duration * 1000.0)
+
+    def merge(self, other):
+        """Merge the statistics of another instance into this one. """
+        self.calls += other.calls
+        self.errors += other.errors
+        self.bytes_sent += other.bytes_sent
+        self.bytes_received += other.bytes_received
+        self.time += other.time
+        self.histogram.merge(other.histogram)
+
+    def to_dict(self):
+        """Return the statistics as a dictionary for serialisation. """
+        return {'calls': self.calls, 'errors': self.errors, 'bytes_sent': self.bytes_sent,
+                'bytes_received': self.bytes_received, 'time': self.time,
+                'p50': self.histogram.percentile(50), 'p99': self.histogram.percentile(99),
+                'histogram': self.histogram.encode()}
+
+
+class RpcMetrics:
+    """Instrumentation of the json rpc requests made over a set of connections.
+
+    Requests are recorded per connection and method, with the number of calls, errors, bytes sent and received, and
+    a histogram of the latency. Requests made over web3 are recorded by attaching a middleware to the connection,
+    where the bytes are taken from the body of the request as encoded, and of the response as decoded, by the provider
+    so nothing is serialised just to be counted. Providers that do not go over the wire, or that decode responses
+    themselves such as over a websocket, record zero bytes for what they don't encode or decode. Requests made using
+    a JsonRpcClient are recorded by the client itself on the connection of its url.
+    """
+
+    def __init__(self):
+        """Instantiate an instance. """
+        self.lock = threading.Lock()
+        self.stats = {}             # map of connection name to map of method to the method stats
+
+    def attach(self, web3, network, address):
+        """Attach the metrics middleware to a web3 connection, named by the network and account address. """
+        if 'rpc_metrics' not in web3.middleware_onion:
+            wire = self.wire(web3.provider)
+            web3.middleware_onion.add(self.middleware('%s:%s' % (network, address), wire), 'rpc_metrics')
+        return web3
+
+    @staticmethod
+    def wire(provider):
+        """Wrap the encoding and decoding of a provider to hold the bytes of the last request and response. """
+        wire = threading.local()
+        encode = getattr(provider, 'encode_rpc_request', None)
+        decode = getattr(provider, 'decode_rpc_response', None)
+        if encode is not None:
+            def encode_rpc_request(method, params):
+                request = encode(method, params)
+                wire.sent = len(request)
+                return request
+            provider.encode_rpc_request = encode_rpc_request
+        if decode is not None:
+            def decode_rpc_response(raw_response):
+                wire.received = len(raw_response)
+                return decode(raw_response)
+            provider.decode_rpc_response = decode_rpc_response
+        return wire
+
+    def middleware(self, connection, wire=None):
+        """Return the web3 middleware recording the requests made on a named connection. """
+        wire = wire if wire is not None else threading.local()
+        def middleware(make_request, web3):
+            def metrics_middleware(method, params):
+                wire.sent, wire.received = 0, 0
+                start = time.perf_counter()
+                try:
+                    response = make_request(method, params)
+                except Exception:
+                    self.record(connection, method, time.perf_counter() - start, wire.sent, wire.received, True)
+                    raise
+                self.record(connection, method, time.perf_counter() - start, wire.sent, wire.received,
+                            'error' in response)
+                return response
+            return metrics_middleware
+        return middleware
+
+    def record(self, connection, method, duration, sent, received, error):
+        """Record a request made on a connection. """
+        with self.lock:
+            stats = self.stats.setdefault(connection, {}).setdefault(method, MethodStats())
+            stats.record(duration, sent, received, error)
+
+    def record_error(self, connection, method):
+        """Record an error response to a request already recorded on a connection. """
+        with self.lock: self.stats.setdefault(connection, {}).setdefault(method, MethodStats()).errors += 1
+
+    def merge(self, other, prefix=None):
+        """Merge the metrics of another instance into this one, optionally prefixing the connection names. """
+        with other.lock:
+            for connection, methods in other.stats.items():
+                name = connection if prefix is None else '%s/%s' % (prefix, connection)
+                with self.lock:
+                    for method, stats in methods.items():
+                        self.stats.setdefault(name, {}).setdefault(method, MethodStats()).merge(stats)
+
+    def by_method(self):
+        """Return a map of method to the method stats aggregated across all connections. """
+        methods = {}
+        with self.lock:
+            for connection in self.stats.values():
+                for method, stats in connection.items(): methods.setdefault(method, MethodStats()).merge(stats)
+        return methods
+
+    def top(self, num=10):
+        """Return the method and stats of the methods taking the most total time, in descending order. """
+        return sorted(self.by_method().items(), key=lambda item: item[1].time, reverse=True)[:num]
+
+    def to_dict(self):
+        """Return the metrics by method and by connection as a dictionary for serialisation. """
+        methods = {method: stats.to_dict() for method, stats in self.by_method().items()}
+        with self.lock:
+            connections = {connection: {method: stats.to_dict() for method, stats in c.items()}
+                           for connection, c in self.stats.items()}
+        return {'methods': methods, 'connections': connections}
+
+    def write(self, path):
+        """Write the metrics as json to a file. """
+        with open(path, 'w') as fp: json.dump(self.to_dict(), fp, indent=2)
+
+    def log_summary(self, log, num=10, **kwargs):
+        """Log a summary of the methods taking the most total time. """
+        top = self.top(num)
+        if len(top) == 0: return
+        log.info('  %-40s %8s %6s %10s %10s %10s', 'RPC method', 'calls', 'errors', 'time (s)', 'mean (ms)',
+                 'p99 (ms)', **kwargs)
+        for method, stats in top:
+            p99 = stats.histogram.percentile(99)
+            log.info('  %-40s %8d %6d %10.3f %10.1f %10s', method, stats.calls, stats.errors, stats.time,
+                     1000.0 * stats.time / stats.calls, '%.1f' % p99 if p99 is not None else '-', **kwargs)
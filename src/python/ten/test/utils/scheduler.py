@@ -0,0 +1,126 @@
+import os, ast, threading
+from contextlib import contextmanager
+from pysys.utils.misc import getTypedValueOrDefault
+
+_LOCK = threading.Lock()
+_FIXTURE_LOCKS = {}             # map of fixture name to the lock guarding its creation
+
+
+class ExclusiveLock:
+    """A readers-writer lock giving a test exclusive access to the network.
+
+    Tests not marked exclusive acquire the lock shared, so they run in parallel with each other, whereas an exclusive
+    test waits for all running tests to complete and holds off any others until it is done. Waiting exclusive tests
+    take precedence over new shared ones so that they are not starved.
+    """
+
+    def __init__(self):
+        """Instantiate an instance. """
+        self.condition = threading.Condition()
+        self.shared = 0
+        self.exclusive = False
+        self.waiting = 0
+
+    def acquire(self, exclusive=False):
+        """Acquire the lock, either shared or exclusive. """
+        with self.condition:
+            if exclusive:
+                self.waiting += 1
+                self.condition.wait_for(lambda: not self.exclusive and self.shared == 0)
+                self.waiting -= 1
+                self.exclusive = True
+            else:
+                self.condition.wait_for(lambda: not self.exclusive and self.waiting == 0)
+                self.shared += 1
+
+    def release(self, exclusive=False):
+        """Release the lock, as previously acquired shared or exclusive. """
+        with self.condition:
+            if exclusive: self.exclusive = False
+            else: self.shared -= 1
+            self.condition.notify_all()
+
+
+EXCLUSIVE_LOCK = ExclusiveLock()
+
+
+@contextmanager
+def fixture_lock(name):
+    """Context manager serialising the creation of a named fixture, e.g. the deployment of a shared contract. """
+    with _LOCK: lock = _FIXTURE_LOCKS.setdefault(name, threading.Lock())
+    with lock: yield
+
+
+def read_fixtures(descriptor):
+    """Return the fixtures and exclusive flag declared for a test.
+
+    Declarations are read from the FIXTURES and EXCLUSIVE user-data of the pysystest.xml, falling back to the class
+    attributes of the same name in the test's run.py. The run.py is parsed rather than imported, so reading the
+    declarations has no side effects.
+    """
+    data = descriptor.userData
+    fixtures = getTypedValueOrDefault('FIXTURES', data['FIXTURES'], []) if 'FIXTURES' in data else None
+    exclusive = getTypedValueOrDefault('EXCLUSIVE', data['EXCLUSIVE'], False) if 'EXCLUSIVE' in data else None
+    if fixtures is None or exclusive is None:
+        attributes = _class_attributes(descriptor)
+        if fixtures is None: fixtures = list(attributes.get('FIXTURES', []))
+        if exclusive is None: exclusive = bool(attributes.get('EXCLUSIVE', False))
+    return fixtures, exclusive
+
+
+def _class_attributes(descriptor):
+    """Return the literal FIXTURES and EXCLUSIVE class attributes of the test class in a test's module. """
+    module = descriptor.module if descriptor.module.endswith('.py') else '%s.py' % descriptor.module
+    path = os.path.join(descriptor.testDir, module)
+    attributes = {}
+    try:
+        with open(path, encoding='utf-8') as fp: tree = ast.parse(fp.read(), path)
+    except (OSError, SyntaxError, ValueError):
+        return attributes
+    for node in tree.body:
+        if not isinstance(node, ast.ClassDef) or node.name != descriptor.classname: continue
+        for statement in node.body:
+            if not isinstance(statement, ast.Assign) or len(statement.targets) != 1: continue
+            target = statement.targets[0]
+            if not isinstance(target, ast.Name) or target.id not in ['FIXTURES', 'EXCLUSIVE']: continue
+            try:
+                attributes[target.id] = ast.literal_eval(statement.value)
+            except ValueError:
+                pass
+    return attributes
+
+
+def schedule(descriptors):
+    """Return the descriptors ordered to maximise the reuse of fixtures, with exclusive tests last.
+
+    Each test is placed alongside the earliest test sharing one of its fixtures, so tests using the same fixture run
+    back to back and those started later reuse it rather than creating their own. Otherwise tests keep their
+    original relative order. Exclusive tests are moved to the end of the run, where they hold up the fewest others
+    whilst they wait for exclusive access.
+    """
+    first = {}
+    keys = {}
+    for index, descriptor in enumerate(descriptors):
+        fixtures, exclusive = read_fixtures(descriptor)
+        for fixture in fixtures: first.setdefault((exclusive, fixture), index)
+        group = min([first[(exclusive, fixture)] for fixture in fixtures], default=index)
+        keys[descriptor.id] = (exclusive, group, index)
+    return sorted(descriptors, key=lambda d: keys[d.id])
+
+
+class TenSchedulerPlugin():
+    """Runner plugin scheduling the tests according to their declared fixtures.
+
+    A test declares the fixtures it uses, e.g. the names of the contracts it gets or deploys, or a gateway it shares,
+    and whether it needs exclusive access to the network, e.g. a performance test where other tests running in
+    parallel would skew the numbers. Declarations are made using the FIXTURES and EXCLUSIVE user-data in the test's
+    pysystest.xml, or as class attributes of the test. The plugin only re-orders the tests; exclusive tests are
+    serialised by the test itself acquiring the EXCLUSIVE_LOCK.
+    """
+
+    def setup(self, runner):
+        """Re-order the tests to be run by the runner. """
+        runner.descriptors[:] = schedule(runner.descriptors)
+        exclusive = [d.id for d in runner.descriptors if read_fixtures(d)[1]]
+        if len(exclusive) > 0 and runner.threads > 1:
+            runner.log.info('Scheduled %d exclusive tests to run serially at the end of the run', len(exclusive))
@@ -0,0 +1,167 @@
+import math
+from collections import namedtuple
+
+T_95 = [12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228, 2.201, 2.179, 2.160, 2.145, 2.131,
+        2.120, 2.110, 2.101, 2.093, 2.086, 2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042]
+Z_95 = 1.960                    # the two sided 95% quantile where there are more degrees of freedom than in T_95
+
+
+def t_95(df):
+    """Return the two sided 95% quantile of the t distribution for a number of degrees of freedom. """
+    return T_95[df - 1] if df <= len(T_95) else Z_95
+
+
+def bin_counts(times, start=None, end=None):
+    """Return the number of times in each whole second from the start to the end inclusive, by default the min and max.
+
+    Times are floored to the second, and those outside of the range are ignored.
+    """
+    seconds = [math.floor(t) for t in times]
+    if len(seconds) == 0: return []
+    start = min(seconds) if start is None else start
+    end = max(seconds) if end is None else end
+    counts = [0] * max(0, end - start + 1)
+    for s in seconds:
+        if start <= s <= end: counts[s - start] += 1
+    return counts
+
+
+def active_window(client_times):
+    """Return the first and last second all clients were active in given a list of the times of each client, or None.
+
+    Clients are active from their first to their last time, so the window excludes where some are yet to start or have
+    already completed, though not the warm up or cool down of the network itself.
+    """
+    client_times = [times for times in client_times if len(times) > 0]
+    if len(client_times) == 0: return None
+    first = max(math.floor(min(times)) for times in client_times)
+    last = min(math.floor(max(times)) for times in client_times)
+    return (first, last) if first <= last else None
+
+
+def mser(values, batch=1, max_fraction=0.5):
+    """Return the number of values to truncate from the start to remove the initial transient using MSER.
+
+    The marginal standard error rule truncates at the point that minimises the standard error of the mean of the
+    remaining values, considering truncation points of whole batches up to a fraction of the values.
+    """
+    means = [sum(values[i:i + batch]) / batch for i in range(0, len(values) - batch + 1, batch)]
+    k = len(means)
+    if k < 2: return 0
+    best, best_d = None, 0
+    total, squares = 0.0, 0.0
+    suffix = []                     # the sum and sum of squares of the batch means from each point to the end
+    for z in reversed(means):
+        total, squares = total + z, squares + z * z
+        suffix.append((total, squares))
+    suffix.reverse()
+    for d in range(0, max(1, int(k * max_fraction))):
+        n = k - d
+        total, squares = suffix[d]
+        statistic = (squares - total * total / n) / (n * n)
+        if best is None or statistic < best: best, best_d = statistic, d
+    return best_d * batch
+
+
+class SteadyState:
+    """The steady state throughput of a run, estimated from the number of requests completed in each second.
+
+    The warm up at the start of the series and the cool down at the end are detected and trimmed using the marginal
+    standard error rule, applied forwards and then backwards, to leave the steady state window. The throughput is the
+    mean of the window, with a 95% confidence interval from the method of batch means, as the counts of consecutive
+    seconds are correlated. A run is flagged as not stable if the window is too short, or if the throughput drifted
+    over the window by more than a tolerance, as measured by the difference of the means of its two halves relative to
+    the throughput, as where the throughput never settles.
+    """
+    MIN_WINDOW = 5                  # the minimum number of seconds of a steady state window for a run to be stable
+    MAX_TRIM = 0.4                  # the maximum fraction of the series trimmed at each of the start and end
+    BATCHES = 10                    # the maximum number of batches for the confidence interval
+    DRIFT_TOLERANCE = 0.2           # the maximum drift over the window relative to the throughput for a stable run
+
+    def __init__(self, counts, offset=0):
+        """Estimate the steady state of a series of counts per second, where the first count is at an offset. """
+        self.counts = list(counts)
+        self.offset = offset
+        self.reasons = []
+
+        n = len(self.counts)
+        batch = max(1, n // 50)
+        head = mser(self.counts, batch, self.MAX_TRIM) if n > 0 else 0
+        tail = mser(list(reversed(self.counts[head:])), batch, self.MAX_TRIM) if n > head else 0
+        self.first = head                                   # the index of the first count of the window
+        self.last = n - tail                                # the index after the last count of the window
+        window = self.counts[self.first:self.last]
+
+        self.throughput = sum(window) / len(window) if len(window) > 0 else 0.0
+        self.lower, self.upper = self.__interval(window)
+        half = len(window) // 2
+        self.drift = 0.0
+        if half > 0 and self.throughput > 0:
+            self.drift = (sum(window[-half:]) - sum(window[:half])) / half / self.throughput
+
+        if len(window) < self.MIN_WINDOW: self.reasons.append('window of %ds is too short' % len(window))
+        if abs(self.drift) > self.DRIFT_TOLERANCE:
+            self.reasons.append('throughput drifted by %.0f%%' % (100 * self.drift))
+
+    @classmethod
+    def from_times(cls, times, start=None, end=None):
+        """Estimate the steady state from a list of completion times in seconds, optionally within a range. """
+        counts = bin_counts(times, start, end)
+        return cls(counts, offset=start if start is not None else (math.floor(min(times)) if len(times) > 0 else 0))
+
+    @property
+    def stable(self):
+        """True if the run reached a steady state. """
+        return len(self.reasons) == 0
+
+    @property
+    def window(self):
+        """The first and last second of the steady state window, relative to the same origin as the offset. """
+        return self.offset + self.first, self.offset + self.last - 1
+
+    @property
+    def duration(self):
+        """The number of seconds of the steady state window. """
+        return self.last - self.first
+
+    def steady(self):
+        """Return a list of the (second, count) in the steady state window. """
+        return [(self.offset + i, self.counts[i]) for i in range(self.first, self.last)]
+
+    def ramp(self):
+        """Return a list of the (second, count) outside of the steady state window, i.e. the warm up and cool down. """
+        return [(self.offset + i, self.counts[i]) for i in range(0, len(self.counts))
+                if i < self.first or i >= self.last]
+
+    def log(self, log):
+        """Log the estimate to a logger, warning if the run was not stable. """
+        log.info('Steady state throughput %.2f (95%% CI %.2f to %.2f) over %ds from %ds to %ds',
+                 self.throughput, self.lower, self.upper, self.duration, self.window[0], self.window[1])
+        if not self.stable: log.warn('Steady state throughput is not stable, %s', ', '.join(self.reasons))
+
+    def __interval(self, window):
+        """Return the lower and upper bound of the 95% confidence interval of the mean of a window by batch means. """
+        k = min(self.BATCHES, len(window))
+        if k < 2: return self.throughput, self.throughput
+        size = len(window) // k
+        means = [sum(window[len(window) - (j + 1) * size:len(window) - j * size]) / size for j in range(0, k)]
+        mean = sum(means) / k
+        deviation = math.sqrt(sum((m - mean) ** 2 for m in means) / (k - 1))
+        half = t_95(k - 1) * deviation / math.sqrt(k)
+        return max(0.0, self.throughput - half), self.throughput + half
+
+
+Estimate = namedtuple('Estimate', 'throughput lower upper duration stable')
+
+
+def combine(states):
+    """Return the estimate of the mean throughput of a list of independent steady states, e.g. of repeated runs.
+
+    The half widths of the confidence intervals are combined in quadrature, and the estimate is stable only if all
+    the steady states are.
+    """
+    if len(states) == 0: return Estimate(0.0, 0.0, 0.0, 0, False)
+    throughput = sum(s.throughput for s in states) / len(states)
+    half = math.sqrt(sum(((s.upper - s.lower) / 2) ** 2 for s in states)) / len(states)
+    return Estimate(throughput, max(0.0, throughput - half), throughput + half, sum(s.duration for s in states),
+                    all(s.stable for s in states))
@@ -1,17 +1,19 @@
-import threading, re
+import threading
+from pysys.utils.threadpool import WorkerThread
 
-REGEX = re.compile('Thread-(?P<num>\d$)', re.M)
+_LOCK = threading.Lock()
+_NUMBERS = {}                   # map of runner worker thread ident to its allocated thread number
 
 
 def thread_num():
     """Return the thread number of the runner thread.
 
-    If the main thread, this function will return 1, otherwise it will return the number of the
-    runner thread as denoted by the name Thread-<num>.
+    If the main thread, or a thread not started by the runner, this function will return 1. Otherwise runner worker
+    threads are numbered from 1 in the order they first call this function, rather than relying on the Thread-<num>
+    name, as python numbers the names across all threads created in the process.
     """
-    name = threading.currentThread().getName()
-    try:
-        return int(REGEX.search(name).group('num'))
-    except:
-        return 1
-
+    thread = threading.current_thread()
+    if not isinstance(thread, WorkerThread): return 1
+    with _LOCK:
+        if thread.ident not in _NUMBERS: _NUMBERS[thread.ident] = len(_NUMBERS) + 1
+        return _NUMBERS[thread.ident]
@@ -0,0 +1,21 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.0;
+
+contract Disperse {
+    event Dispersed(address indexed sender, uint256 recipients, uint256 total);
+
+    // send native funds to a list of recipients in a single transaction, any residual is returned to the sender
+    function disperseEther(address payable[] calldata recipients, uint256[] calldata values) external payable {
+        require(recipients.length == values.length, "Recipients and values must be the same length");
+        for (uint256 i = 0; i < recipients.length; i++) {
+            (bool sent, ) = recipients[i].call{value: values[i]}("");
+            require(sent, "Failed to send Ether");
+        }
+        uint256 balance = address(this).balance;
+        if (balance > 0) {
+            (bool sent, ) = payable(msg.sender).call{value: balance}("");
+            require(sent, "Failed to return Ether");
+        }
+        emit Dispersed(msg.sender, recipients.length, msg.value);
+    }
+}
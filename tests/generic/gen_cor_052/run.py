@@ -1,7 +1,7 @@
 import secrets, os
-from web3 import Web3
 from ten.test.contracts.error import Error
 from ten.test.basetest import GenericNetworkTest
+from ten.test.utils import crypto
 
 
 class PySysTest(GenericNetworkTest):
@@ -23,7 +23,7 @@ class PySysTest(GenericNetworkTest):
 
     def client(self, network, contract, type):
         private_key = secrets.token_hex(32)
-        self.distribute_native(Web3().eth.account.from_key(private_key), network.ETH_ALLOC_EPHEMERAL)
+        self.distribute_native(crypto.account(private_key), network.ETH_ALLOC_EPHEMERAL)
         network.connect(self, private_key=private_key, check_funds=False)
 
         # create the client
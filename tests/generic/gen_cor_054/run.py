@@ -1,4 +1,4 @@
-import secrets
+from web3 import Web3
 from ten.test.basetest import GenericNetworkTest
 from ten.test.contracts.error import Error
 
@@ -20,8 +20,7 @@ class PySysTest(GenericNetworkTest):
 
         # use an ephemeral account and give it funds
         funds_needed = 10*(gas_estimate * gas_price)
-        web3, account = network.connect(self, private_key=secrets.token_hex(32), check_funds=False)
-        self.distribute_native(account, web3.from_wei(funds_needed, 'ether'))
+        web3, account = self.acquire_funded_account(Web3.from_wei(funds_needed, 'ether'), network)
 
         # pre-sign, bulk send, and then wait for the tx with the highest nonce
         self.log.info('Creating signed transactions')
@@ -1,8 +1,8 @@
 import os
-from web3 import Web3
 from ten.test.basetest import GenericNetworkTest
 from ten.test.contracts.relevancy import Relevancy
 from ten.test.utils.properties import Properties
+from ten.test.utils import crypto
 
 
 class PySysTest(GenericNetworkTest):
@@ -12,7 +12,7 @@ class PySysTest(GenericNetworkTest):
         network = self.get_network_connection()
         web3, account1 = network.connect_account1(self)
 
-        account2 = Web3().eth.account.from_key(Properties().account2pk())
+        account2 = crypto.account(Properties().account2pk())
 
         # deploy the storage contracts
         contract = Relevancy(self, web3)
@@ -3,6 +3,7 @@ from ten.test.contracts.storage import Storage
 
 
 class PySysTest(GenericNetworkTest):
+    FIXTURES = ['Storage']
 
     def execute(self):
         # connect to network
@@ -3,6 +3,7 @@ from ten.test.contracts.storage import KeyStorage
 
 
 class PySysTest(GenericNetworkTest):
+    FIXTURES = ['KeyStorage']
 
     def execute(self):
         # connect to network
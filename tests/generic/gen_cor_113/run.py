@@ -1,7 +1,7 @@
 import secrets, os
-from web3 import Web3
 from ten.test.contracts.storage import KeyStorage
 from ten.test.basetest import GenericNetworkTest
+from ten.test.utils import crypto
 
 
 class PySysTest(GenericNetworkTest):
@@ -31,7 +31,7 @@ class PySysTest(GenericNetworkTest):
 
     def client(self, network, contract, key, value, funds_needed):
         private_key = secrets.token_hex(32)
-        self.distribute_native(Web3().eth.account.from_key(private_key), funds_needed, 'ether')
+        self.distribute_native(crypto.account(private_key), funds_needed, 'ether')
         network.connect(self, private_key=private_key, check_funds=False)
 
         # create the client
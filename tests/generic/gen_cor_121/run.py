@@ -1,7 +1,8 @@
-import re, json, secrets
+import json, secrets
 import os, shutil, copy
-from web3 import Web3
 from ten.test.basetest import GenericNetworkTest
+from ten.test.utils import crypto
+from ten.test.utils.log_scanner import LogScanner
 
 
 class PySysTest(GenericNetworkTest):
@@ -15,7 +16,7 @@ class PySysTest(GenericNetworkTest):
 
         # connect to the network
         network = self.get_network_connection()
-        self.distribute_native(Web3().eth.account.from_key(private_key), network.ETH_ALLOC_EPHEMERAL)
+        self.distribute_native(crypto.account(private_key), network.ETH_ALLOC_EPHEMERAL)
         web3, account = network.connect(self, private_key=private_key, check_funds=False)
 
         # copy over and initialise the project
@@ -32,11 +33,8 @@ class PySysTest(GenericNetworkTest):
                      working_dir=project, environ=environ, stdout='npx_deploy.out', stderr='npx_deploy.err')
 
         address = 'undefined'
-        regex = re.compile('TestMaths deployed at (?P<address>.*)$', re.M)
-        with open(os.path.join(self.output, 'npx_deploy.out'), 'r') as fp:
-            for line in fp.readlines():
-                result = regex.search(line)
-                if result is not None: address = result.group('address')
+        match = LogScanner(os.path.join(self.output, 'npx_deploy.out'), 'TestMaths deployed at (?P<address>.*)$').last()
+        if match is not None: address = match.group('address')
         self.log.info('TestMaths contract deployed at address %s', address)
 
         # construct an instance of the contract from the address and abi
@@ -1,11 +1,11 @@
 import secrets
-from web3 import Web3
 from hexbytes import HexBytes
 from web3.exceptions import TimeExhausted
 from pysys.constants import PASSED, FAILED
 from ten.test.utils.exceptions import *
 from ten.test.basetest import GenericNetworkTest
 from ten.test.contracts.storage import Storage
+from ten.test.utils import crypto
 
 
 class PySysTest(GenericNetworkTest):
@@ -15,7 +15,7 @@ class PySysTest(GenericNetworkTest):
         # deploy the storage contract but don't persist the nonce
         network = self.get_network_connection()
         private_key = secrets.token_hex(32)
-        self.distribute_native(Web3().eth.account.from_key(private_key), network.ETH_ALLOC_EPHEMERAL)
+        self.distribute_native(crypto.account(private_key), network.ETH_ALLOC_EPHEMERAL)
         web3, account = network.connect(self, private_key=private_key, check_funds=False)
 
         contract = Storage(self, web3, 0)
@@ -0,0 +1,23 @@
+import secrets
+from ten.test.basetest import GenericNetworkTest
+
+
+class PySysTest(GenericNetworkTest):
+    ACCOUNTS = 5        # number of ephemeral accounts to fund
+
+    def execute(self):
+        # connect to the network and create the ephemeral accounts to be funded
+        network = self.get_network_connection()
+        connections = [network.connect(self, private_key=secrets.token_hex(32), check_funds=False)
+                       for _ in range(0, self.ACCOUNTS)]
+        accounts = [account for _, account in connections]
+
+        # fund all accounts in a single call, each with a different amount
+        amounts = [0.0001 * (i + 1) for i in range(0, self.ACCOUNTS)]
+        self.distribute_native_many(accounts, amounts)
+
+        # check the balances are as expected
+        for (web3, account), amount in zip(connections, amounts):
+            balance = web3.eth.get_balance(account.address)
+            self.log.info('Balance of account %s is %d', account.address, balance)
+            self.assertTrue(balance == web3.to_wei(amount, 'ether'))
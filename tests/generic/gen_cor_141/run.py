@@ -0,0 +1,30 @@
+from pysys.constants import SKIPPED
+from ten.test.basetest import GenericNetworkTest
+from ten.test.contracts.storage import Storage
+
+
+class PySysTest(GenericNetworkTest):
+
+    def execute(self):
+        # deployment of contract
+        network = self.get_network_connection()
+        web3, account = network.connect_account1(self)
+
+        storage = Storage(self, web3, 100)
+        storage.deploy(network, account)
+        self.log.info('Code size at contract address is %d', len(web3.eth.get_code(storage.address)))
+
+        # revert to the snapshot taken by the runner
+        if not self.revert_to_snapshot():
+            self.addOutcome(SKIPPED, 'Unable to revert to the runner snapshot')
+            return
+
+        # the contract should not be deployed, but the shared fixtures deployed before the snapshot should be
+        self.log.info('Code size at contract address is %d', len(web3.eth.get_code(storage.address)))
+        self.assertTrue(web3.eth.get_code(storage.address) == b'')
+        address, _ = self.contract_db.get_contract('Disperse', self.env)
+        self.assertTrue(address is not None and web3.eth.get_code(address) != b'')
+
+        storage = Storage(self, web3, 100)
+        tx_receipt = storage.deploy(network, account)
+        self.assertTrue(tx_receipt.status == 1)
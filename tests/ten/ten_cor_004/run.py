@@ -1,8 +1,8 @@
-from web3 import Web3
 from ten.test.basetest import TenNetworkTest
 from ten.test.utils.properties import Properties
 from ten.test.contracts.relevancy import Relevancy
 from ten.test.helpers.log_subscriber import AllEventsLogSubscriber
+from ten.test.utils import crypto
 
 
 class PySysTest(TenNetworkTest):
@@ -11,7 +11,7 @@ class PySysTest(TenNetworkTest):
         # connect to network on the primary gateway
         network = self.get_network_connection()
         web3, account = network.connect_account4(self)
-        account1 = Web3().eth.account.from_key(Properties().account1pk())
+        account1 = crypto.account(Properties().account1pk())
 
         # deploy the storage contract
         contract = Relevancy(self, web3)
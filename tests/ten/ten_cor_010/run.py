@@ -31,8 +31,8 @@ class PySysTest(TenNetworkTest):
         tot_end = self.scan_get_total_transaction_count()
         self.log.info('Total transaction count: %d', tot_end)
 
-        tx_data = self.scan_get_public_transaction_data(0, page_sze)
-        txs_end = tx_data['TransactionsData']
+        client = self.scan_client(page_size=page_sze)
+        txs_end = list(client.public_transactions(offset=0, limit=page_sze))
         txs_hashes = [x['TransactionHash'] for x in txs_end]
         txs_heights = [x['BatchHeight'] for x in txs_end]
         txs_times = [x['BatchTimestamp'] for x in txs_end]
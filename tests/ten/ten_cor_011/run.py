@@ -15,14 +15,13 @@ class PySysTest(TenNetworkTest):
         self.log.info('Total number of pages:              %d', len(pages))
         self.log.info('Last (Offset, sizes) requested:     %s', pages)
 
-        # get the pages
+        # get the pages, where the client fetches them concurrently
+        client = self.scan_client(page_size=page_sze)
+        offset = pages[0][0]
+        expected = sum([page[1] for page in pages])
         total = 0
-        expected = 0
-        for page in pages:
-            tx_data = self.scan_get_public_transaction_data(page[0], page[1])
-            total = total + len(tx_data['TransactionsData'])
-            expected = expected + page[1]
-            self.log.info('Processed offset %d, number returned %d', page[0], len(tx_data['TransactionsData']))
+        for _ in client.public_transactions(offset=offset, limit=expected): total = total + 1
+        self.log.info('Processed offset %d, number returned %d', offset, total)
 
         # assert we get the expected amount over the last pages
         self.assertTrue(total == expected)
@@ -1,9 +1,9 @@
-import secrets
 from ten.test.basetest import TenNetworkTest
 from ten.test.contracts.storage import Storage
 
 
 class PySysTest(TenNetworkTest):
+    FIXTURES = ['Storage']
 
     def execute(self):
         # get the network, and get or deploy the storage contract
@@ -13,9 +13,7 @@ class PySysTest(TenNetworkTest):
         storage.get_or_deploy(network, account_deploy)
 
         # connect as an ephemeral test user and transact agains the contract
-        pk = secrets.token_hex(32)
-        web3_usr, account_usr = network.connect(self, private_key=pk, check_funds=False)
-        self.distribute_native(account_usr, network.ETH_ALLOC_EPHEMERAL)
+        web3_usr, account_usr = self.acquire_funded_account(network.ETH_ALLOC_EPHEMERAL, network)
         tx_receipt1 = network.transact(self, web3_usr, storage.contract.functions.store(1), account_usr, storage.GAS_LIMIT)
         tx_receipt2 = network.transact(self, web3_usr, storage.contract.functions.store(2), account_usr, storage.GAS_LIMIT)
 
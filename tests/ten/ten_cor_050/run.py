@@ -1,6 +1,7 @@
-import re, json, secrets, os, shutil, copy
-from web3 import Web3
+import json, secrets, os, shutil, copy
 from ten.test.basetest import TenNetworkTest
+from ten.test.utils import crypto
+from ten.test.utils.log_scanner import LogScanner
 
 
 class PySysTest(TenNetworkTest):
@@ -11,7 +12,7 @@ class PySysTest(TenNetworkTest):
 
         # connect to the network
         network = self.get_network_connection()
-        self.distribute_native(Web3().eth.account.from_key(private_key), network.ETH_ALLOC_EPHEMERAL)
+        self.distribute_native(crypto.account(private_key), network.ETH_ALLOC_EPHEMERAL)
 
         # copy over and initialise the project
         shutil.copytree(self.input, project)
@@ -26,11 +27,8 @@ class PySysTest(TenNetworkTest):
                      working_dir=project, environ=environ, stdout='npx_deploy.out', stderr='npx_deploy.err')
 
         address = 'undefined'
-        regex = re.compile('Contract deployed at (?P<address>.*)$', re.M)
-        with open(os.path.join(self.output, 'npx_deploy.out'), 'r') as fp:
-            for line in fp.readlines():
-                result = regex.search(line)
-                if result is not None: address = result.group('address')
+        match = LogScanner(os.path.join(self.output, 'npx_deploy.out'), 'Contract deployed at (?P<address>.*)$').last()
+        if match is not None: address = match.group('address')
         self.log.info('Contract deployed at address %s', address)
 
         # construct an instance of the contract from the address and abi
@@ -1,6 +1,6 @@
 import secrets, os, shutil, copy
-from web3 import Web3
 from ten.test.basetest import TenNetworkTest
+from ten.test.utils import crypto
 
 
 class PySysTest(TenNetworkTest):
@@ -12,8 +12,8 @@ class PySysTest(TenNetworkTest):
 
         # connect to the network
         network = self.get_network_connection()
-        account_1 = Web3().eth.account.from_key(private_key_1)
-        account_2 = Web3().eth.account.from_key(private_key_2)
+        account_1 = crypto.account(private_key_1)
+        account_2 = crypto.account(private_key_2)
         self.distribute_native(account_1, network.ETH_ALLOC_EPHEMERAL)
         self.distribute_native(account_2, network.ETH_ALLOC_EPHEMERAL)
 
@@ -5,6 +5,9 @@ from web3.exceptions import TimeExhausted
 from pysys.constants import FAILED, PASSED
 from ten.test.basetest import TenNetworkTest
 from ten.test.utils.gnuplot import GnuplotHelper
+from ten.test.load.signer import BulkSigner
+from ten.test.utils.block_scanner import BlockScanner
+from ten.test.utils.steady_state import SteadyState
 
 
 class PySysTest(TenNetworkTest):
@@ -47,11 +50,12 @@ class PySysTest(TenNetworkTest):
         # bulk load transactions, and wait for the last
         self.log.info('')
         self.log.info('Creating and signing %d transactions', self.ITERATIONS)
-        txs = []
-        for nonce in range(0, self.ITERATIONS):
-            txs.append((self.create_signed_tx(network, account_send, nonce, account_recv.address), nonce))
+        signed = BulkSigner(processes=0).sign([(account_send.key, self.create_tx(nonce, account_recv.address))
+                                               for nonce in range(0, self.ITERATIONS)])
+        txs = [(signed_tx, nonce) for nonce, signed_tx in enumerate(signed)]
 
         self.log.info('Bulk sending transactions to the network')
+        first_block = web3_send.eth.block_number
         balance_before = web3_send.eth.get_balance(account_send.address)
         tx_hashes = []
         for tx in txs:
@@ -69,6 +73,7 @@ class PySysTest(TenNetworkTest):
                     self.log.info('Transaction %d failed', count)
                     self.addOutcome(FAILED)
                 count = count + 1
+        last_block = web3_send.eth.block_number
         balance_after_wait = web3_send.eth.get_balance(account_send.address)
         balance_receiver = web3_send.eth.get_balance(account_recv.address)
 
@@ -84,10 +89,14 @@ class PySysTest(TenNetworkTest):
         # bin the data into timestamp intervals and log out to file
         self.log.info('')
         self.log.info('Constructing binned data from the transaction receipts and graphing')
+        scanner = BlockScanner(self.json_rpc, network.connection_url())
+        inclusions = scanner.resolve([tx_hash for tx_hash, _ in tx_hashes], first_block, last_block)
         bins = OrderedDict()
         for tx_hash, nonce in tx_hashes:
-            block_number_deploy = web3_send.eth.get_transaction(tx_hash).blockNumber
-            timestamp = int(web3_send.eth.get_block(block_number_deploy).timestamp)
+            if tx_hash not in inclusions:
+                self.log.warn('Transaction %d not found on the network', nonce)
+                continue
+            timestamp = inclusions[tx_hash].timestamp
             bins[timestamp] = 1 if timestamp not in bins else bins[timestamp] + 1
 
         times = list(bins)
@@ -97,27 +106,29 @@ class PySysTest(TenNetworkTest):
                 num = bins[i] if i in bins else 0
                 fp.write('%d %d\n' % ((i - first), num))
 
-        # graph the output
+        # estimate the steady state throughput and graph the output
+        steady_state = SteadyState([bins.get(i, 0) for i in range(times[0], times[-1]+1)])
+        steady_state.log(self.log)
         branch = GnuplotHelper.buildInfo().branch
         date = datetime.now().strftime("%Y/%m/%d %H:%M:%S")
         duration = times[-1]-times[0]
-        average = float(self.ITERATIONS) / float(duration) if duration != 0 else 0
+        average = steady_state.throughput
         GnuplotHelper.graph(self, os.path.join(self.input, 'gnuplot.in'), branch, date,
                             str(self.mode), str(self.ITERATIONS), str(duration), '%.3f'%average)
 
-        # persist the result
+        # persist the result along with its confidence interval
         self.results_db.insert_result(self.descriptor.id, self.mode, int(time.time()), average)
+        self.results_db.insert_throughput(self.descriptor.id, self.mode, int(time.time()), steady_state)
 
         # passed if no failures (though pdf output should be reviewed manually)
         self.addOutcome(PASSED)
 
-    def create_signed_tx(self, network, account, nonce, address):
-        """Creates a signed transaction ready for the sending of funds to an account. """
-        tx = {'nonce': nonce,
-              'to': address,
-              'value': self.value,
-              'gas': self.gas_limit,
-              'gasPrice': self.gas_price,
-              'chainId': self.chain_id
-              }
-        return network.sign_transaction(self, tx, nonce, account, persist_nonce=False)
+    def create_tx(self, nonce, address):
+        """Creates a transaction ready to be signed for the sending of funds to an account. """
+        return {'nonce': nonce,
+                'to': address,
+                'value': self.value,
+                'gas': self.gas_limit,
+                'gasPrice': self.gas_price,
+                'chainId': self.chain_id
+                }
@@ -1,9 +1,12 @@
 import os, secrets, time, re
 from datetime import datetime
 from collections import OrderedDict
+from web3 import Web3
 from pysys.constants import PASSED, FAILED
 from ten.test.basetest import TenNetworkTest
 from ten.test.utils.gnuplot import GnuplotHelper
+from ten.test.load.workload import read_samples
+from ten.test.utils.steady_state import SteadyState, active_window
 
 
 class PySysTest(TenNetworkTest):
@@ -52,16 +55,22 @@ class PySysTest(TenNetworkTest):
             for t in range(0, last + 1 - first):
                 fp.write('%d %d\n' % (t, sum([d[t] for d in data_binned])))
 
+        client_times = [[t for _, t in d] for d in data]
+        times, window = [t for c in client_times for t in c], active_window(client_times)
+        steady_state = SteadyState.from_times(times, *window) if window is not None else SteadyState([])
+        steady_state.log(self.log)
+
         branch = GnuplotHelper.buildInfo().branch
         duration = last - first
-        average = float(len(self.clients) * self.ITERATIONS) / float(duration) if duration != 0 else 0
+        average = steady_state.throughput
         date = datetime.now().strftime("%Y/%m/%d %H:%M:%S")
         GnuplotHelper.graph(self, os.path.join(self.input, 'gnuplot.in'),
                             branch, date,
                             str(self.mode), str(len(self.clients) * self.ITERATIONS), str(duration), '%.3f' % average)
 
-        # persist the result
+        # persist the result along with its confidence interval
         self.results_db.insert_result(self.descriptor.id, self.mode, int(time.time()), average)
+        self.results_db.insert_throughput(self.descriptor.id, self.mode, int(time.time()), steady_state)
 
         # passed if no failures (though pdf output should be reviewed manually)
         self.addOutcome(PASSED)
@@ -71,38 +80,26 @@ class PySysTest(TenNetworkTest):
         network = self.get_network_connection()
         with open(os.path.join(self.output, pk_file), 'w') as fw:
             for i in range(0, self.SENDING_ACCOUNTS):
-                pk = secrets.token_hex(32)
-                web3, account = network.connect(self, private_key=pk, check_funds=False)
-                self.distribute_native(account, web3.from_wei(funds_needed, 'ether'))
+                web3, account = self.acquire_funded_account(Web3.from_wei(funds_needed, 'ether'), network)
+                pk = account.key.hex()
                 fw.write('%s\n' % pk)
                 fw.flush()
         return pk_file, network
 
     def run_client(self, name, pk_file, network):
         """Run a background load client. """
-        stdout = os.path.join(self.output, '%s.out' % name)
-        stderr = os.path.join(self.output, '%s.err' % name)
-        script = os.path.join(self.input, 'client.py')
         args = []
-        args.extend(['--network_http', network.connection_url()])
-        args.extend(['--chainId', '%s' % network.chain_id()])
         args.extend(['--pk_file', pk_file])
-        args.extend(['--num_accounts', '%d' % self.RECEIVING_ACCOUNTS])
         args.extend(['--num_iterations', '%d' % self.ITERATIONS])
-        args.extend(['--client_name', name])
-        args.extend(['--amount', '%d' % self.value])
+        args.extend(['--mode', 'bulk'])
         args.extend(['--gas_limit', '%d' % self.gas_limit])
-        self.run_python(script, stdout, stderr, args)
-        self.waitForSignal(file=stdout, expr='Starting client %s' % name)
+        op_args = ['--num_accounts', '%d' % self.RECEIVING_ACCOUNTS, '--amount', '%d' % self.value]
+        self.run_load(name, network, 'transfer', args, op_args)
 
     def load_data(self, file):
-        """Load a client transaction log into memory. """
-        data = []
-        with open(os.path.join(self.output, file), 'r') as fp:
-            for line in fp.readlines():
-                nonce, block_nume, timestamp = line.split()
-                data.append((nonce, int(timestamp)))
-        return data
+        """Load the index and block timestamp of the client transactions included in a block. """
+        samples = read_samples(os.path.join(self.output, file))
+        return [(s.index, s.timestamp) for s in samples if s.timestamp is not None]
 
     def bin_data(self, first, last, data, binned_data):
         """Bin a client transaction data and offset the time. """
@@ -1,10 +1,11 @@
-import os, time, secrets, sys, re
-import numpy as np
+import os, time, secrets, re
 from datetime import datetime
-from collections import OrderedDict
+from web3 import Web3
 from pysys.constants import PASSED, FAILED
 from ten.test.basetest import TenNetworkTest
 from ten.test.utils.gnuplot import GnuplotHelper
+from ten.test.load.workload import read_samples
+from ten.test.utils.steady_state import SteadyState, active_window, bin_counts
 
 
 class PySysTest(TenNetworkTest):
@@ -36,6 +37,7 @@ class PySysTest(TenNetworkTest):
             scale = scale + increment
 
         # run the clients and wait for their completion
+        barrier = self.start_barrier()
         results_file = os.path.join(self.output, 'results.log')
         with open(results_file, 'w') as fp:
             for clients in [2,3,4]:
@@ -43,12 +45,10 @@ class PySysTest(TenNetworkTest):
                 self.log.info('Running for %d clients' % clients)
 
                 out_dir = os.path.join(self.output, 'clients_%d' % clients)
-                signal = os.path.join(out_dir, '.signal')
                 for i in range(0, clients):
-                    self.run_client('client_%s' % i, 1.1*funds_needed, out_dir, signal)
+                    self.run_client('client_%s' % i, 1.1*funds_needed, barrier, out_dir)
 
-                start_ns = time.perf_counter_ns()
-                with open(signal, 'w') as sig: sig.write('go')
+                start_ns = barrier.release(parties=clients)
                 for i in range(0, clients):
                     self.waitForGrep(file=os.path.join(out_dir, 'client_%s.out' % i),
                                      expr='Client client_%s completed' % i, timeout=300)
@@ -56,14 +56,17 @@ class PySysTest(TenNetworkTest):
                 end_ns = time.perf_counter_ns()
 
                 bulk_throughput = float(clients * self.ITERATIONS) / float((end_ns - start_ns) / 1e9)
-                throughput = self.process_throughput(clients, out_dir)
+                steady_state = self.process_throughput(clients, out_dir)
+                throughput = steady_state.throughput
                 self.log.info('Bulk rate throughput %.2f (requests/sec)' % bulk_throughput)
-                self.log.info('Approx. throughput %.2f (requests/sec)' % throughput)
-                fp.write('%d %.2f\n' % (clients, throughput))
+                self.log.info('Approx. throughput %.2f (requests/sec), 95%% CI %.2f to %.2f' %
+                              (throughput, steady_state.lower, steady_state.upper))
+                fp.write('%d %.2f %.2f %.2f\n' % (clients, throughput, steady_state.lower, steady_state.upper))
 
-                # persist the result
+                # persist the result along with its confidence interval
                 if clients == 4:
                     self.results_db.insert_result(self.descriptor.id, self.mode, int(time.time()), '%.2f' % throughput)
+                    self.results_db.insert_throughput(self.descriptor.id, self.mode, int(time.time()), steady_state)
 
         # plot the summary graph
         self.graph_all_clients()
@@ -71,85 +74,56 @@ class PySysTest(TenNetworkTest):
         # passed if no failures (though pdf output should be reviewed manually)
         self.addOutcome(PASSED)
 
-    def run_client(self, name, funds_needed, out_dir, signal_file):
+    def run_client(self, name, funds_needed, barrier, out_dir):
         """Run a background load client. """
-        pk = secrets.token_hex(32)
         network = self.get_network_connection()
-        web3, account = network.connect(self, private_key=pk, check_funds=False)
-        self.distribute_native(account, web3.from_wei(funds_needed, 'ether'))
+        web3, account = self.acquire_funded_account(Web3.from_wei(funds_needed, 'ether'), network)
+        pk = account.key.hex()
 
         if not os.path.exists(out_dir): os.mkdir(out_dir)
-        stdout = os.path.join(out_dir, '%s.out' % name)
-        stderr = os.path.join(out_dir, '%s.err' % name)
-        script = os.path.join(self.input, 'client.py')
         args = []
-        args.extend(['--network_http', network.connection_url()])
-        args.extend(['--chainId', '%s' % network.chain_id()])
         args.extend(['--pk', pk])
-        args.extend(['--num_accounts', '%d' % self.ACCOUNTS])
         args.extend(['--num_iterations', '%d' % self.ITERATIONS])
-        args.extend(['--client_name', name])
-        args.extend(['--amount', '%d' % self.value])
+        args.extend(['--mode', 'bulk'])
         args.extend(['--gas_limit', '%d' % self.gas_limit])
-        args.extend(['--signal_file', signal_file])
-        self.run_python(script, stdout, stderr, args, workingDir=out_dir)
-        self.waitForSignal(file=stdout, expr='Starting client %s' % name)
+        args.extend(['--gas_price_ramp', '2.0'])
+        args.extend(['--timeout', '300'])
+        args.extend(['--barrier', barrier.address])
+        op_args = ['--num_accounts', '%d' % self.ACCOUNTS, '--amount', '%d' % self.value]
+        self.run_load(name, network, 'transfer', args, op_args, workingDir=out_dir)
 
     def process_throughput(self, num_clients, out_dir):
-        # store the binned data for each client and the timestamps
-        start_time = sys.maxsize
-        end_time = 0
-        throughput = 0
-        list_client_bins = []
-        list_client_times = []
+        """Bin the block timestamps of all clients and estimate the steady state throughput where all are active. """
+        client_times = []
         for i in range(0, num_clients):
-            client_bins = OrderedDict()
-            with open(os.path.join(out_dir, 'client_%s_throughput.log' % i), 'r') as fp:
-                for line in fp.readlines():
-                    timestamp = int(line.strip())
-                    if timestamp < start_time: start_time = timestamp
-                    if timestamp > end_time: end_time = timestamp
-                    if timestamp not in client_bins: client_bins[timestamp] = 0
-                    else: client_bins[timestamp] = client_bins[timestamp] + 1
-                list_client_bins.append(client_bins)
-                list_client_times.append(list(client_bins.keys()))
-
-        # bin the data
-        bins = OrderedDict()
-        for x in range(start_time, end_time + 1): bins[x] = 0
-        for client_bins in list_client_bins:
-            for timestamp in client_bins.keys():
-                bins[timestamp] = bins[timestamp] + client_bins[timestamp]
-
-        # reduce to the overlap and find best zero gradient fit
-        min, max = self.find_overlap(list_client_times)
-        included = [i for i in range(min, max+1, 1)]
-        if len(included) > 0:
-            bins_steady = {key: value for key, value in bins.items() if key in included}
-            bins_ramp = {key: value for key, value in bins.items() if key not in included}
-            throughput = float(sum(bins_steady.values())) / float((included[-1] - included[0]))
-
-            with open(os.path.join(out_dir, 'binned_throughput_all.log'), 'w') as fp:
-                for t in bins.keys(): fp.write('%d %d\n' % (t-start_time, bins[t]))
-
-            with open(os.path.join(out_dir, 'binned_throughput_steady.log'), 'w') as fp:
-                for t in bins_steady.keys(): fp.write('%d %d %.2f\n' % (t-start_time, bins_steady[t], throughput))
-
-            with open(os.path.join(out_dir, 'binned_throughput_ramp.log'), 'w') as fp:
-                for t in bins_ramp.keys(): fp.write('%d %d\n' % (t-start_time, bins_ramp[t]))
-        else:
+            samples = read_samples(os.path.join(out_dir, 'client_%s.log' % i))
+            client_times.append([sample.timestamp for sample in samples if sample.timestamp is not None])
+        times = [t for c in client_times for t in c]
+        window = active_window(client_times)
+        if window is None:
             self.log.warn('No overlap of all clients detected')
+            return SteadyState([])
 
-        return throughput
+        start_time = min(times)
+        bins = bin_counts(times)
+        steady_state = SteadyState.from_times(times, *window)
+        steady_state.log(self.log)
+
+        with open(os.path.join(out_dir, 'binned_throughput_all.log'), 'w') as fp:
+            for t, count in enumerate(bins): fp.write('%d %d\n' % (t, count))
+
+        with open(os.path.join(out_dir, 'binned_throughput_steady.log'), 'w') as fp:
+            for t, count in steady_state.steady():
+                fp.write('%d %d %.2f\n' % (t - start_time, count, steady_state.throughput))
+
+        with open(os.path.join(out_dir, 'binned_throughput_ramp.log'), 'w') as fp:
+            first, last = steady_state.window
+            for t, count in enumerate(bins):
+                if t + start_time < first or t + start_time > last: fp.write('%d %d\n' % (t, count))
+
+        return steady_state
 
     def graph_all_clients(self):
         branch = GnuplotHelper.buildInfo().branch
         date = datetime.now().strftime('%Y/%m/%d %H:%M:%S')
         GnuplotHelper.graph(self, os.path.join(self.input, 'gnuplot.in'), branch, date, str(self.mode))
-
-    def find_overlap(self, lists):
-        if len(lists) == 0: return []
-        overlap = np.array(lists[0])
-        for l in lists[1:]: overlap = np.intersect1d(overlap, np.array(l))
-        return overlap.tolist()[0], overlap.tolist()[-1]
-
@@ -0,0 +1,110 @@
+import os, time, secrets
+from datetime import datetime
+from pysys.constants import PASSED
+from ten.test.basetest import TenNetworkTest
+from ten.test.utils.gnuplot import GnuplotHelper
+from ten.test.load.saturation import SaturationSearch, Point
+from ten.test.load.workload import read_samples
+from ten.test.utils.histogram import Histogram
+from ten.test.utils.steady_state import SteadyState, active_window
+
+
+class PySysTest(TenNetworkTest):
+    CLIENTS = 8             # the number of virtual clients the offered load is spread over
+    PROCESSES = 1           # the number of processes to fan the clients out over, or zero for all cores
+    ARRIVAL = 'poisson'     # the inter-arrival times of the open loop runs, fixed or poisson
+    DURATION = 30           # the duration in seconds of the run at each offered load
+    START_RATE = 50         # the offered load in requests per second to start the search from
+    MAX_RATE = 5000         # the maximum offered load in requests per second to search to
+    P99 = 1000              # the p99 latency in milliseconds of the objective
+    ERROR_RATIO = 0.01      # the ratio of failed requests of the objective
+    STALL = 30              # the number of seconds without progress to abort a run after
+
+    def __init__(self, descriptor, outsubdir, runner):
+        super().__init__(descriptor, outsubdir, runner)
+        self.probes = 0
+
+    def execute(self):
+        # connect to the network with the accounts of the clients
+        network = self.get_network_connection()
+        pks = [secrets.token_hex(32) for _ in range(0, self.CLIENTS)]
+        for pk in pks: network.connect(self, private_key=pk, check_funds=False)
+        pk_file = os.path.join(self.output, 'pks.txt')
+        with open(pk_file, 'w') as fp:
+            for pk in pks: fp.write('%s\n' % pk)
+
+        # search for the max sustainable rate within the objective
+        barrier = self.start_barrier()
+        search = SaturationSearch(self.log, lambda rate: self.probe(network, pk_file, barrier, rate), p99=self.P99,
+                                  error_ratio=self.ERROR_RATIO, start=self.START_RATE, max_rate=self.MAX_RATE)
+        search.run()
+        self.log.info(' ')
+        search.log_summary()
+        search.write(os.path.join(self.output, 'curve.log'))
+        self.graph(search)
+
+        # persist the max sustainable throughput, and the knee and curve of the search
+        self.results_db.insert_result(self.descriptor.id, self.mode, int(time.time()), '%.2f' % search.max_throughput)
+        self.results_db.insert_saturation(self.descriptor.id, self.mode, int(time.time()), search)
+
+        # passed if the search completed (though pdf output should be reviewed manually)
+        self.addOutcome(PASSED)
+
+    def probe(self, network, pk_file, barrier, rate):
+        """Run the clients open loop at an offered rate across all clients, returning the point measured. """
+        out_dir = os.path.join(self.output, 'probe_%d' % self.probes)
+        live = self.live_metrics('live_%d' % self.probes, error_ratio=self.ERROR_RATIO, stall=self.STALL)
+        self.probes += 1
+        os.mkdir(out_dir)
+
+        args = []
+        args.extend(['--pk_file', pk_file])
+        args.extend(['--clients', '%d' % self.CLIENTS])
+        args.extend(['--processes', '%d' % self.PROCESSES])
+        args.extend(['--num_iterations', '%d' % max(1, int(rate * self.DURATION / self.CLIENTS))])
+        args.extend(['--mode', 'open', '--rate', '%.3f' % (rate / self.CLIENTS), '--arrival', self.ARRIVAL])
+        args.extend(['--barrier', barrier.address])
+        args.extend(['--metrics', live.address])
+        timeout = 5 * self.DURATION + 60
+        hprocess = self.run_load('client', network, 'get_balance', args, workingDir=out_dir, timeout=timeout)
+
+        start_ns = barrier.release(parties=1)
+        completed = self.waitForGrep(file=os.path.join(out_dir, 'client.out'), expr='Client client completed',
+                                     timeout=timeout, errorIf=live.error, abortOnError=False)
+        elapsed = (time.perf_counter_ns() - start_ns) / 1e9
+        live.close()
+        if len(completed) == 0:
+            hprocess.stop()
+            return self.live_point(rate, live, elapsed)
+        return self.process_point(rate, out_dir)
+
+    def process_point(self, rate, out_dir):
+        """Return the point of a completed run from the steady state throughput and corrected latency of clients. """
+        samples, client_times = [], []
+        for i in range(0, self.CLIENTS):
+            client_samples = read_samples(os.path.join(out_dir, 'client_%d.log' % i))
+            client_times.append([sample.end for sample in client_samples if sample.ok])
+            samples.extend(client_samples)
+        times = [t for c in client_times for t in c]
+        window = active_window(client_times)
+        steady_state = SteadyState.from_times(times, *window) if window is not None else SteadyState([])
+        steady_state.log(self.log)
+        histogram = Histogram.merged([os.path.join(out_dir, 'client_%d.hdr' % i) for i in range(0, self.CLIENTS)])
+        failures = sum(1 for sample in samples if not sample.ok)
+        return Point(rate, steady_state.throughput, histogram.percentile(50), histogram.percentile(99),
+                     float(failures) / len(samples) if len(samples) > 0 else 0.0)
+
+    def live_point(self, rate, live, elapsed):
+        """Return the point of an aborted run from the totals of its live metrics. """
+        sent, confirmed, failed = live.totals
+        self.log.warn('Run at %.2f (requests/sec) did not complete, using its live metrics', rate)
+        return Point(rate, confirmed / elapsed if elapsed > 0 else 0.0, live.histogram.percentile(50),
+                     live.histogram.percentile(99), float(failed) / (confirmed + failed) if failed > 0 else 0.0)
+
+    def graph(self, search):
+        branch = GnuplotHelper.buildInfo().branch
+        date = datetime.now().strftime('%Y/%m/%d %H:%M:%S')
+        knee = search.knee
+        GnuplotHelper.graph(self, os.path.join(self.input, 'saturation.in'), branch, date, str(self.mode),
+                            '%.2f' % search.max_throughput, '%.2f' % (knee.throughput if knee is not None else 0),
+                            '%.1f' % self.P99)
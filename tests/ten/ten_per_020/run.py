@@ -1,11 +1,11 @@
-import secrets, os, math, time, re
+import secrets, os, time, re
 from datetime import datetime
-from collections import OrderedDict
-from web3 import Web3
 from pysys.constants import FAILED, PASSED
 from ten.test.contracts.storage import Storage
 from ten.test.basetest import TenNetworkTest
 from ten.test.utils.gnuplot import GnuplotHelper
+from ten.test.utils.histogram import Histogram
+from ten.test.utils import crypto
 
 
 class PySysTest(TenNetworkTest):
@@ -53,7 +53,7 @@ class PySysTest(TenNetworkTest):
             for i in range(0, self.CLIENTS):
                 self.storage_client(storage.address, storage.abi_path, i, network, funds_needed)
             for i in range(0, self.CLIENTS):
-                self.waitForGrep(file='client_%d.out' % i, expr='Client completed', timeout=450)
+                self.waitForGrep(file='client_%d.out' % i, expr='Client client_%d completed' % i, timeout=450)
                 self.ratio_failures(file=os.path.join(self.output, 'client_%d.out' % i))
             self.graph()
 
@@ -62,51 +62,38 @@ class PySysTest(TenNetworkTest):
 
     def storage_client(self, address, abi_path, num, network, funds_needed):
         pk = secrets.token_hex(32)
-        account = Web3().eth.account.from_key(pk)
-        self.distribute_native(account, Web3().from_wei(funds_needed, 'ether'))
+        account = crypto.account(pk)
+        self.distribute_native(account, crypto.from_wei(funds_needed, 'ether'))
         network.connect(self, private_key=pk, check_funds=False)
 
-        stdout = os.path.join(self.output, 'client_%d.out' % num)
-        stderr = os.path.join(self.output, 'client_%d.err' % num)
-        script = os.path.join(self.input, 'storage_client.py')
         args = []
-        args.extend(['--network_http', '%s' % network.connection_url()])
-        args.extend(['--address', '%s' % address])
-        args.extend(['--contract_abi', '%s' % abi_path])
-        args.extend(['--pk_to_register', '%s' % pk])
-        args.extend(['--output_file', 'client_%s.log' % num])
-        args.extend(['--gas_limit', '%d' % self.gas_limit])
+        args.extend(['--pk', pk])
         args.extend(['--num_iterations', '%d' % self.ITERATIONS_FULL])
-        self.run_python(script, stdout, stderr, args)
+        args.extend(['--gas_limit', '%d' % self.gas_limit])
+        args.extend(['--timeout', '180'])
+        op_args = ['--contract_address', address, '--contract_abi', abi_path]
+        self.run_load('client_%d' % num, network, 'store', args, op_args)
 
     def graph(self):
-        # load the latency values and sort
-        l = []
-        for i in range(0, self.CLIENTS):
-            with open(os.path.join(self.output, 'client_%d.log' % i), 'r') as fp:
-                for line in fp.readlines(): l.append(float(line.strip()))
-        l.sort()
-        self.log.info('Average latency = %.2f', (sum(l) / len(l)))
-        self.log.info('Median latency = %.2f', l[int(len(l) / 2)])
-
-        # bin into intervals and write to file
-        bins = OrderedDict()
-        bin_inc = 20  # 0.05 intervals
-        bin = lambda x: int(math.floor(bin_inc*x))
-
-        for i in range(bin(l[0]), bin(l[len(l)-1])+1): bins[i] = 0
-        for v in l: bins[bin(v)] = bins[bin(v)] + 1
+        # merge the latency histograms of the clients
+        histogram = Histogram.merged([os.path.join(self.output, 'client_%d.hdr' % i) for i in range(0, self.CLIENTS)])
+        latency = '%.2f' % (histogram.mean / 1000.0)
+        p99 = '%.2f' % (histogram.percentile(99) / 1000.0)
+        self.log.info('Average latency = %s', latency)
+        self.log.info('Median latency = %.2f', histogram.percentile(50) / 1000.0)
+        self.log.info('P99 latency = %s', p99)
+
+        # bin into 0.05 second intervals and write to file
         with open(os.path.join(self.output, 'bins.log'), 'w') as fp:
-            for k in bins.keys(): fp.write('%.2f %d\n' % (k/float(bin_inc), bins[k]))
-            fp.flush()
+            for start, count in histogram.bins(width=50): fp.write('%.2f %d\n' % (start / 1000.0, count))
 
         # plot out the results
         branch = GnuplotHelper.buildInfo().branch
         date = datetime.now().strftime("%Y/%m/%d %H:%M:%S")
-        latency = '%.2f' % (sum(l) / len(l))
         GnuplotHelper.graph(self, os.path.join(self.input, 'gnuplot.in'),
                             branch, date,
-                            str(self.mode), str(len(l)), '%d' % self.CLIENTS, latency)
+                            str(self.mode), str(histogram.count), '%d' % self.CLIENTS, latency, p99)
 
         # persist the result
         self.results_db.insert_result(self.descriptor.id, self.mode, int(time.time()), latency)
+        self.results_db.insert_latency(self.descriptor.id, self.mode, int(time.time()), histogram)
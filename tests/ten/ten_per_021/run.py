@@ -1,11 +1,11 @@
 import secrets, os, time, math, re
-from web3 import Web3
 from collections import OrderedDict
 from datetime import datetime
 from pysys.constants import PASSED, FAILED
 from ten.test.contracts.storage import KeyStorage
 from ten.test.basetest import TenNetworkTest
 from ten.test.utils.gnuplot import GnuplotHelper
+from ten.test.utils import crypto
 
 
 class PySysTest(TenNetworkTest):
@@ -47,10 +47,10 @@ class PySysTest(TenNetworkTest):
 
     def client(self, network, contract, num, funds_needed):
         private_key = secrets.token_hex(32)
-        account = Web3().eth.account.from_key(private_key)
+        account = crypto.account(private_key)
         key = '%d_%d' % (int(time.time()), num)
         self.log.info('Client %d has key %s', num, key)
-        self.distribute_native(account, Web3().from_wei(funds_needed, 'ether'))
+        self.distribute_native(account, crypto.from_wei(funds_needed, 'ether'))
         network.connect(self, private_key=private_key, check_funds=False)
 
         # create the client
@@ -72,7 +72,7 @@ class PySysTest(TenNetworkTest):
         l = []
         for i in range(0, self.CLIENTS):
             with open(os.path.join(self.output, 'client_%d.log' % i), 'r') as fp:
-                for line in fp.readlines(): l.append(float(line.strip()))
+                for line in fp: l.append(float(line.strip()))
         l.sort()
         self.log.info('Average latency = %.2f', (sum(l) / len(l)))
         self.log.info('Median latency = %.2f', l[int(len(l) / 2)])
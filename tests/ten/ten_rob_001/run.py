@@ -1,8 +1,8 @@
-from web3 import Web3
 import secrets, os
 from ten.test.basetest import TenNetworkTest
 from ten.test.contracts.storage import Storage
 from ten.test.helpers.log_subscriber import FilterLogSubscriber
+from ten.test.utils import crypto
 
 
 class PySysTest(TenNetworkTest):
@@ -39,7 +39,7 @@ class PySysTest(TenNetworkTest):
 
     def hammer(self, network, private_key, num):
         # register out-side of the script
-        self.distribute_native(Web3().eth.account.from_key(private_key), network.ETH_ALLOC_EPHEMERAL)
+        self.distribute_native(crypto.account(private_key), network.ETH_ALLOC_EPHEMERAL)
         network.connect(self, private_key=private_key, check_funds=False)
 
         # create the client
@@ -1,10 +1,10 @@
 import os, secrets
-from web3 import Web3
 from pysys.constants import PROJECT
 from ten.test.basetest import TenNetworkTest
 from ten.test.contracts.guesser import Guesser
 from ten.test.contracts.storage import Storage
 from ten.test.contracts.error import Error
+from ten.test.utils import crypto
 
 
 class PySysTest(TenNetworkTest):
@@ -42,7 +42,7 @@ class PySysTest(TenNetworkTest):
 
         # create the clients and get them running concurrently
         for i in range(0, len(funders)):
-            recipients = [Web3().eth.account.from_key(x).address for x in funders if x != funders[i]]
+            recipients = [crypto.address(x) for x in funders if x != funders[i]]
             self.funds_client(network, funders[i], recipients, i, funders_connection)
 
         for i in range(0, self.NUM_GUESSERS):
@@ -81,31 +81,28 @@ class PySysTest(TenNetworkTest):
         self.waitForGrep(file=stdout, expr='Client running', timeout=10)
 
     def guesser_client(self, address, abi_path, num, network):
-        self._client(address, abi_path, 'guesser_client', num, network, False)
+        self._client(address, abi_path, 'guesser_client', num, network, 'call', ['--function', 'guess'], False)
 
     def storage_client(self, address, abi_path, num, network):
-        self._client(address, abi_path, 'storage_client', num, network)
+        self._client(address, abi_path, 'storage_client', num, network, 'store', [], gas_limit=720000)
 
     def error_client(self, address, abi_path, num, network):
-        self._client(address, abi_path, 'error_client', num, network, False)
+        functions = ['--function', 'force_require', '--function', 'force_revert', '--function', 'force_assert']
+        self._client(address, abi_path, 'error_client', num, network, 'call', functions, False)
 
-    def _client(self, address, abi_path, name, num, network, fund=True):
+    def _client(self, address, abi_path, name, num, network, operation, operation_args, fund=True, gas_limit=None):
         pk = secrets.token_hex(32)
         web3, account = network.connect(self, private_key=pk, check_funds=False)
         if fund:
             self.distribute_native(account, network.ETH_ALLOC_EPHEMERAL)
             self.client_connections.append((web3, account, network))
 
-        stdout = os.path.join(self.output, '%s_%d.out' % (name, num))
-        stderr = os.path.join(self.output, '%s_%d.err' % (name, num))
-        script = os.path.join(self.input, '%s.py' % name)
         args = []
-        args.extend(['--network_http', '%s' % network.connection_url()])
-        args.extend(['--address', '%s' % address])
-        args.extend(['--contract_abi', '%s' % abi_path])
-        args.extend(['--pk_to_register', '%s' % pk])
-        self.clients.append(self.run_python(script, stdout, stderr, args))
-        self.waitForGrep(file=stdout, expr='Client running', timeout=10)
+        args.extend(['--pk', pk])
+        args.extend(['--delay', '0.1'])
+        if gas_limit is not None: args.extend(['--gas_limit', '%d' % gas_limit])
+        op_args = ['--contract_address', address, '--contract_abi', abi_path] + operation_args
+        self.clients.append(self.run_load('%s_%d' % (name, num), network, operation, args, op_args))
 
     def _stop_and_drain(self):
         self.log.info('Stopping all concurrent clients and drain accounts')
@@ -1,4 +1,5 @@
-import os, random, string, secrets
+import os, random, string
+from web3 import Web3
 from pysys.constants import PASSED, FOREGROUND
 from ten.test.basetest import TenNetworkTest
 from ten.test.contracts.emitter import EventEmitter
@@ -50,26 +51,19 @@ class PySysTest(TenNetworkTest):
         self.addOutcome(PASSED)
 
     def setup_transactor(self, funds_needed):
-        pk = secrets.token_hex(32)
         network = self.get_network_connection()
-        web3, account = network.connect(self, private_key=pk, check_funds=False)
-        self.distribute_native(account, web3.from_wei(funds_needed, 'ether'))
+        web3, account = self.acquire_funded_account(Web3.from_wei(funds_needed, 'ether'), network)
+        pk = account.key.hex()
         return pk, account, network
 
     def run_transactor(self, id, emitter, pk, network, gas_limit):
-        stdout = os.path.join(self.output, 'transactor%s.out' % id)
-        stderr = os.path.join(self.output, 'transactor%s.err' % id)
-        script = os.path.join(self.input, 'transactor.py')
         args = []
-        args.extend(['--network_http', network.connection_url()])
-        args.extend(['--chainId', '%s' % network.chain_id()])
         args.extend(['--pk', pk])
-        args.extend(['--contract_address', '%s' % emitter.address])
-        args.extend(['--contract_abi', '%s' % emitter.abi_path])
-        args.extend(['--transactions', '%d' % self.TRANSACTIONS])
-        args.extend(['--id', '%d' % id])
+        args.extend(['--num_iterations', '%d' % self.TRANSACTIONS])
+        args.extend(['--mode', 'bulk'])
         args.extend(['--gas_limit', '%d' % gas_limit])
-        self.run_python(script, stdout, stderr, args, state=FOREGROUND)
+        op_args = ['--contract_address', emitter.address, '--contract_abi', emitter.abi_path, '--id', '%d' % id]
+        self.run_load('transactor%d' % id, network, 'emit', args, op_args, state=FOREGROUND, timeout=900)
 
     def run_debugger(self, emitter, url):
         stdout = os.path.join(self.output, 'debugger.out')
@@ -3,6 +3,7 @@ import os, secrets, argparse, json, sys
 from web3 import Web3
 from eth_account import Account
 from eth_account.messages import encode_typed_data
+from ten.test.utils import crypto
 
 logging.basicConfig(format='%(asctime)s %(levelname)s %(message)s', stream=sys.stdout, level=logging.INFO)
 
@@ -53,7 +54,7 @@ if __name__ == "__main__":
     parser.add_argument('-c', '--chain_id', help='The network chain ID')
     args = parser.parse_args()
 
-    account = Web3().eth.account.from_key(args.pk)
+    account = crypto.account(args.pk)
     logging.info('Client running ... waiting for trigger file')
     wait(args.trigger)
     logging.info('Client starting ... trigger file seen')
@@ -68,7 +69,7 @@ if __name__ == "__main__":
         web3 = Web3(Web3.HTTPProvider('%s:%s/v1/?token=%s' % (args.host, args.port, user_id)))
 
         for j in range(0, int(args.additional_accounts)):
-            _account = Web3().eth.account.from_key(secrets.token_hex(32))
+            _account = crypto.account(secrets.token_hex(32))
             response = register(int(args.chain_id), _account, args.host, int(args.port), user_id)
             logging.info('Additional clients, registration for %s success was %s', _account.address, response.ok)
 
@@ -1,7 +1,7 @@
 import os, secrets
-from web3 import Web3
 from ten.test.basetest import TenNetworkTest
 from ten.test.utils.properties import Properties
+from ten.test.utils import crypto
 
 
 class PySysTest(TenNetworkTest):
@@ -35,8 +35,8 @@ class PySysTest(TenNetworkTest):
 
     def _client(self, name, network, trigger):
         pk = secrets.token_hex(32)
-        account = Web3().eth.account.from_key(pk)
-        self.distribute_native(account, Web3().from_wei(self.FUNDS, 'ether'))
+        account = crypto.account(pk)
+        self.distribute_native(account, crypto.from_wei(self.FUNDS, 'ether'))
 
         stdout = os.path.join(self.output, '%s.out' % name)
         stderr = os.path.join(self.output, '%s.err' % name)